@@ -496,6 +496,20 @@ def chat_send_peer(request=None, body=""):
         return (500, {"status": "error", "message": str(e)})
 
 
+def _chat_stream_messages(channel):
+    """
+    Yield the JSON document {"status", "channel", "messages"} of a channel
+    piece by piece. Messages posted while streaming are not included.
+    """
+    messages = CHAT_CHANNELS[channel]
+    count = len(messages)
+
+    yield '{{"status": "ok", "channel": {}, "messages": ['.format(json.dumps(channel))
+    for i in range(count):
+        yield ("," if i else "") + json.dumps(messages[i])
+    yield "]}"
+
+
 @app.route("/channel/messages", methods=["POST"])
 def chat_channel_messages(request=None, body=""):
     """
@@ -504,6 +518,9 @@ def chat_channel_messages(request=None, body=""):
         {
             "channel": "general"
         }
+
+    The history is streamed (chunked) one message at a time, so a long
+    channel is never serialized into a single buffer.
     """
     print("[Chat] /channel/messages")
 
@@ -513,11 +530,7 @@ def chat_channel_messages(request=None, body=""):
 
         _chat_ensure_channel(channel)
 
-        return (200, {
-            "status": "ok",
-            "channel": channel,
-            "messages": CHAT_CHANNELS[channel]
-        })
+        return _chat_stream_messages(channel)
 
     except Exception as e:
         print("[Chat] /channel/messages error:", e)
@@ -0,0 +1,96 @@
+#
+# Copyright (C) 2025 pdnguyen of HCMC University of Technology VNU-HCM.
+# All rights reserved.
+# This file is part of the CO3093/CO3094 course.
+#
+# WeApRous release
+#
+# The authors hereby grant to Licensee personal permission to use
+# and modify the Licensed Source Code for the sole purpose of studying
+# while attending the course
+#
+
+"""
+benchmarks.bench_balancer
+~~~~~~~~~~~~~~~~~~~~~~~~~~~
+
+Microbenchmark of the ``consistent-hash`` policy of :mod:`daemon.balancer`.
+
+For pools of growing size it reports:
+
+- the cost of one :meth:`acquire <daemon.balancer.Balancer.acquire>` /
+  ``release`` pair of the hash ring, next to round-robin for reference;
+- the share of 20000 session keys that change backend when one backend is
+  added to the pool, for the ring and for plain ``hash(key) % n``
+  (the ideal being ``1 / (n + 1)``);
+- the spread of the keys over the backends (largest share over smallest).
+
+Usage::
+
+  $ python benchmarks/bench_balancer.py
+"""
+
+import os
+import sys
+import timeit
+from collections import Counter
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import daemon.balancer
+from daemon.balancer import ConsistentHash, RoundRobin, Upstream, ring_hash
+
+#: Iterations of the timing loop.
+ROUNDS = 50000
+
+#: Backends in each pool measured.
+SIZES = (2, 4, 8, 16, 64)
+
+#: Session keys used for the remapping and spread figures.
+KEYS = ["sessionid={:032x}".format(ring_hash(str(i))) for i in range(20000)]
+
+
+def pool(count):
+    return [Upstream("10.0.0.{}".format(i), 9000) for i in range(count)]
+
+
+def modulo_owner(upstreams, key):
+    return upstreams[ring_hash(key) % len(upstreams)]
+
+
+def main():
+    # Keep console logging out of the measurement.
+    daemon.balancer.print = lambda *args, **kwargs: None
+
+    print("{:>8} {:>10} {:>10} {:>10} {:>10} {:>8} {:>8}".format(
+        "backends", "ring us", "rr us", "ring moved", "mod moved", "ideal", "spread"))
+    for size in SIZES:
+        ring = ConsistentHash(pool(size))
+        rr = RoundRobin(pool(size))
+        key = KEYS[0]
+
+        def pick(balancer):
+            balancer.release(balancer.acquire(key))
+
+        ring_us = timeit.timeit(lambda: pick(ring), number=ROUNDS) / ROUNDS * 1e6
+        rr_us = timeit.timeit(lambda: pick(rr), number=ROUNDS) / ROUNDS * 1e6
+
+        upstreams = ring.upstreams[:]
+        before = [ring.choose(k, ring.upstreams) for k in KEYS]
+        modulo_before = [modulo_owner(upstreams, k) for k in KEYS]
+        spread = Counter(before).values()
+
+        ring.add(Upstream("10.0.1.0", 9000))
+        grown = upstreams + [Upstream("10.0.1.0", 9000)]
+        moved = sum(a is not ring.choose(k, ring.upstreams)
+                    for a, k in zip(before, KEYS)) / len(KEYS)
+        modulo_moved = sum(a is not modulo_owner(grown, k)
+                           for a, k in zip(modulo_before, KEYS)) / len(KEYS)
+
+        print("{:>8} {:>10.2f} {:>10.2f} {:>10.1%} {:>10.1%} {:>8.1%} {:>8.2f}".format(
+            size, ring_us, rr_us, moved, modulo_moved, 1 / (size + 1),
+            max(spread) / min(spread)))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,126 @@
+#
+# Copyright (C) 2025 pdnguyen of HCMC University of Technology VNU-HCM.
+# All rights reserved.
+# This file is part of the CO3093/CO3094 course.
+#
+# WeApRous release
+#
+# The authors hereby grant to Licensee personal permission to use
+# and modify the Licensed Source Code for the sole purpose of studying
+# while attending the course
+#
+
+"""
+benchmarks.bench_memory
+~~~~~~~~~~~~~~~~~~~~~~~~~
+
+Memory held per in-flight request by the per-connection objects.
+
+It keeps :data:`CONNECTIONS` connections open at once, each the way the
+selector engine holds one while its request is being answered: a
+:class:`Connection <daemon.eventloop.Connection>` with its
+:class:`RequestReader <daemon.reader.RequestReader>`, an
+:class:`HttpAdapter <daemon.httpadapter.HttpAdapter>`, a prepared
+:class:`Request <daemon.request.Request>` and a fresh
+:class:`Response <daemon.response.Response>`. The run is repeated with
+copies of those classes built without ``__slots__`` (so every instance
+carries a ``__dict__``, as before) and the bytes allocated are measured
+with :mod:`tracemalloc`. Sockets are left out, they cost the same either way.
+
+Usage::
+
+  $ python benchmarks/bench_memory.py [connections]
+"""
+
+import os
+import sys
+import tracemalloc
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import daemon.request
+import daemon.response
+import daemon.httpadapter
+import daemon.eventloop
+from daemon.request import Request
+from daemon.response import Response
+from daemon.httpadapter import HttpAdapter
+from daemon.eventloop import Connection
+from daemon.reader import RequestReader
+from daemon.dictionary import CaseInsensitiveDict
+
+#: Concurrent connections held open.
+CONNECTIONS = 10000
+
+GET_REQUEST = (
+    b"GET /get-list HTTP/1.1\r\n"
+    b"Host: 127.0.0.1:8001\r\n"
+    b"Connection: keep-alive\r\n"
+    b"Accept: application/json\r\n"
+    b"Cookie: auth=true; sessionid=abc123def456\r\n"
+    b"\r\n"
+)
+
+#: Classes swapped for their dict-based copies.
+SLOTTED = (Request, Response, HttpAdapter, Connection, RequestReader, CaseInsensitiveDict)
+
+#: Modules whose globals refer to those classes.
+MODULES = (daemon.request, daemon.response, daemon.httpadapter, daemon.eventloop)
+
+
+def without_slots(cls):
+    """Copy of ``cls`` whose instances keep their attributes in a ``__dict__``."""
+    namespace = {name: value for name, value in vars(cls).items()
+                 if name not in cls.__slots__ and name != "__slots__"}
+    return type(cls.__name__, cls.__bases__, namespace)
+
+
+def swap_classes(replace):
+    """Points the daemon modules at the slotted or the dict-based classes."""
+    for cls in SLOTTED:
+        copy = without_slots(cls) if replace else cls
+        for module in MODULES:
+            if hasattr(module, cls.__name__):
+                setattr(module, cls.__name__, copy)
+
+
+def open_connections(count):
+    """Builds ``count`` connections, each with one request in flight."""
+    routes = {("GET", "/get-list"): lambda headers, body: "{}"}
+    connections = []
+    for i in range(count):
+        addr = ("10.0.{}.{}".format(i // 256 % 256, i % 256), 40000 + i % 20000)
+        adapter = daemon.httpadapter.HttpAdapter("0.0.0.0", 8001, None, addr, routes)
+        conn = daemon.eventloop.Connection(None, addr, adapter)
+        adapter.request.prepare(GET_REQUEST, routes)
+        adapter.response = daemon.response.Response()
+        connections.append(conn)
+    return connections
+
+
+def measure(count):
+    """Bytes allocated while ``count`` connections are held open."""
+    tracemalloc.start()
+    base = tracemalloc.get_traced_memory()[0]
+    connections = open_connections(count)
+    used = tracemalloc.get_traced_memory()[0] - base
+    tracemalloc.stop()
+    del connections
+    return used
+
+
+def main():
+    count = int(sys.argv[1]) if len(sys.argv) > 1 else CONNECTIONS
+    # Keep console logging out of the measurement.
+    daemon.request.print = lambda *args, **kwargs: None
+
+    print("{:<8} {:>12} {:>16}".format("layout", "total KiB", "bytes/request"))
+    for label, replace in (("dict", True), ("slots", False)):
+        swap_classes(replace)
+        used = measure(count)
+        print("{:<8} {:>12.0f} {:>16.0f}".format(label, used / 1024, used / count))
+    swap_classes(False)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,136 @@
+#
+# Copyright (C) 2025 pdnguyen of HCMC University of Technology VNU-HCM.
+# All rights reserved.
+# This file is part of the CO3093/CO3094 course.
+#
+# WeApRous release
+#
+# The authors hereby grant to Licensee personal permission to use
+# and modify the Licensed Source Code for the sole purpose of studying
+# while attending the course
+#
+
+"""
+benchmarks.bench_request_parse
+~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~
+
+Microbenchmark of :meth:`Request.prepare <daemon.request.Request.prepare>`.
+
+It compares the bytes-based single-pass parser against the previous
+``str`` parser (reproduced below as :func:`legacy_prepare`, including the
+whole-message ``decode`` the adapter used to do) on a browser-like GET and
+a JSON POST. ``lazy`` only prepares the request, as on the hot path of a
+route that reads nothing else; ``lazy+all`` also reads the headers, cookies
+and body. For each it reports the time per request and the peak memory
+allocated while parsing one request, measured with :mod:`tracemalloc`.
+
+Usage::
+
+  $ python benchmarks/bench_request_parse.py
+"""
+
+import os
+import sys
+import timeit
+import tracemalloc
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import daemon.request
+from daemon.request import Request
+from daemon.dictionary import CaseInsensitiveDict
+
+#: Iterations of the timing loop.
+ROUNDS = 20000
+
+GET_REQUEST = (
+    b"GET /get-list HTTP/1.1\r\n"
+    b"Host: 127.0.0.1:8001\r\n"
+    b"Connection: keep-alive\r\n"
+    b"User-Agent: Mozilla/5.0 (X11; Linux x86_64) AppleWebKit/537.36 Chrome/123.0.0.0\r\n"
+    b"Accept: application/json, text/plain, */*\r\n"
+    b"Accept-Encoding: gzip, deflate, br\r\n"
+    b"Accept-Language: en-US,en;q=0.9,vi;q=0.8\r\n"
+    b"Referer: http://127.0.0.1:8001/chat.html\r\n"
+    b"Origin: http://127.0.0.1:8001\r\n"
+    b"Cookie: auth=true; sessionid=abc123def456; username=admin\r\n"
+    b"\r\n"
+)
+
+POST_REQUEST = (
+    b"POST /submit-info HTTP/1.1\r\n"
+    b"Host: 127.0.0.1:8001\r\n"
+    b"Content-Type: application/json\r\n"
+    b"Cookie: auth=true; sessionid=abc123def456\r\n"
+    b"Content-Length: 2110\r\n"
+    b"\r\n"
+    + b'{"peer_id": "alice", "ip": "127.0.0.1", "port": 9101, "channels": ['
+    + b",".join(b'"channel-%03d"' % i for i in range(150))
+    + b"]}"
+)
+
+
+def legacy_prepare(msg):
+    """The ``str`` based parsing path used before the bytes parser."""
+    request = msg.decode()
+    lines = request.splitlines()
+    method, path, version = lines[0].split()
+    if "\r\n\r\n" in request:
+        raw_header, raw_body = request.split("\r\n\r\n", 1)
+    else:
+        raw_header, raw_body = request, ""
+    headers = {}
+    for line in raw_header.split("\r\n")[1:]:
+        if ": " in line:
+            key, val = line.split(": ", 1)
+            headers[key.lower()] = val
+    cookies = CaseInsensitiveDict()
+    raw_cookie = headers.get("cookie", "")
+    if raw_cookie:
+        for pair in raw_cookie.split(";"):
+            if "=" in pair:
+                k, v = pair.strip().split("=", 1)
+                cookies[k] = v
+    body = raw_body if method.upper() == "POST" else ""
+    return method, path, headers, cookies, body
+
+
+def current_prepare(msg, req=Request()):
+    """The bytes based :meth:`Request.prepare`, nothing else accessed."""
+    req.prepare(msg)
+    return req
+
+
+def current_prepare_all(msg, req=Request()):
+    """:meth:`Request.prepare` followed by reading every lazy attribute."""
+    req.prepare(msg)
+    return req.headers, req.cookies, req.body
+
+
+def peak_bytes(func, msg):
+    """Peak bytes allocated by one call of ``func(msg)``."""
+    func(msg)
+    tracemalloc.start()
+    tracemalloc.reset_peak()
+    base = tracemalloc.get_traced_memory()[0]
+    func(msg)
+    peak = tracemalloc.get_traced_memory()[1]
+    tracemalloc.stop()
+    return peak - base
+
+
+def main():
+    # Keep console logging out of the measurement.
+    daemon.request.print = lambda *args, **kwargs: None
+
+    print("{:<8} {:<9} {:>12} {:>14}".format("request", "parser", "us/request", "peak bytes"))
+    for name, msg in (("GET", GET_REQUEST), ("POST", POST_REQUEST)):
+        for label, func in (("legacy", legacy_prepare), ("lazy", current_prepare),
+                            ("lazy+all", current_prepare_all)):
+            seconds = timeit.timeit(lambda: func(msg), number=ROUNDS)
+            print("{:<8} {:<9} {:>12.2f} {:>14}".format(
+                name, label, seconds / ROUNDS * 1e6, peak_bytes(func, msg)))
+
+
+if __name__ == "__main__":
+    main()
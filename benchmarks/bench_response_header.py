@@ -0,0 +1,137 @@
+#
+# Copyright (C) 2025 pdnguyen of HCMC University of Technology VNU-HCM.
+# All rights reserved.
+# This file is part of the CO3093/CO3094 course.
+#
+# WeApRous release
+#
+# The authors hereby grant to Licensee personal permission to use
+# and modify the Licensed Source Code for the sole purpose of studying
+# while attending the course
+#
+
+"""
+benchmarks.bench_response_header
+~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~
+
+Microbenchmark of :meth:`Response.build_response_header
+<daemon.response.Response.build_response_header>`.
+
+It compares the header builder using the cached static header block and
+the once-per-second ``Date`` against the previous builder (reproduced
+below as :func:`legacy_build_response_header`), which filled a dict of
+twelve entries, formatted the date and joined ``str`` lines for every
+response. Both build the header of a CSS file and of a PNG image; the
+``none`` row is the cost of preparing the request alone.
+
+Usage::
+
+  $ python benchmarks/bench_response_header.py
+"""
+
+import os
+import sys
+import timeit
+import datetime
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import daemon.request
+from daemon.request import Request
+from daemon.response import Response
+
+#: Iterations of the timing loop.
+ROUNDS = 50000
+
+REQUEST = (
+    b"GET /css/styles.css HTTP/1.1\r\n"
+    b"Host: 127.0.0.1:8001\r\n"
+    b"Connection: keep-alive\r\n"
+    b"User-Agent: Mozilla/5.0 (X11; Linux x86_64) AppleWebKit/537.36 Chrome/123.0.0.0\r\n"
+    b"Accept: text/css,*/*;q=0.1\r\n"
+    b"Accept-Encoding: gzip, deflate, br\r\n"
+    b"Cookie: auth=true; sessionid=abc123def456\r\n"
+    b"\r\n"
+)
+
+
+def legacy_build_response_header(resp, request):
+    """The dict based header builder used before the cached header block."""
+    reqhdr = request.headers
+    rsphdr = resp.headers
+
+    status_code = resp.status_code if resp.status_code else 200
+    reason = resp.reason if resp.reason else "OK"
+
+    headers = {
+            "Accept": "{}".format(reqhdr.get("Accept", "application/json")),
+            "Accept-Language": "{}".format(reqhdr.get("Accept-Language", "en-US,en;q=0.9")),
+            "Authorization": "{}".format(reqhdr.get("Authorization", "Basic <credentials>")),
+            "Cache-Control": "{}".format(rsphdr.get("Cache-Control", "no-cache")),
+            "Content-Type": "{}".format(rsphdr['Content-Type']),
+            "Content-Length": "{}".format(resp.content_length()),
+            "Connection": "keep-alive" if resp.keep_alive else "close",
+            "Date": "{}".format(datetime.datetime.utcnow().strftime("%a, %d %b %Y %H:%M:%S GMT")),
+            "Max-Forward": "10",
+            "Proxy-Authorization": "Basic dXNlcjpwYXNz",
+            "Warning": "199 Miscellaneous warning",
+            "User-Agent": "{}".format(reqhdr.get("User-Agent", "Chrome/123.0.0.0")),
+        }
+
+    if headers["Cache-Control"] == "no-cache":
+        headers["Pragma"] = "no-cache"
+    for name in ("Accept-Ranges", "Content-Encoding", "Content-Range", "ETag",
+                 "Last-Modified", "Vary"):
+        if name in rsphdr:
+            headers[name] = rsphdr[name]
+
+    if resp.cookies:
+        cookie_parts = []
+        for k, v in resp.cookies.items():
+            cookie_parts.append("{}={}; Path=/; HttpOnly; Max-Age=3600".format(k, v))
+        if cookie_parts:
+            headers["Set-Cookie"] = cookie_parts[0]
+
+    header_lines = [f"HTTP/1.1 {status_code} {reason}"]
+    for key, value in headers.items():
+        header_lines.append(f"{key}: {value}")
+    return ("\r\n".join(header_lines) + "\r\n\r\n").encode("utf-8")
+
+
+def make_response(content_type, cache_control, length):
+    """A response ready for its header, as left by ``build_response``."""
+    resp = Response()
+    resp.keep_alive = True
+    resp.status_code = 200
+    resp.reason = "OK"
+    resp._content = b"x" * length
+    resp.headers["Content-Type"] = content_type
+    resp.headers["Cache-Control"] = cache_control
+    resp.headers["ETag"] = '"187dc039b0253600-87f"'
+    resp.headers["Last-Modified"] = "Wed, 03 Dec 2025 16:06:23 GMT"
+    resp.headers["Accept-Ranges"] = "bytes"
+    return resp
+
+
+def main():
+    # Keep console logging out of the measurement.
+    daemon.request.print = lambda *args, **kwargs: None
+
+    print("{:<12} {:<8} {:>12}".format("content", "builder", "us/header"))
+    for content_type, cache_control, length in (("text/css", "public, max-age=86400", 2175),
+                                                ("image/png", "public, max-age=86400", 48213)):
+        resp = make_response(content_type, cache_control, length)
+        for label, build in (("none", lambda resp, req: None),
+                             ("legacy", legacy_build_response_header),
+                             ("cached", Response.build_response_header)):
+            def run():
+                # A fresh request per response, as on a real connection.
+                req = Request()
+                req.prepare(REQUEST)
+                build(resp, req)
+            seconds = timeit.timeit(run, number=ROUNDS)
+            print("{:<12} {:<8} {:>12.2f}".format(content_type, label, seconds / ROUNDS * 1e6))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,108 @@
+#
+# Copyright (C) 2025 pdnguyen of HCMC University of Technology VNU-HCM.
+# All rights reserved.
+# This file is part of the CO3093/CO3094 course.
+#
+# WeApRous release
+#
+# The authors hereby grant to Licensee personal permission to use
+# and modify the Licensed Source Code for the sole purpose of studying
+# while attending the course
+#
+
+"""
+benchmarks.bench_router
+~~~~~~~~~~~~~~~~~~~~~~~~~
+
+Microbenchmark of :meth:`Router.match <daemon.router.Router.match>`.
+
+Route tables of growing size are built from a mix of literal and
+parameterized routes (``/api/v1/resN``, ``/api/v1/resN/<int:id>``,
+``/api/v1/resN/<int:id>/items/<name>``, ...). For each size it times
+matching a path of the first and of the last registered resource with
+the compiled tree (``tree``), and with a list of regular expressions
+scanned in order (``regex``), which is how parameters are commonly bolted
+onto a flat table. The exact ``(method, path)`` dict lookup used before
+the router (``dict``) is shown as the floor, next to the router matching
+the same literal path (``literal``); it cannot express parameters.
+
+Usage::
+
+  $ python benchmarks/bench_router.py
+"""
+
+import os
+import re
+import sys
+import timeit
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from daemon.router import Router
+
+#: Iterations of the timing loop.
+ROUNDS = 20000
+
+#: Number of routes of each table measured.
+SIZES = (20, 100, 400, 800)
+
+
+def handler(headers="guest", body="anonymous", **params):
+    return params
+
+
+def build_routes(count):
+    """``count`` routes over ``count // 4`` resources."""
+    routes = {}
+    for i in range(count // 4):
+        base = "/api/v1/res{}".format(i)
+        routes[("GET", base)] = handler
+        routes[("GET", base + "/<int:id>")] = handler
+        routes[("PUT", base + "/<int:id>")] = handler
+        routes[("GET", base + "/<int:id>/items/<name>")] = handler
+    return routes
+
+
+def regex_table(routes):
+    """The routes as (method, compiled regex, handler), scanned in order."""
+    table = []
+    for (method, path), func in routes.items():
+        pattern = re.sub(r"<(int:)?(\w+)>",
+                         lambda m: "(?P<{}>{})".format(m.group(2), r"\d+" if m.group(1) else "[^/]+"),
+                         path)
+        table.append((method, re.compile("^" + pattern + "$"), func))
+    return table
+
+
+def regex_match(table, method, path):
+    for route_method, regex, func in table:
+        if route_method == method:
+            match = regex.match(path)
+            if match:
+                return func, match.groupdict()
+    return None, None
+
+
+def main():
+    print("{:>6} {:<6} {:>12} {:>12} {:>12} {:>12}".format(
+        "routes", "target", "dict us", "regex us", "literal us", "tree us"))
+    for size in SIZES:
+        routes = build_routes(size)
+        router = Router(routes)
+        table = regex_table(routes)
+        last = size // 4 - 1
+        for label, index in (("first", 0), ("last", last)):
+            exact = "/api/v1/res{}".format(index)
+            path = "/api/v1/res{}/42/items/general".format(index)
+            timings = (
+                timeit.timeit(lambda: routes.get(("GET", exact)), number=ROUNDS),
+                timeit.timeit(lambda: regex_match(table, "GET", path), number=ROUNDS),
+                timeit.timeit(lambda: router.match("GET", exact), number=ROUNDS),
+                timeit.timeit(lambda: router.match("GET", path), number=ROUNDS),
+            )
+            print("{:>6} {:<6} {:>12.3f} {:>12.3f} {:>12.3f} {:>12.3f}".format(
+                size, label, *(t / ROUNDS * 1e6 for t in timings)))
+
+
+if __name__ == "__main__":
+    main()
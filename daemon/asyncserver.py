@@ -0,0 +1,137 @@
+#
+# Copyright (C) 2025 pdnguyen of HCMC University of Technology VNU-HCM.
+# All rights reserved.
+# This file is part of the CO3093/CO3094 course.
+#
+# WeApRous release
+#
+# The authors hereby grant to Licensee personal permission to use
+# and modify the Licensed Source Code for the sole purpose of studying
+# while attending the course
+#
+
+"""
+daemon.asyncserver
+~~~~~~~~~~~~~~~~~
+
+This module provides an asyncio based backend engine. Each client is served
+by a lightweight task instead of an OS thread, and route handlers declared
+with ``async def`` are awaited inside the request lifecycle, so they can do
+non-blocking I/O (e.g. notifying peers) while other requests progress.
+
+Notes:
+------
+- Plain (synchronous) handlers run in the loop's default thread pool
+  executor so a blocking handler does not stall the event loop.
+- Requests are framed by a :class:`RequestReader <daemon.reader.RequestReader>`
+  (``Content-Length`` or chunked bodies, bounded sizes), so several
+  requests can follow each other on a persistent connection.
+  Pipelined requests are read and answered one after the other, which keeps
+  the responses in request order; ``drain`` only waits when the transport's
+  write buffer is full, so back-to-back responses are not held up.
+- Large static files are sent with :meth:`loop.sendfile
+  <asyncio.AbstractEventLoop.sendfile>` (``os.sendfile`` under the hood).
+
+Usage Example:
+--------------
+>>> run_asyncio_backend("127.0.0.1", 9000, routes={})
+
+"""
+
+import asyncio
+
+from .httpadapter import HttpAdapter
+from .reader import RequestReader, RequestError, RECV_SIZE
+from .transmit import write_responses
+
+
+class AsyncServer:
+    """
+    HTTP server running every client connection as an asyncio task.
+
+    :attrs ip (str): IP address to bind the server.
+    :attrs port (int): Port number to listen on.
+    :attrs routes (dict): Dictionary of route handlers.
+    :attrs reuse_port (bool): Bind with ``SO_REUSEPORT`` (pre-forked workers).
+    """
+
+    def __init__(self, ip, port, routes, reuse_port=False):
+        self.ip = ip
+        self.port = port
+        self.routes = routes
+        self.reuse_port = reuse_port
+
+    async def serve_forever(self):
+        """
+        Binds the listening socket and serves clients until cancelled.
+        """
+        server = await asyncio.start_server(
+            self.handle_client, self.ip, self.port,
+            reuse_port=self.reuse_port or None)
+        print("[Backend] Listening on port {} (asyncio mode)".format(self.port))
+        if self.routes != {}:
+            print("[Backend] route settings {}".format(self.routes))
+
+        async with server:
+            await server.serve_forever()
+
+    async def handle_client(self, reader, writer):
+        """
+        Reads requests from the stream, dispatches them and writes the
+        responses for as long as the connection is kept alive.
+
+        :param reader (asyncio.StreamReader): client input stream.
+        :param writer (asyncio.StreamWriter): client output stream.
+        """
+        addr = writer.get_extra_info("peername")
+        adapter = HttpAdapter(self.ip, self.port, writer, addr, self.routes)
+
+        framer = RequestReader()
+
+        try:
+            while True:
+                try:
+                    msg = framer.next_message()
+                except RequestError as e:
+                    adapter.keep_alive = False
+                    writer.write(adapter.build_error_response(e.status_code, e.reason))
+                    await writer.drain()
+                    break
+
+                if msg is None:
+                    data = await asyncio.wait_for(
+                        reader.read(RECV_SIZE), adapter.keepalive_timeout)
+                    if not data:
+                        break
+                    framer.feed(data)
+                    continue
+
+                response = await adapter.handle_request_async(msg, self.routes)
+                await write_responses(writer, [response])
+                if not adapter.keep_alive:
+                    break
+        except asyncio.TimeoutError:
+            pass
+        except Exception as e:
+            print("[Backend] Error serving {}: {}".format(addr, e))
+        finally:
+            writer.close()
+            try:
+                await writer.wait_closed()
+            except ConnectionError:
+                pass
+
+
+def run_asyncio_backend(ip, port, routes, reuse_port=False):
+    """
+    Starts the asyncio backend server.
+
+    :param ip (str): IP address to bind the server.
+    :param port (int): Port number to listen on.
+    :param routes (dict): Dictionary of route handlers.
+    :param reuse_port (bool): Bind with ``SO_REUSEPORT`` (pre-forked workers).
+    """
+    try:
+        asyncio.run(AsyncServer(ip, port, routes, reuse_port).serve_forever())
+    except OSError as e:
+        print("Socket error: {}".format(e))
@@ -30,25 +30,58 @@ Requirements:
 
 Notes:
 ------
-- The server create daemon threads for client handling.
+- The server create daemon threads for client handling. In the default
+  ``thread`` mode one thread is spawned per accepted connection; in the
+  ``pool`` mode a fixed set of worker threads is fed by a bounded accept
+  queue and connections arriving while the queue is full are rejected
+  with ``503 Service Unavailable``. An idle keep-alive connection gives
+  its worker back as soon as other connections are queued. The ``selector`` mode hands the
+  listening port to the single-threaded event loop in :mod:`daemon.eventloop`,
+  and the ``asyncio`` mode to the asyncio server in :mod:`daemon.asyncserver`.
+- With ``workers > 1`` the chosen mode runs in that many pre-forked processes
+  sharing the port through ``SO_REUSEPORT`` (see :mod:`daemon.prefork`).
 - The current implementation error handling is minimal, socket errors are printed to the console.
 - The actual request processing is delegated to the HttpAdapter class.
 
 Usage Example:
 --------------
 >>> create_backend("127.0.0.1", 9000, routes={})
+>>> create_backend("127.0.0.1", 9000, routes={}, mode="pool", pool_size=16)
+>>> create_backend("0.0.0.0", 9000, routes={}, mode="selector", workers=4)
 
 """
 
 import socket
 import threading
 import argparse
+import queue
 
 from .response import *
 from .httpadapter import HttpAdapter
+from .eventloop import run_selector_backend
+from .asyncserver import run_asyncio_backend
+from .prefork import create_listener, run_prefork
+from .router import compile_routes
 from .dictionary import CaseInsensitiveDict
 
-def handle_client(ip, port, conn, addr, routes):
+#: Number of worker threads started in ``pool`` mode.
+POOL_SIZE = 32
+
+#: Maximum number of accepted connections waiting for a pool worker.
+QUEUE_SIZE = 128
+
+#: Response sent to a client that cannot be queued in ``pool`` mode.
+SERVICE_UNAVAILABLE = (
+    "HTTP/1.1 503 Service Unavailable\r\n"
+    "Content-Type: text/plain\r\n"
+    "Content-Length: 19\r\n"
+    "Retry-After: 1\r\n"
+    "Connection: close\r\n"
+    "\r\n"
+    "Service Unavailable"
+).encode('utf-8')
+
+def handle_client(ip, port, conn, addr, routes, yield_idle=None):
     """
     Initializes an HttpAdapter instance and delegates the client handling logic to it.
 
@@ -57,34 +90,154 @@ def handle_client(ip, port, conn, addr, routes):
     :param conn (socket.socket): Client connection socket.
     :param addr (tuple): client address (IP, port).
     :param routes (dict): Dictionary of route handlers.
+    :param yield_idle (callable): tells an idle keep-alive connection to
+                                  close (see :class:`HttpAdapter`).
     """
     daemon = HttpAdapter(ip, port, conn, addr, routes)
+    daemon.yield_idle = yield_idle
 
     # Handle client
     daemon.handle_client(conn, addr, routes)
 
-def run_backend(ip, port, routes):
+
+class WorkerPool:
+    """
+    A fixed set of worker threads consuming accepted connections from a
+    bounded queue.
+
+    The pool caps the number of OS threads (and their stacks) regardless of
+    how many clients connect at once. When every worker is busy and the
+    queue is full, :meth:`submit` refuses the connection instead of letting
+    the backlog grow without bound. A worker holding an idle keep-alive
+    connection closes it once connections are queued (:meth:`has_waiting`),
+    so idle clients cannot starve the pool.
+
+    :attrs ip (str): IP address of the server.
+    :attrs port (int): Port number the server is listening on.
+    :attrs routes (dict): Dictionary of route handlers.
+    :attrs size (int): Number of worker threads.
+    :attrs queue (queue.Queue): Bounded queue of pending ``(conn, addr)`` pairs.
+    """
+
+    def __init__(self, ip, port, routes, size=POOL_SIZE, queue_size=QUEUE_SIZE):
+        self.ip = ip
+        self.port = port
+        self.routes = routes
+        self.size = size
+        self.queue = queue.Queue(maxsize=queue_size)
+        self.workers = []
+
+    def start(self):
+        """Spawns the daemon worker threads."""
+        for i in range(self.size):
+            worker = threading.Thread(
+                target=self.work,
+                name="backend-worker-{}".format(i)
+            )
+            worker.daemon = True
+            worker.start()
+            self.workers.append(worker)
+
+    def work(self):
+        """Worker loop: serves queued connections one at a time, forever."""
+        while True:
+            conn, addr = self.queue.get()
+            try:
+                handle_client(self.ip, self.port, conn, addr, self.routes,
+                              self.has_waiting)
+            except Exception as e:
+                print("[Backend] Worker error for {}: {}".format(addr, e))
+                conn.close()
+            finally:
+                self.queue.task_done()
+
+    def has_waiting(self):
+        """
+        Tells whether accepted connections are waiting for a worker.
+
+        :rtype bool: ``True`` if the queue is not empty.
+        """
+        return not self.queue.empty()
+
+    def submit(self, conn, addr):
+        """
+        Queues an accepted connection for the workers.
+
+        :param conn (socket.socket): Client connection socket.
+        :param addr (tuple): client address (IP, port).
+
+        :rtype bool: ``False`` if the queue was full and the client was rejected.
+        """
+        try:
+            self.queue.put_nowait((conn, addr))
+        except queue.Full:
+            reject_client(conn, addr)
+            return False
+        return True
+
+
+def reject_client(conn, addr):
+    """
+    Answers an overflowing connection with ``503 Service Unavailable``.
+
+    :param conn (socket.socket): Client connection socket.
+    :param addr (tuple): client address (IP, port).
+    """
+    print("[Backend] Queue full, rejecting {}".format(addr))
+    try:
+        conn.sendall(SERVICE_UNAVAILABLE)
+        conn.shutdown(socket.SHUT_WR)
+    except socket.error:
+        pass
+    finally:
+        conn.close()
+
+
+def run_backend(ip, port, routes, mode="thread", pool_size=POOL_SIZE,
+                queue_size=QUEUE_SIZE, reuse_port=False):
     """
     Starts the backend server, binds to the specified IP and port, and listens for incoming
     connections. Each connection is handled in a separate thread. The backend accepts incoming
-    connections and spawns a thread for each client.
+    connections and spawns a thread for each client, or, in ``pool`` mode, hands it to
+    a :class:`WorkerPool <WorkerPool>`. The ``selector`` and ``asyncio`` modes serve
+    every client from one event loop thread instead.
 
 
     :param ip (str): IP address to bind the server.
     :param port (int): Port number to listen on.
     :param routes (dict): Dictionary of route handlers.
+    :param mode (str): ``"thread"`` (thread per connection), ``"pool"``, ``"selector"``
+                       or ``"asyncio"``.
+    :param pool_size (int): Number of worker threads in ``pool`` mode.
+    :param queue_size (int): Pending connections allowed in ``pool`` mode.
+    :param reuse_port (bool): Bind with ``SO_REUSEPORT`` (pre-forked workers).
     """
-    server = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
+    if mode not in ("thread", "pool", "selector", "asyncio"):
+        raise ValueError("Unknown backend mode: {}".format(mode))
+
+    if mode == "selector":
+        run_selector_backend(ip, port, routes, reuse_port)
+        return
+    if mode == "asyncio":
+        run_asyncio_backend(ip, port, routes, reuse_port)
+        return
+
+    pool = None
+    if mode == "pool":
+        pool = WorkerPool(ip, port, routes, pool_size, queue_size)
+        pool.start()
 
     try:
-        server.bind((ip, port))
-        server.listen(50)
-        print("[Backend] Listening on port {}".format(port))
+        server = create_listener(ip, port, reuse_port=reuse_port)
+        print("[Backend] Listening on port {} ({} mode)".format(port, mode))
         if routes != {}:
             print("[Backend] route settings {}".format(routes))
 
         while True:
             conn, addr = server.accept()
+            if pool:
+                pool.submit(conn, addr)
+                continue
             #
             #  TODO: implement the step of the client incomping connection
             #        using multi-thread programming with the
@@ -99,13 +252,26 @@ def run_backend(ip, port, routes):
     except socket.error as e:
       print("Socket error: {}".format(e))
 
-def create_backend(ip, port, routes={}):
+def create_backend(ip, port, routes={}, mode="thread", pool_size=POOL_SIZE,
+                   queue_size=QUEUE_SIZE, workers=1):
     """
     Entry point for creating and running the backend server.
 
     :param ip (str): IP address to bind the server.
     :param port (int): Port number to listen on.
     :param routes (dict, optional): Dictionary of route handlers. Defaults to empty dict.
+    :param mode (str, optional): ``"thread"`` (default), ``"pool"``, ``"selector"``
+                                 or ``"asyncio"``.
+    :param pool_size (int, optional): Number of worker threads in ``pool`` mode.
+    :param queue_size (int, optional): Pending connections allowed in ``pool`` mode.
+    :param workers (int, optional): Number of pre-forked server processes. Defaults to 1.
     """
+    routes = compile_routes(routes)
+
+    if workers > 1:
+        run_prefork(run_backend,
+                    (ip, port, routes, mode, pool_size, queue_size, True),
+                    workers)
+        return
 
-    run_backend(ip, port, routes)
\ No newline at end of file
+    run_backend(ip, port, routes, mode, pool_size, queue_size)
\ No newline at end of file
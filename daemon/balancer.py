@@ -0,0 +1,432 @@
+#
+# Copyright (C) 2025 pdnguyen of HCMC University of Technology VNU-HCM.
+# All rights reserved.
+# This file is part of the CO3093/CO3094 course.
+#
+# WeApRous release
+#
+# The authors hereby grant to Licensee personal permission to use
+# and modify the Licensed Source Code for the sole purpose of studying
+# while attending the course
+#
+
+"""
+daemon.balancer
+~~~~~~~~~~~~~~~~~
+
+This module provides the load-balancing policies the proxy applies to a
+virtual host with several ``proxy_pass`` backends (``dist_policy`` in
+``config/proxy.conf``):
+
+- ``round-robin``: each backend in turn;
+- ``weighted-round-robin``: each backend in proportion to its ``weight``,
+  interleaved (the "smooth" weighted round-robin of nginx, so a heavy
+  backend does not get its share in one burst);
+- ``least-conn``: the backend with the fewest requests in flight, relative
+  to its weight;
+- ``random-two``: the less loaded of two backends picked at random
+  ("power of two choices"), nearly as good as ``least-conn`` without
+  every request looking at every backend;
+- ``consistent-hash``: sticky sessions; the request's session cookie (or
+  else the client IP) is hashed onto a ring of virtual nodes, so one
+  session keeps hitting the backend holding its in-memory state, and
+  adding or removing a backend only moves the sessions of that backend's
+  share of the ring.
+
+A backend is written ``host:port``, optionally followed by ``weight=N``
+(default 1). Balancers keep their state per virtual host and are shared
+by the proxy threads; requests in flight are counted between
+:meth:`Balancer.acquire` and :meth:`Balancer.release`.
+
+Every policy only picks among the available backends: those the active
+health checks (:mod:`daemon.health`) have not marked down, and that have
+not been ejected for ``fail_timeout`` seconds after ``max_fails``
+consecutive failed requests (:meth:`Balancer.report`). When no backend
+is available, all are tried rather than none.
+
+Usage::
+
+  >>> balancer = get_balancer("app2.local", ["10.0.0.1:9002 weight=3", "10.0.0.2:9002"],
+  ...                         "weighted-round-robin")
+  >>> upstream = balancer.acquire()
+  >>> upstream.host, upstream.port
+  ('10.0.0.1', 9002)
+  >>> balancer.release(upstream)
+"""
+
+import time
+import bisect
+import hashlib
+import random
+import threading
+
+#: Consecutive failed requests ejecting a backend (``max_fails``).
+MAX_FAILS = 3
+
+#: Seconds an ejected backend is left out (``fail_timeout``).
+FAIL_TIMEOUT = 10.0
+
+
+class Upstream:
+    """
+    One backend of a balanced virtual host.
+
+    :attrs host (str): backend IP address.
+    :attrs port (int): backend port.
+    :attrs weight (int): relative share of the requests.
+    :attrs active (int): requests in flight.
+    :attrs current (int): running weight of the smooth weighted round-robin.
+    :attrs healthy (bool): verdict of the active health checks.
+    :attrs fails (int): consecutive failed requests.
+    :attrs down_until (float): monotonic time a passive ejection ends.
+    """
+
+    __slots__ = ("host", "port", "weight", "active", "current",
+                 "healthy", "fails", "down_until")
+
+    def __init__(self, host, port, weight=1):
+        self.host = host
+        self.port = port
+        self.weight = weight
+        self.active = 0
+        self.current = 0
+        self.healthy = True
+        self.fails = 0
+        self.down_until = 0.0
+
+    def __repr__(self):
+        return "<Upstream {}:{} weight={} active={}{}>".format(
+            self.host, self.port, self.weight, self.active,
+            "" if self.available(time.monotonic()) else " down")
+
+    def available(self, now):
+        """Tells whether the backend may take requests at time ``now``."""
+        return self.healthy and self.down_until <= now
+
+    @property
+    def load(self):
+        """Requests in flight per unit of weight."""
+        return self.active / self.weight
+
+
+def parse_upstream(entry):
+    """
+    Parses a backend entry of a virtual host.
+
+    :param entry (str): ``host:port``, optionally followed by ``weight=N``.
+
+    :rtype Upstream: the backend.
+
+    :raises ValueError: on a malformed port or weight.
+    """
+    address, *options = entry.split()
+    host, _, port = address.rpartition(":")
+    weight = 1
+    for option in options:
+        name, _, value = option.partition("=")
+        if name == "weight":
+            weight = int(value)
+            if weight < 1:
+                raise ValueError("weight must be positive in {!r}".format(entry))
+    return Upstream(host, int(port), weight)
+
+
+#: Cookies identifying a session for ``consistent-hash``, by preference.
+STICKY_COOKIES = ("sessionid", "auth")
+
+#: Virtual nodes per unit of weight on the ``consistent-hash`` ring.
+VIRTUAL_NODES = 160
+
+
+def sticky_key(cookie_header, client_ip):
+    """
+    Picks what a ``consistent-hash`` balancer hashes for a request.
+
+    :param cookie_header (str): the request's ``Cookie`` header, or ``""``.
+    :param client_ip (str): the client address.
+
+    :rtype str: the first :data:`STICKY_COOKIES` cookie carrying a session
+                value (bare ``true``/``false`` flags such as ``auth=true``
+                do not), else the client IP.
+    """
+    if cookie_header:
+        cookies = {}
+        for pair in cookie_header.split(";"):
+            name, sep, value = pair.partition("=")
+            if sep:
+                cookies[name.strip()] = value.strip()
+        for name in STICKY_COOKIES:
+            value = cookies.get(name)
+            if value and value.lower() not in ("true", "false"):
+                return "{}={}".format(name, value)
+    return client_ip
+
+
+def ring_hash(key):
+    """
+    Hashes a key onto the ring, identically in every process (unlike
+    :func:`hash`, which is salted per interpreter).
+
+    :param key (str): the key.
+
+    :rtype int: a 64-bit position on the ring.
+    """
+    return int.from_bytes(hashlib.md5(key.encode("utf-8")).digest()[:8], "big")
+
+
+class Balancer:
+    """
+    Base of the policies: keeps the backends, their in-flight counts and
+    their passive health.
+
+    :attrs upstreams (list): the :class:`Upstream` backends.
+    :attrs max_fails (int): consecutive failures ejecting a backend.
+    :attrs fail_timeout (float): seconds an ejected backend is left out.
+    :attrs lock (threading.Lock): guards the balancer state.
+    """
+
+    def __init__(self, upstreams, max_fails=MAX_FAILS, fail_timeout=FAIL_TIMEOUT):
+        self.upstreams = list(upstreams)
+        self.max_fails = max_fails
+        self.fail_timeout = fail_timeout
+        self.lock = threading.Lock()
+
+    def __repr__(self):
+        return "<{} {}>".format(type(self).__name__, self.upstreams)
+
+    def choose(self, key, candidates):
+        """
+        Picks the next backend; called with :attr:`lock` held.
+
+        :param key (str): the request's sticky key, or ``None``.
+        :param candidates (list): the backends to pick from, never empty.
+        """
+        raise NotImplementedError
+
+    def candidates(self, exclude=()):
+        """
+        Lists the backends a request may go to.
+
+        :param exclude (list): backends already tried by this request.
+
+        :rtype list: the available backends not excluded; if none is
+                     available, every backend not excluded.
+        """
+        now = time.monotonic()
+        upstreams = [upstream for upstream in self.upstreams if upstream not in exclude]
+        return [upstream for upstream in upstreams if upstream.available(now)] or upstreams
+
+    def acquire(self, key=None, exclude=()):
+        """
+        Picks a backend for one request and counts it in flight.
+
+        :param key (str): the request's :func:`sticky_key`, used by
+                          ``consistent-hash`` only.
+        :param exclude (list): backends already tried by this request.
+
+        :rtype Upstream: the backend, or ``None`` if every one was excluded.
+        """
+        with self.lock:
+            candidates = self.candidates(exclude)
+            if not candidates:
+                return None
+            upstream = self.choose(key, candidates)
+            upstream.active += 1
+        return upstream
+
+    def report(self, upstream, ok):
+        """
+        Records the outcome of a request (passive health check).
+
+        :param upstream (Upstream): the backend it went to.
+        :param ok (bool): whether the backend answered.
+        """
+        with self.lock:
+            if ok:
+                upstream.fails = 0
+                return
+            upstream.fails += 1
+            if upstream.fails >= self.max_fails:
+                upstream.fails = 0
+                upstream.down_until = time.monotonic() + self.fail_timeout
+                print("[Balancer] {}:{} ejected for {}s after {} failures".format(
+                    upstream.host, upstream.port, self.fail_timeout, self.max_fails))
+
+    def release(self, upstream):
+        """
+        Marks a request picked by :meth:`acquire` finished.
+
+        :param upstream (Upstream): the backend it went to.
+        """
+        with self.lock:
+            upstream.active -= 1
+
+
+class RoundRobin(Balancer):
+    """Each backend in turn, ignoring weights."""
+
+    def __init__(self, upstreams, **options):
+        Balancer.__init__(self, upstreams, **options)
+        self.next = 0
+
+    def choose(self, key, candidates):
+        upstream = candidates[self.next % len(candidates)]
+        self.next += 1
+        return upstream
+
+
+class WeightedRoundRobin(Balancer):
+    """
+    Smooth weighted round-robin: every pick adds each backend's weight to
+    its running weight, takes the largest and subtracts the total weight
+    from it. Weights 5, 1, 1 give ``a a b a c a a`` rather than
+    ``a a a a a b c``.
+    """
+
+    def choose(self, key, candidates):
+        total = 0
+        best = None
+        for upstream in candidates:
+            upstream.current += upstream.weight
+            total += upstream.weight
+            if best is None or upstream.current > best.current:
+                best = upstream
+        best.current -= total
+        return best
+
+
+class LeastConnections(Balancer):
+    """The backend with the fewest requests in flight per unit of weight;
+    ties go round-robin so an idle pool still spreads."""
+
+    def __init__(self, upstreams, **options):
+        Balancer.__init__(self, upstreams, **options)
+        self.next = 0
+
+    def choose(self, key, candidates):
+        count = len(candidates)
+        start = self.next % count
+        self.next = start + 1
+        best = None
+        for i in range(count):
+            upstream = candidates[(start + i) % count]
+            if best is None or upstream.load < best.load:
+                best = upstream
+        return best
+
+
+class RandomTwoChoices(Balancer):
+    """The less loaded of two distinct backends picked at random."""
+
+    def choose(self, key, candidates):
+        if len(candidates) == 1:
+            return candidates[0]
+        first, second = random.sample(candidates, 2)
+        return first if first.load <= second.load else second
+
+
+class ConsistentHash(Balancer):
+    """
+    Hash ring: every backend owns ``VIRTUAL_NODES * weight`` points, and a
+    key goes to the owner of the first point at or after its hash. The
+    many points per backend even out the share of each, and adding or
+    removing a backend only reassigns the keys falling next to its points.
+    A key whose backend is unavailable goes to the next available owner
+    along the ring, and returns once its backend is back.
+
+    :attrs points (list): sorted ring positions.
+    :attrs owners (list): the backend owning each position of :attr:`points`.
+    """
+
+    def __init__(self, upstreams, **options):
+        Balancer.__init__(self, upstreams, **options)
+        self.points = []
+        self.owners = []
+        self.build()
+
+    def build(self):
+        """Rebuilds the ring from :attr:`upstreams`."""
+        ring = []
+        for upstream in self.upstreams:
+            name = "{}:{}".format(upstream.host, upstream.port)
+            for i in range(VIRTUAL_NODES * upstream.weight):
+                ring.append((ring_hash("{}#{}".format(name, i)), name, upstream))
+        ring.sort(key=lambda point: point[:2])
+        self.points = [point[0] for point in ring]
+        self.owners = [point[2] for point in ring]
+
+    def add(self, upstream):
+        """Adds a backend to the ring."""
+        with self.lock:
+            self.upstreams.append(upstream)
+            self.build()
+
+    def remove(self, upstream):
+        """Removes a backend from the ring; its keys move to their next owners."""
+        with self.lock:
+            self.upstreams.remove(upstream)
+            self.build()
+
+    def choose(self, key, candidates):
+        if key is None:
+            return random.choice(candidates)
+        index = bisect.bisect_left(self.points, ring_hash(key))
+        if index == len(self.points):
+            index = 0
+        owner = self.owners[index]
+        if len(candidates) == len(self.upstreams):
+            return owner
+        for i in range(index, index + len(self.owners)):
+            owner = self.owners[i % len(self.owners)]
+            if owner in candidates:
+                return owner
+        return candidates[0]
+
+
+#: ``dist_policy`` name -> balancer class.
+POLICIES = {
+    "round-robin": RoundRobin,
+    "weighted-round-robin": WeightedRoundRobin,
+    "least-conn": LeastConnections,
+    "random-two": RandomTwoChoices,
+    "consistent-hash": ConsistentHash,
+}
+
+#: Policy used when ``dist_policy`` is absent or unknown.
+DEFAULT_POLICY = "round-robin"
+
+#: Virtual host -> its balancer, built on first request.
+_balancers = {}
+_balancers_lock = threading.Lock()
+
+
+def get_balancer(hostname, proxy_map, policy, options=None):
+    """
+    Returns the balancer of a virtual host, building it on first use.
+
+    :param hostname (str): the virtual host.
+    :param proxy_map (list): its backend entries, see :func:`parse_upstream`.
+    :param policy (str): its ``dist_policy``.
+    :param options (dict): its ``max_fails`` and ``fail_timeout``, if set.
+
+    :rtype Balancer: the balancer, shared by every request to ``hostname``.
+    """
+    balancer = _balancers.get(hostname)
+    if balancer is not None:
+        return balancer
+
+    options = options or {}
+    with _balancers_lock:
+        balancer = _balancers.get(hostname)
+        if balancer is None:
+            if policy not in POLICIES:
+                print("[Balancer] Unknown dist_policy {!r} for {}, using {}".format(
+                    policy, hostname, DEFAULT_POLICY))
+                policy = DEFAULT_POLICY
+            upstreams = [parse_upstream(entry) for entry in proxy_map]
+            balancer = _balancers[hostname] = POLICIES[policy](
+                upstreams,
+                max_fails=int(options.get("max_fails", MAX_FAILS)),
+                fail_timeout=float(options.get("fail_timeout", FAIL_TIMEOUT)))
+            print("[Balancer] {} -> {}".format(hostname, balancer))
+    return balancer
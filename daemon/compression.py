@@ -0,0 +1,110 @@
+#
+# Copyright (C) 2025 pdnguyen of HCMC University of Technology VNU-HCM.
+# All rights reserved.
+# This file is part of the CO3093/CO3094 course.
+#
+# WeApRous release
+#
+# The authors hereby grant to Licensee personal permission to use
+# and modify the Licensed Source Code for the sole purpose of studying
+# while attending the course
+#
+
+"""
+daemon.compression
+~~~~~~~~~~~~~~~~~
+
+This module provides the ``Content-Encoding`` negotiation shared by the
+static file responses and the route handler responses.
+
+The client's ``Accept-Encoding`` header picks ``gzip`` or ``deflate``
+(``gzip`` wins a tie); text-like content types of at least
+:data:`MIN_COMPRESS_SIZE` bytes are compressed, everything else (images,
+media, tiny bodies) is sent as is.
+
+Usage::
+
+  >>> choose_encoding("gzip, deflate, br")
+  'gzip'
+  >>> body = compress(b"...", "gzip")
+"""
+
+import gzip
+import zlib
+
+#: Bodies shorter than this are not worth compressing.
+MIN_COMPRESS_SIZE = 1024
+
+#: zlib compression level (1 fastest .. 9 smallest).
+COMPRESS_LEVEL = 6
+
+#: Encodings the server produces, in order of preference.
+SUPPORTED_ENCODINGS = ("gzip", "deflate")
+
+#: Content types (prefixes) that compress well.
+COMPRESSIBLE_TYPES = (
+    "text/",
+    "application/json",
+    "application/javascript",
+    "application/xml",
+    "image/svg+xml",
+)
+
+
+def is_compressible(content_type, length):
+    """
+    Tells whether a body is worth compressing.
+
+    :param content_type (str): the ``Content-Type`` of the body.
+    :param length (int): the body length, in bytes.
+
+    :rtype bool: ``True`` for text-like bodies of at least :data:`MIN_COMPRESS_SIZE`.
+    """
+    return length >= MIN_COMPRESS_SIZE and content_type.startswith(COMPRESSIBLE_TYPES)
+
+
+def choose_encoding(accept_encoding):
+    """
+    Picks the content coding to apply from an ``Accept-Encoding`` header.
+
+    :param accept_encoding (str): the header value, e.g. ``gzip;q=1.0, *;q=0``.
+
+    :rtype str: ``"gzip"``, ``"deflate"``, or ``None`` for the identity coding.
+    """
+    if not accept_encoding:
+        return None
+
+    weights = {}
+    for item in accept_encoding.split(","):
+        coding, _, params = item.partition(";")
+        coding = coding.strip().lower()
+        weight = 1.0
+        params = params.strip()
+        if params.startswith("q="):
+            try:
+                weight = float(params[2:])
+            except ValueError:
+                weight = 0.0
+        weights[coding] = weight
+
+    best, best_weight = None, 0.0
+    for coding in SUPPORTED_ENCODINGS:
+        weight = weights.get(coding, weights.get("*", 0.0))
+        if weight > best_weight:
+            best, best_weight = coding, weight
+    return best
+
+
+def compress(data, encoding):
+    """
+    Compresses a body with the given content coding.
+
+    :param data (bytes): the body.
+    :param encoding (str): ``"gzip"`` or ``"deflate"``.
+
+    :rtype bytes: the encoded body.
+    """
+    if encoding == "gzip":
+        # mtime=0 keeps the output, and so its ETag, stable across runs.
+        return gzip.compress(data, COMPRESS_LEVEL, mtime=0)
+    return zlib.compress(data, COMPRESS_LEVEL)
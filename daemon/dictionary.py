@@ -35,6 +35,8 @@ class CaseInsensitiveDict(MutableMapping):
 
     """
 
+    __slots__ = ("store",)
+
     def __init__(self, *args, **kwargs):
         self.store = {k.lower(): v for k, v in dict(*args, **kwargs).items()}
 
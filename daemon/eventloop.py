@@ -0,0 +1,292 @@
+#
+# Copyright (C) 2025 pdnguyen of HCMC University of Technology VNU-HCM.
+# All rights reserved.
+# This file is part of the CO3093/CO3094 course.
+#
+# WeApRous release
+#
+# The authors hereby grant to Licensee personal permission to use
+# and modify the Licensed Source Code for the sole purpose of studying
+# while attending the course
+#
+
+"""
+daemon.eventloop
+~~~~~~~~~~~~~~~~~
+
+This module provides an event-driven backend engine built on the
+:mod:`selectors` module (epoll on Linux, kqueue/select elsewhere).
+
+A single thread multiplexes every client socket: bytes are read without
+blocking until a full request has been buffered, the request is run through
+:meth:`HttpAdapter.handle_request <HttpAdapter.handle_request>`, and the
+response is written back as the socket becomes writable. Compared with one
+thread per connection this keeps memory flat and avoids context switches
+for workloads made of many small requests.
+
+Notes:
+------
+- Route handlers run on the loop thread, so a slow handler delays every
+  other client. The engine suits handlers that answer from memory.
+- Pipelined requests buffered together are answered in order and their
+  responses written back as one batch.
+- Large static files are written with non-blocking ``sendfile`` calls as
+  the socket becomes writable, interleaved with the other clients.
+- Streamed (chunked) handler responses are pulled one chunk at a time,
+  only once the previous chunk has been written, so a slow client holds
+  at most one chunk in memory. The iterator runs on the loop thread.
+- Persistent connections go back to waiting for a request once their
+  response is written; idle ones are closed after
+  :data:`KEEPALIVE_TIMEOUT <daemon.httpadapter.KEEPALIVE_TIMEOUT>` seconds.
+- One loop uses one core; pass ``workers=N`` to :func:`create_backend
+  <daemon.backend.create_backend>` to run one loop per core.
+
+Usage Example:
+--------------
+>>> run_selector_backend("127.0.0.1", 9000, routes={})
+
+"""
+
+import time
+import socket
+import selectors
+from collections import deque
+
+from .httpadapter import HttpAdapter
+from .prefork import create_listener
+from .reader import RequestReader
+from .transmit import FileRegion, ChunkedStream, flatten, close_parts
+
+#: Seconds between two sweeps for idle persistent connections.
+SWEEP_INTERVAL = 1.0
+
+
+class Connection:
+    """
+    Per-client state tracked by the :class:`EventLoopServer <EventLoopServer>`.
+
+    :attrs sock (socket.socket): Non-blocking client socket.
+    :attrs addr (tuple): client address (IP, port).
+    :attrs reader (RequestReader): framer of the bytes received but not yet parsed.
+    :attrs outbuf (deque): response parts not yet written: ``memoryview``,
+                           :class:`FileRegion <daemon.transmit.FileRegion>` or
+                           :class:`ChunkedStream <daemon.transmit.ChunkedStream>`.
+    :attrs adapter (HttpAdapter): adapter processing this client's request.
+    :attrs last_active (float): monotonic time of the last read or write.
+    """
+
+    __slots__ = ("sock", "addr", "reader", "outbuf", "adapter", "last_active")
+
+    def __init__(self, sock, addr, adapter):
+        self.sock = sock
+        self.addr = addr
+        self.reader = RequestReader()
+        self.outbuf = None
+        self.adapter = adapter
+        self.last_active = time.monotonic()
+
+
+class EventLoopServer:
+    """
+    Single-threaded HTTP server multiplexing client sockets with a selector.
+
+    :attrs ip (str): IP address to bind the server.
+    :attrs port (int): Port number to listen on.
+    :attrs routes (dict): Dictionary of route handlers.
+    :attrs reuse_port (bool): Bind with ``SO_REUSEPORT`` (pre-forked workers).
+    :attrs selector (selectors.BaseSelector): readiness notification backend.
+    :attrs clients (dict): open client sockets mapped to their :class:`Connection`.
+    """
+
+    def __init__(self, ip, port, routes, reuse_port=False):
+        self.ip = ip
+        self.port = port
+        self.routes = routes
+        self.reuse_port = reuse_port
+        self.selector = selectors.DefaultSelector()
+        self.clients = {}
+
+    def serve_forever(self):
+        """
+        Binds the listening socket and runs the event loop.
+        """
+        server = None
+
+        try:
+            server = create_listener(self.ip, self.port, reuse_port=self.reuse_port)
+            server.setblocking(False)
+            self.selector.register(server, selectors.EVENT_READ, None)
+            print("[Backend] Listening on port {} (selector mode, {})".format(
+                self.port, type(self.selector).__name__))
+            if self.routes != {}:
+                print("[Backend] route settings {}".format(self.routes))
+
+            next_sweep = time.monotonic() + SWEEP_INTERVAL
+            while True:
+                for key, mask in self.selector.select(SWEEP_INTERVAL):
+                    if key.data is None:
+                        self.accept(key.fileobj)
+                    elif mask & selectors.EVENT_READ:
+                        self.read(key.data)
+                    elif mask & selectors.EVENT_WRITE:
+                        self.write(key.data)
+                if time.monotonic() >= next_sweep:
+                    self.sweep()
+                    next_sweep = time.monotonic() + SWEEP_INTERVAL
+        except socket.error as e:
+            print("Socket error: {}".format(e))
+        finally:
+            self.selector.close()
+            if server:
+                server.close()
+
+    def accept(self, server):
+        """
+        Accepts every pending connection on the listening socket.
+
+        :param server (socket.socket): the non-blocking listening socket.
+        """
+        while True:
+            try:
+                sock, addr = server.accept()
+            except (BlockingIOError, InterruptedError):
+                return
+            sock.setblocking(False)
+            adapter = HttpAdapter(self.ip, self.port, sock, addr, self.routes)
+            conn = Connection(sock, addr, adapter)
+            self.clients[sock] = conn
+            self.selector.register(sock, selectors.EVENT_READ, conn)
+
+    def sweep(self):
+        """
+        Closes persistent connections that have been idle for longer than
+        their adapter's keep-alive timeout.
+        """
+        now = time.monotonic()
+        for conn in list(self.clients.values()):
+            if conn.outbuf:
+                continue
+            if now - conn.last_active > conn.adapter.keepalive_timeout:
+                self.close(conn)
+
+    def read(self, conn):
+        """
+        Buffers incoming bytes and dispatches the request once complete.
+
+        :param conn (Connection): the readable client.
+        """
+        try:
+            received = conn.reader.recv_from(conn.sock)
+        except (BlockingIOError, InterruptedError):
+            return
+        except socket.error as e:
+            print("[Backend] Read error from {}: {}".format(conn.addr, e))
+            self.close(conn)
+            return
+
+        if not received:
+            self.close(conn)
+            return
+
+        conn.last_active = time.monotonic()
+        self.dispatch(conn)
+
+    def dispatch(self, conn):
+        """
+        Runs the complete requests buffered so far and starts writing
+        their responses, in request order.
+
+        :param conn (Connection): the client with buffered input.
+        """
+        try:
+            responses = conn.adapter.handle_pipeline(conn.reader, self.routes)
+        except Exception as e:
+            print("[Backend] Handler error for {}: {}".format(conn.addr, e))
+            self.close(conn)
+            return
+        if not responses:
+            return
+
+        conn.outbuf = deque(part if isinstance(part, (FileRegion, ChunkedStream))
+                            else memoryview(part) for part in flatten(responses))
+        self.selector.modify(conn.sock, selectors.EVENT_WRITE, conn)
+        self.write(conn)
+
+    def write(self, conn):
+        """
+        Writes as much of the pending responses as the socket accepts. Once
+        they have been fully sent the connection is closed, or, when kept
+        alive, goes back to reading the next requests.
+
+        :param conn (Connection): the writable client.
+        """
+        outbuf = conn.outbuf
+        try:
+            while outbuf:
+                part = outbuf[0]
+                if isinstance(part, ChunkedStream):
+                    # Pull one frame and send it ahead of the rest of the stream.
+                    frame = part.next_frame()
+                    if frame is None:
+                        outbuf.popleft()
+                    else:
+                        outbuf.appendleft(memoryview(frame))
+                    continue
+                if isinstance(part, FileRegion):
+                    part.send(conn.sock)
+                    if part.count:
+                        break
+                    part.close()
+                    outbuf.popleft()
+                    continue
+                sent = conn.sock.send(part)
+                if sent < len(part):
+                    outbuf[0] = part[sent:]
+                    break
+                outbuf.popleft()
+        except (BlockingIOError, InterruptedError):
+            pass
+        except socket.error as e:
+            print("[Backend] Write error to {}: {}".format(conn.addr, e))
+            self.close(conn)
+            return
+
+        conn.last_active = time.monotonic()
+        if outbuf:
+            return
+
+        conn.outbuf = None
+        if not conn.adapter.keep_alive:
+            self.close(conn)
+            return
+
+        self.selector.modify(conn.sock, selectors.EVENT_READ, conn)
+        if conn.reader:
+            self.dispatch(conn)
+
+    def close(self, conn):
+        """
+        Unregisters and closes a client socket.
+
+        :param conn (Connection): the client to drop.
+        """
+        self.clients.pop(conn.sock, None)
+        if conn.outbuf:
+            close_parts(conn.outbuf)
+        try:
+            self.selector.unregister(conn.sock)
+        except (KeyError, ValueError):
+            pass
+        conn.sock.close()
+
+
+def run_selector_backend(ip, port, routes, reuse_port=False):
+    """
+    Starts the event-driven backend server.
+
+    :param ip (str): IP address to bind the server.
+    :param port (int): Port number to listen on.
+    :param routes (dict): Dictionary of route handlers.
+    :param reuse_port (bool): Bind with ``SO_REUSEPORT`` (pre-forked workers).
+    """
+    EventLoopServer(ip, port, routes, reuse_port).serve_forever()
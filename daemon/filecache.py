@@ -0,0 +1,255 @@
+#
+# Copyright (C) 2025 pdnguyen of HCMC University of Technology VNU-HCM.
+# All rights reserved.
+# This file is part of the CO3093/CO3094 course.
+#
+# WeApRous release
+#
+# The authors hereby grant to Licensee personal permission to use
+# and modify the Licensed Source Code for the sole purpose of studying
+# while attending the course
+#
+
+"""
+daemon.filecache
+~~~~~~~~~~~~~~~~~
+
+This module provides a :class:`FileCache <FileCache>` object that keeps the
+content of recently served static files in memory.
+
+Entries are keyed by absolute path and evicted least recently used first
+once their total size exceeds a byte budget. Every hit is validated with
+``os.stat``: a changed modification time or size reloads the file, a
+deleted file drops the entry. With a ``stat_interval`` the validation is
+skipped for that many seconds after the last check, trading freshness for
+one syscall less per request.
+
+Every file comes with its validators, a strong ``ETag`` and the
+``Last-Modified`` date, computed once from the ``os.stat`` result.
+
+Compressed variants (``gzip``, ``deflate``) of a cached file are produced
+on first demand and cached with it, unless a fresh ``.gz`` sibling file
+exists on disk, which is then served instead.
+
+Files larger than :data:`MAX_ENTRY_SIZE` are neither read nor cached: a
+:class:`FileRegion <daemon.transmit.FileRegion>` over them is returned
+instead, and the server engines send it with ``sendfile``.
+
+Usage::
+
+  >>> cache = FileCache(max_bytes=8 * 1024 * 1024, stat_interval=1.0)
+  >>> entry = cache.get("www/index.html")
+  >>> entry.content, entry.etag
+  (b'<!DOCTYPE html>...', '"17f3a8c2d1e4b000-51e"')
+"""
+
+import os
+import stat
+import time
+import threading
+from collections import OrderedDict
+from email.utils import formatdate
+
+from .transmit import FileRegion
+from .compression import compress
+
+#: Total bytes of file content kept in memory.
+MAX_CACHE_BYTES = 32 * 1024 * 1024
+
+#: Files larger than this are sent from disk with ``sendfile`` instead of cached.
+MAX_ENTRY_SIZE = 256 * 1024
+
+#: Seconds during which a cached file is served without ``os.stat`` (0: always stat).
+STAT_INTERVAL = 0.0
+
+
+class CachedFile:
+    """
+    Content and validators of one file.
+
+    :attrs content (bytes): the file content, or a :class:`FileRegion` for a large file.
+    :attrs mtime_ns (int): modification time, in nanoseconds.
+    :attrs size (int): file size, in bytes.
+    :attrs etag (str): strong entity tag, quoted.
+    :attrs last_modified (str): modification time as an HTTP date.
+    :attrs checked_at (float): monotonic time of the last ``os.stat`` check.
+    :attrs variants (dict): encoding -> (compressed content, etag), built on demand.
+    :attrs gz_sibling (bool): whether a ``.gz`` sibling serves the gzip variant,
+                              ``None`` until looked up.
+    """
+
+    __slots__ = ("content", "mtime_ns", "size", "etag", "last_modified", "checked_at",
+                 "variants", "gz_sibling")
+
+    def __init__(self, content, st, checked_at):
+        self.content = content
+        self.mtime_ns = st.st_mtime_ns
+        self.size = st.st_size
+        self.etag = '"{:x}-{:x}"'.format(st.st_mtime_ns, st.st_size)
+        self.last_modified = formatdate(st.st_mtime, usegmt=True)
+        self.checked_at = checked_at
+        self.variants = {}
+        self.gz_sibling = None
+
+    @property
+    def cost(self):
+        """Bytes held in memory for this file, variants included."""
+        return self.size + sum(len(variant[0]) for variant in self.variants.values())
+
+    @property
+    def mtime(self):
+        """Modification time in whole seconds, the resolution of HTTP dates."""
+        return self.mtime_ns // 1000000000
+
+
+class FileCache:
+    """
+    Byte-bounded LRU cache of file contents validated against ``os.stat``.
+
+    :attrs max_bytes (int): budget for the cached content, in bytes.
+    :attrs max_entry_size (int): largest file that is cached, in bytes; larger
+                                 ones are returned as a :class:`FileRegion`.
+    :attrs stat_interval (float): seconds a validated entry is trusted without ``os.stat``.
+    :attrs entries (OrderedDict): path -> :class:`CachedFile`, oldest first.
+    :attrs size (int): bytes of content currently cached.
+    """
+
+    def __init__(self, max_bytes=MAX_CACHE_BYTES, max_entry_size=MAX_ENTRY_SIZE,
+                 stat_interval=STAT_INTERVAL):
+        self.max_bytes = max_bytes
+        self.max_entry_size = max_entry_size
+        self.stat_interval = stat_interval
+        self.entries = OrderedDict()
+        self.size = 0
+        self.lock = threading.Lock()
+
+    def get(self, filepath):
+        """
+        Returns the content of a file, from memory when it is unchanged.
+
+        :param filepath (str): path of the file.
+
+        :rtype CachedFile: the file, whose content is a :class:`FileRegion`
+                           covering the whole file if it is larger than
+                           :attr:`max_entry_size`, or ``None`` if it is not
+                           a regular file.
+
+        :raises OSError: if the file exists but cannot be read.
+        """
+        key = os.path.abspath(filepath)
+        now = time.monotonic()
+
+        with self.lock:
+            entry = self.entries.get(key)
+            if entry is not None and now - entry.checked_at < self.stat_interval:
+                self.entries.move_to_end(key)
+                return entry
+
+        try:
+            st = os.stat(key)
+        except OSError:
+            st = None
+        if st is None or not stat.S_ISREG(st.st_mode):
+            self.discard(key)
+            return None
+        if st.st_size > self.max_entry_size:
+            self.discard(key)
+            return CachedFile(FileRegion(key, 0, st.st_size), st, now)
+
+        with self.lock:
+            entry = self.entries.get(key)
+            if entry is not None and entry.mtime_ns == st.st_mtime_ns and entry.size == st.st_size:
+                entry.checked_at = now
+                self.entries.move_to_end(key)
+                return entry
+
+        with open(key, "rb") as f:
+            content = f.read()
+
+        entry = CachedFile(content, st, now)
+        # A file rewritten between stat and read is served but not cached.
+        if len(content) == st.st_size:
+            self.put(key, entry)
+        else:
+            self.discard(key)
+        return entry
+
+    def put(self, key, entry):
+        """
+        Stores an entry and evicts the least recently used ones over budget.
+
+        :param key (str): absolute path of the file.
+        :param entry (CachedFile): the file.
+        """
+        with self.lock:
+            old = self.entries.pop(key, None)
+            if old is not None:
+                self.size -= old.cost
+            self.entries[key] = entry
+            self.size += entry.cost
+            self.evict()
+
+    def evict(self):
+        """Evicts the least recently used entries until within budget; needs :attr:`lock`."""
+        while self.size > self.max_bytes and self.entries:
+            _, evicted = self.entries.popitem(last=False)
+            self.size -= evicted.cost
+
+    def discard(self, key):
+        """
+        Drops the entry of a file, if cached.
+
+        :param key (str): absolute path of the file.
+        """
+        with self.lock:
+            old = self.entries.pop(key, None)
+            if old is not None:
+                self.size -= old.cost
+
+    def get_encoded(self, filepath, entry, encoding):
+        """
+        Returns a compressed variant of a file returned by :meth:`get`.
+
+        A ``.gz`` sibling at least as recent as the file is preferred for
+        ``gzip``; otherwise the cached content is compressed once and the
+        result kept next to it.
+
+        :param filepath (str): path of the file.
+        :param entry (CachedFile): the file, as returned by :meth:`get`.
+        :param encoding (str): ``"gzip"`` or ``"deflate"``.
+
+        :rtype tuple: (content, etag) of the variant, or ``None`` when the
+                      file is too large to be compressed in memory.
+        """
+        if encoding == "gzip" and entry.gz_sibling is not False:
+            sibling = self.get(filepath + ".gz")
+            entry.gz_sibling = sibling is not None and sibling.mtime_ns >= entry.mtime_ns
+            if entry.gz_sibling:
+                return sibling.content, sibling.etag
+
+        if not isinstance(entry.content, bytes):
+            return None
+        variant = entry.variants.get(encoding)
+        if variant is not None:
+            return variant
+
+        variant = (compress(entry.content, encoding),
+                   '{}-{}"'.format(entry.etag[:-1], encoding))
+        key = os.path.abspath(filepath)
+        with self.lock:
+            if encoding not in entry.variants:
+                entry.variants[encoding] = variant
+                if self.entries.get(key) is entry:
+                    self.size += len(variant[0])
+                    self.evict()
+        return variant
+
+    def clear(self):
+        """Drops every entry."""
+        with self.lock:
+            self.entries.clear()
+            self.size = 0
+
+
+#: Cache shared by every :class:`Response <daemon.response.Response>` of the process.
+STATIC_CACHE = FileCache()
@@ -0,0 +1,188 @@
+#
+# Copyright (C) 2025 pdnguyen of HCMC University of Technology VNU-HCM.
+# All rights reserved.
+# This file is part of the CO3093/CO3094 course.
+#
+# WeApRous release
+#
+# The authors hereby grant to Licensee personal permission to use
+# and modify the Licensed Source Code for the sole purpose of studying
+# while attending the course
+#
+
+"""
+daemon.health
+~~~~~~~~~~~~~~~~~
+
+This module provides the active health checks of the proxy's balanced
+backends, configured per virtual host in ``config/proxy.conf``::
+
+  host "app2.local" {
+      proxy_pass http://192.168.1.3:9002;
+      proxy_pass http://192.168.1.3:9003;
+      health_check path=/status interval=5 timeout=2 fall=3 rise=2;
+  }
+
+A :class:`HealthChecker <HealthChecker>` thread sends ``GET path`` to
+every backend of the host each ``interval`` seconds. Any HTTP answer
+below 500 is a success. ``fall`` consecutive failures mark the backend
+down, so the balancer stops sending it requests before a client has to
+find out; ``rise`` consecutive successes bring it back. A passive
+ejection (see :meth:`Balancer.report <daemon.balancer.Balancer.report>`)
+of a backend the probes find healthy lasts its whole ``fail_timeout``:
+answering the health path says nothing about the requests that failed.
+
+Usage::
+
+  >>> checkers = start_health_checks(routes)
+"""
+
+import socket
+import threading
+
+from .balancer import get_balancer
+
+#: Path requested by the probes.
+HEALTH_PATH = "/"
+
+#: Seconds between two rounds of probes.
+HEALTH_INTERVAL = 5.0
+
+#: Seconds a probe may take.
+HEALTH_TIMEOUT = 2.0
+
+#: Consecutive failed probes marking a backend down.
+HEALTH_FALL = 3
+
+#: Consecutive successful probes marking a backend up again.
+HEALTH_RISE = 2
+
+
+def probe(host, port, path, hostname, timeout=HEALTH_TIMEOUT):
+    """
+    Sends one health request to a backend.
+
+    :param host (str): backend IP address.
+    :param port (int): backend port.
+    :param path (str): path to request.
+    :param hostname (str): ``Host`` header to send, the virtual host.
+    :param timeout (float): seconds allowed for connecting and answering.
+
+    :rtype bool: ``True`` if the backend answered with a status below 500.
+    """
+    request = ("GET {} HTTP/1.1\r\n"
+               "Host: {}\r\n"
+               "User-Agent: WeApRous-health\r\n"
+               "Connection: close\r\n"
+               "\r\n").format(path, hostname).encode("latin-1")
+    try:
+        with socket.create_connection((host, port), timeout=timeout) as sock:
+            sock.sendall(request)
+            status = b""
+            while b"\r\n" not in status and len(status) < 1024:
+                data = sock.recv(1024)
+                if not data:
+                    break
+                status += data
+    except OSError:
+        return False
+
+    parts = status.split(b"\r\n", 1)[0].split(None, 2)
+    return len(parts) >= 2 and parts[1].isdigit() and int(parts[1]) < 500
+
+
+class HealthChecker(threading.Thread):
+    """
+    Background thread probing the backends of one virtual host.
+
+    :attrs hostname (str): the virtual host.
+    :attrs balancer (Balancer): its balancer, whose backends are probed.
+    :attrs path (str): path requested.
+    :attrs interval (float): seconds between two rounds.
+    :attrs timeout (float): seconds a probe may take.
+    :attrs fall (int): failures marking a backend down.
+    :attrs rise (int): successes marking a backend up.
+    :attrs streaks (dict): backend -> [consecutive successes, consecutive failures].
+    :attrs stopped (threading.Event): set by :meth:`stop`.
+    """
+
+    def __init__(self, hostname, balancer, path=HEALTH_PATH, interval=HEALTH_INTERVAL,
+                 timeout=HEALTH_TIMEOUT, fall=HEALTH_FALL, rise=HEALTH_RISE):
+        threading.Thread.__init__(self, name="health-{}".format(hostname), daemon=True)
+        self.hostname = hostname
+        self.balancer = balancer
+        self.path = path
+        self.interval = interval
+        self.timeout = timeout
+        self.fall = fall
+        self.rise = rise
+        self.streaks = {}
+        self.stopped = threading.Event()
+
+    def run(self):
+        while not self.stopped.is_set():
+            for upstream in list(self.balancer.upstreams):
+                self.check(upstream)
+            self.stopped.wait(self.interval)
+
+    def check(self, upstream):
+        """
+        Probes one backend and updates its health.
+
+        :param upstream (Upstream): the backend.
+        """
+        ok = probe(upstream.host, upstream.port, self.path, self.hostname, self.timeout)
+        streak = self.streaks.setdefault(upstream, [0, 0])
+        with self.balancer.lock:
+            if ok:
+                streak[0] += 1
+                streak[1] = 0
+                if streak[0] >= self.rise and not upstream.healthy:
+                    # Coming back up starts afresh; otherwise a passive
+                    # ejection runs until its own timeout.
+                    print("[Health] {} {}:{} is up".format(
+                        self.hostname, upstream.host, upstream.port))
+                    upstream.healthy = True
+                    upstream.fails = 0
+                    upstream.down_until = 0.0
+            else:
+                streak[0] = 0
+                streak[1] += 1
+                if streak[1] >= self.fall and upstream.healthy:
+                    print("[Health] {} {}:{} is down".format(
+                        self.hostname, upstream.host, upstream.port))
+                    upstream.healthy = False
+
+    def stop(self):
+        """Ends the thread after its current round."""
+        self.stopped.set()
+
+
+def start_health_checks(routes):
+    """
+    Starts a :class:`HealthChecker` for every balanced virtual host with a
+    ``health_check`` option.
+
+    :param routes (dict): hostname -> (proxy_map, policy[, options]).
+
+    :rtype list: the started checkers.
+    """
+    checkers = []
+    for hostname, entry in routes.items():
+        proxy_map, policy = entry[:2]
+        options = entry[2] if len(entry) > 2 else {}
+        settings = options.get("health_check")
+        if settings is None or not isinstance(proxy_map, list) or len(proxy_map) < 2:
+            continue
+        checker = HealthChecker(
+            hostname, get_balancer(hostname, proxy_map, policy, options),
+            path=settings.get("path", HEALTH_PATH),
+            interval=float(settings.get("interval", HEALTH_INTERVAL)),
+            timeout=float(settings.get("timeout", HEALTH_TIMEOUT)),
+            fall=int(settings.get("fall", HEALTH_FALL)),
+            rise=int(settings.get("rise", HEALTH_RISE)))
+        checker.start()
+        print("[Health] Checking {} every {}s on {}".format(
+            hostname, checker.interval, checker.path))
+        checkers.append(checker)
+    return checkers
@@ -18,14 +18,49 @@ This module provides a http adapter object to manage and persist
 http settings (headers, bodies). The adapter supports both
 raw URL paths and RESTful route definitions, and integrates with
 Request and Response objects to handle client-server communication.
+
+Connections are persistent following HTTP/1.1 semantics: a connection
+stays open after a response unless the client asks for ``Connection: close``
+(or speaks HTTP/1.0 without ``Connection: keep-alive``), it stays idle for
+longer than :data:`KEEPALIVE_TIMEOUT` seconds, or it has served
+:data:`MAX_KEEPALIVE_REQUESTS` requests. A server with a bounded number of
+workers can also have an idle persistent connection given up as soon as
+other clients are waiting for a worker (see ``yield_idle``).
+
+Pipelined requests (several requests sent back-to-back without waiting for
+the responses) are answered in arrival order; all the requests found in one
+read are processed together and their responses written in a single send.
+
+Requests are framed by a :class:`RequestReader <daemon.reader.RequestReader>`,
+so bodies of any size up to its limits (``Content-Length`` or chunked) arrive
+whole; oversized requests are answered with 413/431 and the connection closed.
 """
 
 from .request import Request
+from .reader import RequestReader, RequestError
 from .response import Response
 from .dictionary import CaseInsensitiveDict
 import os
 from .response import BASE_DIR
 import json
+import asyncio
+import inspect
+import socket
+import time
+from .transmit import sendall_responses, ChunkedStream
+from .compression import choose_encoding, is_compressible, compress
+
+#: Seconds an idle persistent connection is kept open.
+KEEPALIVE_TIMEOUT = 5
+
+#: Requests served on one connection before it is closed.
+MAX_KEEPALIVE_REQUESTS = 100
+
+#: Seconds between two ``yield_idle`` checks of an idle persistent connection.
+IDLE_POLL = 0.05
+
+#: Pipelined requests answered per batch before their responses are sent.
+PIPELINE_DEPTH = 32
 
 class HttpAdapter:
     """
@@ -45,9 +80,16 @@ class HttpAdapter:
         routes (dict): Mapping of route paths to handler functions.
         request (Request): Request object for parsing incoming data.
         response (Response): Response object for building and sending replies.
+        keep_alive (bool): Whether the connection stays open after the last response.
+        requests_served (int): Number of requests handled on this connection.
+        keepalive_timeout (float): Idle seconds before a persistent connection is closed.
+        max_requests (int): Requests allowed on one connection.
+        yield_idle (callable): Called while the connection waits idle for its
+            next request; returning ``True`` closes it. ``None`` waits for
+            the whole ``keepalive_timeout``.
     """
 
-    __attrs__ = [
+    __slots__ = (
         "ip",
         "port",
         "conn",
@@ -55,7 +97,12 @@ class HttpAdapter:
         "routes",
         "request",
         "response",
-    ]
+        "keep_alive",
+        "requests_served",
+        "keepalive_timeout",
+        "max_requests",
+        "yield_idle",
+    )
 
     def __init__(self, ip, port, conn, connaddr, routes):
         """
@@ -82,14 +129,25 @@ class HttpAdapter:
         self.request = Request()
         #: Response
         self.response = Response()
+        #: Keep the connection open after the current response
+        self.keep_alive = False
+        #: Requests handled on this connection
+        self.requests_served = 0
+        #: Idle timeout of a persistent connection (seconds)
+        self.keepalive_timeout = KEEPALIVE_TIMEOUT
+        #: Requests allowed on one connection
+        self.max_requests = MAX_KEEPALIVE_REQUESTS
+        #: Give up the connection while idle (bounded worker pools)
+        self.yield_idle = None
 
     def handle_client(self, conn, addr, routes):
         """
         Handle an incoming client connection.
 
-        This method reads the request from the socket, prepares the request object,
-        invokes the appropriate route handler if available, builds the response,
-        and sends it back to the client.
+        This method reads requests from the socket, answers every complete
+        request buffered so far through :meth:`handle_pipeline` and sends the
+        responses back to the client, for as long as the connection is kept
+        alive.
 
         :param conn (socket): The client socket connection.
         :param addr (tuple): The client's address.
@@ -100,23 +158,246 @@ class HttpAdapter:
         self.conn = conn        
         # Connection address.
         self.connaddr = addr
+
+        conn.settimeout(self.keepalive_timeout)
+        reader = RequestReader()
+        try:
+            while True:
+                # Handle the buffered requests
+                responses = self.handle_pipeline(reader, routes)
+                if responses:
+                    sendall_responses(conn, responses)
+                    if not self.keep_alive:
+                        return
+                    continue
+
+                if not self.recv_next(conn, reader):
+                    return
+        except socket.timeout:
+            pass
+        except socket.error as e:
+            print("[HttpAdapter] Connection error with {}: {}".format(addr, e))
+        finally:
+            conn.close()
+
+    def recv_next(self, conn, reader):
+        """
+        Read more bytes of the next request.
+
+        Between two requests of a persistent connection with a
+        :attr:`yield_idle` callback, the wait is split into
+        :data:`IDLE_POLL` slices and the connection is given up as soon as
+        the callback returns ``True``, so an idle client does not hold a
+        worker other clients are waiting for.
+
+        :param conn (socket): The client socket connection.
+        :param reader (RequestReader): framer holding the connection's input.
+
+        :rtype int: Number of bytes read, 0 once the peer closed or the
+                    connection was given up or timed out while idle.
+
+        :raises socket.timeout: after ``keepalive_timeout`` seconds waiting
+                                on a partial request, or without a
+                                :attr:`yield_idle` callback.
+        """
+        if self.yield_idle is None or reader or not self.requests_served:
+            return reader.recv_from(conn)
+
+        deadline = time.monotonic() + self.keepalive_timeout
+        conn.settimeout(IDLE_POLL)
+        try:
+            while True:
+                try:
+                    return reader.recv_from(conn)
+                except socket.timeout:
+                    if self.yield_idle() or time.monotonic() >= deadline:
+                        return 0
+        finally:
+            conn.settimeout(self.keepalive_timeout)
+
+    def handle_pipeline(self, reader, routes):
+        """
+        Answer the complete requests buffered in ``reader``, in order.
+
+        An incomplete trailing request is left in the reader for the next
+        read. At most :data:`PIPELINE_DEPTH` requests are answered per call,
+        and processing stops at the first response that closes the
+        connection, including the error response for a request the reader
+        refuses to frame.
+
+        :param reader (RequestReader): framer holding the connection's input.
+        :param routes (dict): The route mapping for dispatching requests.
+
+        :rtype list: The responses (bytes, or lists of parts for files sent
+                     with ``sendfile``), in request order.
+        """
+        responses = []
+        while len(responses) < PIPELINE_DEPTH:
+            try:
+                msg = reader.next_message()
+            except RequestError as e:
+                print("[HttpAdapter] Rejecting request from {}: {}".format(self.connaddr, e))
+                self.keep_alive = False
+                responses.append(self.build_error_response(e.status_code, e.reason))
+                reader.clear()
+                break
+            if msg is None:
+                break
+
+            responses.append(self.handle_request(msg, routes))
+            if not self.keep_alive:
+                reader.clear()
+                break
+        return responses
+
+    def handle_request(self, msg, routes):
+        """
+        Run one raw request message through the request lifecycle.
+
+        This method prepares the request object, invokes the appropriate
+        route handler if available and builds the response. It performs no
+        socket I/O, so any server engine (threaded or event driven) can
+        drive it. Coroutine handlers are run to completion on a private
+        event loop.
+
+        :param msg (bytes): The raw HTTP request message.
+        :param routes (dict): The route mapping for dispatching requests.
+
+        :rtype bytes: The complete HTTP response, or a list of parts (see
+                      :mod:`daemon.transmit`).
+        """
+        return self.head_only(self.respond(msg, routes))
+
+    async def handle_request_async(self, msg, routes):
+        """
+        Coroutine counterpart of :meth:`handle_request` for asyncio servers.
+
+        ``async def`` handlers are awaited on the running loop; plain
+        handlers are run in the loop's default executor so they do not
+        stall other connections.
+
+        :param msg (bytes): The raw HTTP request message.
+        :param routes (dict): The route mapping for dispatching requests.
+
+        :rtype bytes: The complete HTTP response, or a list of parts (see
+                      :mod:`daemon.transmit`).
+        """
+        return self.head_only(await self.respond_async(msg, routes))
+
+    def head_only(self, response):
+        """
+        Drop the body of the response to a ``HEAD`` request.
+
+        The headers are those of the matching ``GET``, ``Content-Length``
+        included; sending the body too would be read by a persistent
+        connection's client as the start of the next response.
+
+        :param response (bytes|list): the response built for the request.
+
+        :rtype bytes: the response, reduced to its header for ``HEAD``.
+        """
+        if self.request.method != "HEAD":
+            return response
+        if isinstance(response, list):
+            return response[0]
+        end = response.find(b"\r\n\r\n")
+        return response if end < 0 else response[:end + 4]
+
+    def respond(self, msg, routes):
+        """
+        Build the response to one raw request message, body included even
+        for ``HEAD`` (see :meth:`handle_request`).
+
+        :param msg (bytes): The raw HTTP request message.
+        :param routes (dict): The route mapping for dispatching requests.
+
+        :rtype bytes: The complete HTTP response, or a list of parts.
+        """
+        response = self.prepare_request(msg, routes)
+        if response is not None:
+            return response
+
+        req = self.request
+        if req.hook:
+            cache, key = self.route_cache(req)
+            if key is not None:
+                response = cache.get(key)
+                if response is not None:
+                    return response
+            result = self.invoke_hook(req)
+            if inspect.isawaitable(result):
+                result = asyncio.run(self.await_result(result))
+            return self.cache_response(cache, key, self.build_hook_response(result))
+        if req.allowed:
+            return self.build_method_not_allowed(req.allowed)
+
+        # Build response
+        return self.response.build_response(req)
+
+    async def respond_async(self, msg, routes):
+        """
+        Coroutine counterpart of :meth:`respond`.
+
+        :param msg (bytes): The raw HTTP request message.
+        :param routes (dict): The route mapping for dispatching requests.
+
+        :rtype bytes: The complete HTTP response, or a list of parts.
+        """
+        response = self.prepare_request(msg, routes)
+        if response is not None:
+            return response
+
+        req = self.request
+        if req.hook:
+            cache, key = self.route_cache(req)
+            if key is not None:
+                response = cache.get(key)
+                if response is not None:
+                    return response
+            if getattr(req.hook, "_route_async", False):
+                result = self.invoke_hook(req)
+            else:
+                loop = asyncio.get_running_loop()
+                result = await loop.run_in_executor(None, self.invoke_hook, req)
+            if inspect.isawaitable(result):
+                result = await result
+            return self.cache_response(cache, key, self.build_hook_response(result))
+        if req.allowed:
+            return self.build_method_not_allowed(req.allowed)
+
+        # Build response
+        return self.response.build_response(req)
+
+    def prepare_request(self, msg, routes):
+        """
+        Parse the request and answer the requests the adapter handles itself.
+
+        :param msg (bytes): The raw HTTP request message.
+        :param routes (dict): The route mapping for dispatching requests.
+
+        :rtype bytes: An early response (login, access denied), or ``None``
+                      when the request still has to be routed.
+        """
         # Request handler
         req = self.request
-        # Response handler
-        resp = self.response
+        # Response handler, fresh for every request on the connection
+        resp = self.response = Response()
         print(self.routes)
 
-        # Handle the request
-        msg = conn.recv(1024).decode()
         req.prepare(msg, routes)
+        self.requests_served += 1
+        self.keep_alive = self.should_keep_alive(req)
+        resp.keep_alive = self.keep_alive
+
+        if not req.method:
+            self.keep_alive = False
+            return self.build_error_response(400, "Bad Request")
+
         if req.method == "POST":
             print("Body:", req.path)
         if req.method == "POST" and req.path == "/login":
             print("[HttpAdapter] Handling /login")
-            response = self.login_handler(req, resp)
-            conn.sendall(response)
-            conn.close()
-            return
+            return self.login_handler(req, resp)
 
         if req.method == "GET" and req.path == "/index.html":
             auth_cookie = req.cookies.get("auth", "")
@@ -124,50 +405,156 @@ class HttpAdapter:
             if auth_cookie != "true":
                 # Return 401 immediately
                 print(f"[HttpAdapter] Access denied - auth cookie: '{auth_cookie}'")
-                response = self.build_error_response(401, "Unauthorized")
-                conn.sendall(response)
-                conn.close()
-                return
+                return self.build_error_response(401, "Unauthorized")
 
-        # Handle request hook
-        print(req.hook)
-        if req.hook:
-            print("[HttpAdapter] hook in route-path METHOD {} PATH {}".format(req.hook._route_path,req.hook._route_methods))
-            req.hook(headers = "bksysnet",body = "get in touch")
-            #
-            # TODO: handle for App hook here
-            #
-            result = req.hook(headers=req.headers, body=req.body or "")
-
-            # chuẩn hoá response body
-            if isinstance(result, (dict, list)):
-                body_bytes = json.dumps(result).encode("utf-8")
-                content_type = "application/json"
-            elif isinstance(result, bytes):
-                body_bytes = result
-                content_type = "application/json"
-            else:  # string
-                body_bytes = str(result).encode("utf-8")
-                content_type = "application/json"
-
-            # Tự build header HTTP 200 OK
-            header = (
-                "HTTP/1.1 200 OK\r\n"
-                f"Content-Type: {content_type}\r\n"
-                f"Content-Length: {len(body_bytes)}\r\n"
-                "Connection: close\r\n\r\n"
-            ).encode("utf-8")
-
-            conn.sendall(header + body_bytes)
-            conn.close()
-            return
+        return None
 
-        # Build response
-        response = resp.build_response(req)
+    def should_keep_alive(self, req):
+        """
+        Decide whether the connection persists after answering ``req``.
 
-        #print(response)
-        conn.sendall(response)
-        conn.close()
+        HTTP/1.1 connections persist unless the client sends
+        ``Connection: close``; HTTP/1.0 connections persist only with
+        ``Connection: keep-alive``. The per-connection request cap closes
+        the connection regardless.
+
+        :param req (Request): The prepared request.
+
+        :rtype bool: ``True`` to keep the connection open.
+        """
+        if self.requests_served >= self.max_requests:
+            return False
+
+        connection = req.get_header("connection", "").lower()
+        if req.version == "HTTP/1.1":
+            return "close" not in connection
+        return "keep-alive" in connection
+
+    def connection_header(self):
+        """
+        Build the ``Connection`` header line matching :attr:`keep_alive`.
+
+        :rtype str: The header line, including its CRLF.
+        """
+        if self.keep_alive:
+            return "Connection: keep-alive\r\n"
+        return "Connection: close\r\n"
+
+    def invoke_hook(self, req):
+        """
+        Call the route handler mapped to the request.
+
+        :param req (Request): The prepared request carrying the hook.
+
+        :rtype object: The handler result, or an awaitable for ``async def`` handlers.
+        """
+        print("[HttpAdapter] hook in route-path METHOD {} PATH {}".format(req.hook._route_path,req.hook._route_methods))
+        kwargs = req.params or {}
+        if getattr(req.hook, "_route_query", False):
+            kwargs = dict(kwargs, query=req.query)
+        return req.hook(headers=req.headers, body=req.body or "", **kwargs)
+
+    def route_cache(self, req):
+        """
+        Find the response cache of the routed handler, if it has one.
+
+        :param req (Request): The prepared request carrying the hook.
+
+        :rtype tuple: (cache, key): the :class:`ResponseCache
+                      <daemon.routecache.ResponseCache>` and the request's
+                      key in it; ``key`` is ``None`` when there is nothing
+                      to look up.
+        """
+        cache = getattr(req.hook, "_route_cache", None)
+        if cache is None:
+            return None, None
+        return cache, cache.key(req, self.keep_alive)
+
+    def cache_response(self, cache, key, response):
+        """
+        Store a handler response in its route cache; streamed responses
+        are never cached.
+
+        :rtype bytes: ``response``, unchanged.
+        """
+        if key is not None and isinstance(response, bytes):
+            cache.put(key, response)
+        return response
+
+    async def await_result(self, result):
+        """Await a handler result; wraps awaitables for :func:`asyncio.run`."""
+        return await result
+
+    def build_hook_response(self, result):
+        """
+        Serialize a route handler result into an HTTP 200 response.
+
+        Large bodies are ``gzip``/``deflate`` encoded when the request's
+        ``Accept-Encoding`` allows it. An iterator result is streamed, see
+        :meth:`build_stream_response`.
+
+        :param result (dict|list|bytes|str): The value returned by the handler.
+
+        :rtype bytes: The complete HTTP response.
+        """
+        if hasattr(result, "__anext__") or hasattr(result, "__next__"):
+            return self.build_stream_response(result)
+
+        # chuẩn hoá response body
+        if isinstance(result, (dict, list)):
+            body_bytes = json.dumps(result).encode("utf-8")
+            content_type = "application/json"
+        elif isinstance(result, bytes):
+            body_bytes = result
+            content_type = "application/json"
+        else:  # string
+            body_bytes = str(result).encode("utf-8")
+            content_type = "application/json"
+
+        encoding_header = ""
+        if is_compressible(content_type, len(body_bytes)):
+            encoding = choose_encoding(self.request.get_header("accept-encoding"))
+            if encoding:
+                body_bytes = compress(body_bytes, encoding)
+                encoding_header = f"Content-Encoding: {encoding}\r\n"
+            encoding_header += "Vary: Accept-Encoding\r\n"
+
+        # Tự build header HTTP 200 OK
+        header = (
+            "HTTP/1.1 200 OK\r\n"
+            f"Content-Type: {content_type}\r\n"
+            f"Content-Length: {len(body_bytes)}\r\n"
+            f"{encoding_header}"
+            f"{self.connection_header()}\r\n"
+        ).encode("utf-8")
+
+        return header + body_bytes
+
+    def build_stream_response(self, source):
+        """
+        Build a response whose body is produced by an iterator returned by
+        a route handler.
+
+        HTTP/1.1 clients get ``Transfer-Encoding: chunked``; HTTP/1.0
+        clients get a body delimited by closing the connection.
+
+        :param source (iterator): iterator or async iterator of body pieces.
+
+        :rtype list: The header followed by a :class:`ChunkedStream
+                     <daemon.transmit.ChunkedStream>` part.
+        """
+        chunked = self.request.version == "HTTP/1.1"
+        if not chunked:
+            self.keep_alive = False
+
+        framing = "Transfer-Encoding: chunked\r\n" if chunked else ""
+        header = (
+            "HTTP/1.1 200 OK\r\n"
+            "Content-Type: application/json\r\n"
+            f"{framing}"
+            f"{self.connection_header()}\r\n"
+        ).encode("utf-8")
+        return [header, ChunkedStream(source, chunked)]
 
     @property
     def extract_cookies(self, req, resp):
@@ -313,8 +700,11 @@ class HttpAdapter:
 
         return self.build_error_response(resp.status_code, resp.reason)
     
-    def build_error_response(self, status_code, message=""):
-        """Return an HTML error page using template files."""
+    def build_error_response(self, status_code, message="", extra_headers=""):
+        """Return an HTML error page using template files.
+
+        :param extra_headers (str): additional CRLF terminated header lines.
+        """
         
         error_files = {
             401: "401.html",
@@ -338,8 +728,21 @@ class HttpAdapter:
             f"HTTP/1.1 {status_code} {message}\r\n"
             f"Content-Type: text/html\r\n"
             f"Content-Length: {len(body)}\r\n"
-            "Connection: close\r\n\r\n"
+            f"{extra_headers}"
+            f"{self.connection_header()}\r\n"
         ).encode()
 
         return header + body
 
+    def build_method_not_allowed(self, allowed):
+        """
+        Build the ``405 Method Not Allowed`` response for a path routed
+        for other methods only.
+
+        :param allowed (list): methods the path is routed for.
+
+        :rtype bytes: The complete HTTP response.
+        """
+        return self.build_error_response(
+            405, "Method Not Allowed", "Allow: {}\r\n".format(", ".join(allowed)))
+
@@ -0,0 +1,215 @@
+#
+# Copyright (C) 2025 pdnguyen of HCMC University of Technology VNU-HCM.
+# All rights reserved.
+# This file is part of the CO3093/CO3094 course.
+#
+# WeApRous release
+#
+# The authors hereby grant to Licensee personal permission to use
+# and modify the Licensed Source Code for the sole purpose of studying
+# while attending the course
+#
+
+"""
+daemon.prefork
+~~~~~~~~~~~~~~~~~
+
+This module provides a pre-fork supervisor that runs a server in several
+worker processes, so the backend and the proxy are no longer limited to the
+one core a single Python process can use under the GIL.
+
+Every worker binds its own listening socket to the same address with
+``SO_REUSEPORT`` and the kernel spreads incoming connections between them.
+The supervisor restarts workers that die unexpectedly and forwards
+``SIGTERM``/``SIGINT``/``SIGHUP`` to all of them on shutdown. A worker
+dying right after it starts (bind failure, import error, ...) is restarted
+with an exponential backoff; after :data:`MAX_FAST_FAILURES` such deaths
+in a row the supervisor stops every worker and exits with status 1.
+
+Notes:
+------
+- In-memory application state (sessions, peer lists, ...) is private to
+  each worker process and is not shared between them.
+- Platforms without ``os.fork`` or ``SO_REUSEPORT`` fall back to running a
+  single server in the current process.
+
+Usage Example:
+--------------
+>>> run_prefork(run_backend, ("0.0.0.0", 9000, {}), workers=4)
+
+"""
+
+import os
+import sys
+import time
+import signal
+import socket
+
+#: Minimum lifetime (seconds) before a crashed worker is restarted at once;
+#: workers dying faster than this are restarted after a backoff starting at
+#: this pause and doubling with every consecutive fast failure.
+RESTART_DELAY = 1.0
+
+#: Longest pause (seconds) before restarting a fast-failing worker.
+MAX_RESTART_DELAY = 30.0
+
+#: Consecutive fast failures of a worker slot that make the supervisor give up.
+MAX_FAST_FAILURES = 5
+
+
+def create_listener(ip, port, backlog=50, reuse_port=False):
+    """
+    Creates a bound, listening TCP socket.
+
+    :param ip (str): IP address to bind.
+    :param port (int): Port number to listen on.
+    :param backlog (int): Size of the kernel accept queue.
+    :param reuse_port (bool): Set ``SO_REUSEPORT`` so sibling worker
+                              processes can bind the same address.
+
+    :rtype socket.socket: the listening socket.
+    """
+    sock = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
+    if reuse_port:
+        sock.setsockopt(socket.SOL_SOCKET, socket.SO_REUSEPORT, 1)
+    sock.bind((ip, port))
+    sock.listen(backlog)
+    return sock
+
+
+def prefork_supported():
+    """
+    Tells whether the platform can run pre-forked workers.
+
+    :rtype bool: ``True`` when both ``os.fork`` and ``SO_REUSEPORT`` exist.
+    """
+    return hasattr(os, "fork") and hasattr(socket, "SO_REUSEPORT")
+
+
+class Supervisor:
+    """
+    Parent process keeping a fixed number of worker processes alive.
+
+    :attrs target (callable): server entry point run by each worker.
+    :attrs args (tuple): positional arguments for ``target``.
+    :attrs workers (int): number of worker processes.
+    :attrs children (dict): pid -> (slot index, start time) of live workers.
+    :attrs failures (dict): slot index -> consecutive fast failures.
+    :attrs stopping (bool): set once a shutdown signal was received.
+    :attrs status (int): exit status of the supervisor, 1 once it gave up.
+    """
+
+    def __init__(self, target, args, workers):
+        self.target = target
+        self.args = args
+        self.workers = workers
+        self.children = {}
+        self.failures = {}
+        self.stopping = False
+        self.status = 0
+
+    def spawn(self, slot):
+        """
+        Forks one worker process for the given slot.
+
+        :param slot (int): index of the worker, kept across restarts.
+        """
+        pid = os.fork()
+        if pid == 0:
+            # Worker: default signal handling, run the server, never return.
+            signal.signal(signal.SIGTERM, signal.SIG_DFL)
+            signal.signal(signal.SIGINT, signal.SIG_DFL)
+            signal.signal(signal.SIGHUP, signal.SIG_DFL)
+            code = 0
+            try:
+                self.target(*self.args)
+            except BaseException as e:
+                print("[Prefork] worker {} failed: {}".format(slot, e))
+                code = 1
+            finally:
+                os._exit(code)
+
+        self.children[pid] = (slot, time.monotonic())
+        print("[Prefork] started worker {} pid {}".format(slot, pid))
+
+    def forward(self, signum, frame):
+        """
+        Signal handler: stops restarting and relays the signal to every worker.
+        """
+        self.stopping = True
+        for pid in list(self.children):
+            try:
+                os.kill(pid, signum)
+            except ProcessLookupError:
+                pass
+
+    def run(self):
+        """
+        Starts the workers and supervises them until all have exited
+        after a shutdown signal, or after a worker kept failing at start.
+
+        :rtype int: exit status, 0 after a shutdown signal, 1 after giving up.
+        """
+        for signum in (signal.SIGTERM, signal.SIGINT, signal.SIGHUP):
+            signal.signal(signum, self.forward)
+
+        for slot in range(self.workers):
+            self.spawn(slot)
+
+        while self.children:
+            try:
+                pid, status = os.wait()
+            except ChildProcessError:
+                break
+
+            if pid not in self.children:
+                continue
+            slot, started = self.children.pop(pid)
+            if self.stopping:
+                continue
+
+            if time.monotonic() - started >= RESTART_DELAY:
+                self.failures[slot] = 0
+                delay = 0
+            else:
+                self.failures[slot] = self.failures.get(slot, 0) + 1
+                if self.failures[slot] >= MAX_FAST_FAILURES:
+                    print("[Prefork] worker {} failed {} times in a row at start, giving up".format(
+                        slot, self.failures[slot]))
+                    self.status = 1
+                    self.forward(signal.SIGTERM, None)
+                    continue
+                delay = min(RESTART_DELAY * 2 ** (self.failures[slot] - 1), MAX_RESTART_DELAY)
+
+            print("[Prefork] worker {} pid {} exited with status {}, restarting in {}s".format(
+                slot, pid, status, delay))
+            if delay:
+                time.sleep(delay)
+            if not self.stopping:
+                self.spawn(slot)
+
+        print("[Prefork] all workers stopped")
+        return self.status
+
+
+def run_prefork(target, args, workers):
+    """
+    Runs ``target(*args)`` in ``workers`` supervised processes.
+
+    ``target`` must bind its listening socket with ``reuse_port=True``.
+    When pre-forking is unsupported, ``target`` runs once in this process.
+
+    :param target (callable): server entry point.
+    :param args (tuple): positional arguments for ``target``.
+    :param workers (int): number of worker processes.
+
+    :raises SystemExit: with status 1 if a worker kept failing at start.
+    """
+    if not prefork_supported():
+        print("[Prefork] os.fork/SO_REUSEPORT unavailable, running a single process")
+        target(*args)
+        return
+
+    status = Supervisor(target, args, workers).run()
+    if status:
+        sys.exit(status)
@@ -18,11 +18,20 @@ This module implements a simple proxy server using Python's socket and threading
 It routes incoming HTTP requests to backend services based on hostname mappings and returns
 the corresponding responses to clients.
 
+Bodies are streamed: once the request head is read, the request body and
+then the response are relayed between the client and backend sockets as
+they arrive, through a fixed buffer, so neither the time to the first
+byte nor the memory used grows with the size of a message.
+
 Requirement:
 -----------------
 - socket: provides socket networking interface.
 - threading: enables concurrent client handling via threads.
 - response: customized :class: `Response <Response>` utilities.
+- upstream: :class: `UpstreamPool <UpstreamPool>` of keep-alive backend connections,
+  and the framing and :func:`relay <daemon.upstream.relay>` streaming the messages.
+- balancer: load-balancing policies of hosts with several backends.
+- health: active health checks of the balanced backends.
 - httpadapter: :class: `HttpAdapter <HttpAdapter >` adapter for HTTP request processing.
 - dictionary: :class: `CaseInsensitiveDict <CaseInsensitiveDict>` for managing headers and cookies.
 
@@ -32,6 +41,11 @@ import threading
 from .response import *
 from .httpadapter import HttpAdapter
 from .dictionary import CaseInsensitiveDict
+from .prefork import create_listener, run_prefork
+from .upstream import (UPSTREAM_POOL, UpstreamConnectError, UpstreamBusyError, UpstreamError,
+                       RelayError, MessageFramer, read_head, relay, request_framing, response_framing)
+from .balancer import get_balancer, parse_upstream, sticky_key
+from .health import start_health_checks
 
 #: A dictionary mapping hostnames to backend IP and port tuples.
 #: Used to determine routing targets for incoming requests.
@@ -41,60 +55,255 @@ PROXY_PASS = {
     "app2.local": ('192.168.56.103', 9002),
 }
 
+#: Seconds allowed between two reads from, or writes to, a client.
+CLIENT_TIMEOUT = 10.0
+
+#: Response sent when no backend could answer a request.
+BAD_GATEWAY = (
+    "HTTP/1.1 502 Bad Gateway\r\n"
+    "Content-Type: text/plain\r\n"
+    "Content-Length: 15\r\n"
+    "Connection: close\r\n"
+    "\r\n"
+    "502 Bad Gateway"
+).encode('utf-8')
+
+
+def set_connection(message, value):
+    """
+    Rewrites the ``Connection`` header of an HTTP message.
+
+    :params message (bytes): HTTP request or response.
+    :params value (bytes): the new header value, e.g. ``b"keep-alive"``.
 
-def forward_request(host, port, request):
+    :rtype bytes: the message with a single ``Connection: value`` header.
     """
-    Forwards an HTTP request to a backend server and retrieves the response.
+    head, sep, body = message.partition(b"\r\n\r\n")
+    lines = [line for line in head.split(b"\r\n")
+             if not line.lower().startswith(b"connection:")]
+    lines.append(b"Connection: " + value)
+    return b"\r\n".join(lines) + sep + body
+
+
+class ClientError(OSError):
+    """
+    The client failed or went away while a request was proxied; the
+    backend is not at fault.
+    """
+
+
+class ResponseAbortedError(OSError):
+    """
+    The backend failed after the start of its response was sent to the
+    client, so the response is cut short and cannot be replaced.
+    """
+
+
+def stream_request(host, port, head, length, pending, client):
+    """
+    Streams an HTTP request to a backend server and its response back to
+    the client.
+
+    The request goes over a pooled keep-alive connection to the backend
+    (see :mod:`daemon.upstream`). The request body is relayed from the
+    client as it arrives, then the response head is sent to the client
+    with ``Connection: close`` and its body relayed as it arrives.
+
+    A request whose body was entirely read with its head is sent again
+    on a fresh connection if a reused one turns out closed by the backend
+    before any response byte was read. Client failures never cause a
+    retry.
 
     :params host (str): IP address of the backend server.
     :params port (int): port number of the backend server.
-    :params request (str): incoming HTTP request.
+    :params head (bytes): request line and headers, without the blank line.
+    :params length (int): request body framing, from :func:`request_framing
+                          <daemon.upstream.request_framing>`.
+    :params pending (bytes): bytes read from the client past the head.
+    :params client (socket.socket): client connection socket.
+
+    :raises ClientError: if the client socket failed or closed early.
+    :raises UpstreamConnectError: if the backend could not be reached.
+    :raises ResponseAbortedError: if the backend failed once its response
+                                  had started.
+    :raises OSError: if the backend failed before the response started.
+    """
+    framer = MessageFramer(length)
+    try:
+        end = framer.feed(pending)
+    except UpstreamError as e:
+        raise ClientError("malformed request body: {}".format(e))
+    replayable = framer.done
+    message = set_connection(head + b"\r\n\r\n", b"keep-alive") + pending[:end]
+    head_only = head.startswith(b"HEAD ")
+
+    while True:
+        conn, reused = UPSTREAM_POOL.acquire(host, port)
+        try:
+            conn.sock.sendall(message)
+            if not framer.done:
+                try:
+                    relay(client, conn.sock, framer)
+                except UpstreamError as e:
+                    raise ClientError("malformed request body: {}".format(e))
+            response, rest = read_head(conn.sock)
+            body_length, keep_alive = response_framing(response, head_only)
+        except RelayError as e:
+            UPSTREAM_POOL.release(conn, False)
+            if e.reading:
+                raise ClientError("request body: {}".format(e))
+            raise
+        except ClientError:
+            UPSTREAM_POOL.release(conn, False)
+            raise
+        except OSError as e:
+            UPSTREAM_POOL.release(conn, False)
+            if (reused and replayable and not isinstance(e, socket.timeout)
+                    and not getattr(e, "received", 0)):
+                # The backend closed the idle connection meanwhile: retry fresh.
+                continue
+            raise
+        break
 
-    :rtype bytes: Raw HTTP response from the backend server. If the connection
-                  fails, returns a 404 Not Found response.
+    try:
+        # The backend connection stays pooled, the client one is closed.
+        client.sendall(set_connection(response + b"\r\n\r\n", b"close"))
+        leftover = relay(conn.sock, client, MessageFramer(body_length), rest)
+    except RelayError as e:
+        UPSTREAM_POOL.release(conn, False)
+        if e.reading:
+            raise ResponseAbortedError("response body: {}".format(e))
+        raise ClientError("response body: {}".format(e))
+    except OSError as e:
+        UPSTREAM_POOL.release(conn, False)
+        if isinstance(e, UpstreamError):
+            raise ResponseAbortedError("response body: {}".format(e))
+        raise ClientError("response head: {}".format(e))
+    conn.requests += 1
+    UPSTREAM_POOL.release(conn, keep_alive and not leftover and body_length is not None)
+
+
+def send_bad_gateway(client):
+    """
+    Answers the client with a 502 Bad Gateway, if it is still there.
+
+    :params client (socket.socket): client connection socket.
     """
+    try:
+        client.sendall(BAD_GATEWAY)
+    except OSError:
+        pass
+
 
-    backend = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
+def forward_request(host, port, head, length, pending, client):
+    """
+    Streams an HTTP request to a single backend server, answering the
+    client with a 502 Bad Gateway if the backend failed before its
+    response started.
 
+    :params host (str): IP address of the backend server.
+    :params port (int): port number of the backend server.
+    :params head (bytes): request line and headers, without the blank line.
+    :params length (int): request body framing.
+    :params pending (bytes): bytes read from the client past the head.
+    :params client (socket.socket): client connection socket.
+    """
     try:
-        backend.connect((host, port))
-        backend.sendall(request.encode())
-        response = b""
-        while True:
-            chunk = backend.recv(4096)
-            if not chunk:
-                break
-            response += chunk
-        return response
+        stream_request(host, port, head, length, pending, client)
+    except (ClientError, ResponseAbortedError) as e:
+        print("[Proxy] {}:{} request aborted: {}".format(host, port, e))
     except socket.error as e:
-      print("Socket error: {}".format(e))
-      return (
-            "HTTP/1.1 404 Not Found\r\n"
-            "Content-Type: text/plain\r\n"
-            "Content-Length: 13\r\n"
-            "Connection: close\r\n"
-            "\r\n"
-            "404 Not Found"
-        ).encode('utf-8')
+        print("Socket error: {}".format(e))
+        send_bad_gateway(client)
 
 
-def resolve_routing_policy(hostname, routes):
+def forward_balanced(balancer, upstream, key, head, length, pending, client):
+    """
+    Streams an HTTP request to the backend picked by a balancer, failing
+    over to the other backends while the picked one cannot be reached.
+
+    Backend outcomes are reported to the balancer (passive health check),
+    including a response cut short by the backend; a client failing or
+    going away, or the proxy's own pool to it staying full, is not held
+    against the backend. Only connection failures
+    fail over: once the request has been sent, a second backend could
+    process it twice.
+
+    :params balancer (Balancer): the virtual host's balancer.
+    :params upstream (Upstream): the backend it picked (and counts in flight).
+    :params key (str): the request's sticky key.
+    :params head (bytes): request line and headers, without the blank line.
+    :params length (int): request body framing.
+    :params pending (bytes): bytes read from the client past the head.
+    :params client (socket.socket): client connection socket, answered
+                                    with a 502 Bad Gateway if no backend
+                                    could.
+    """
+    tried = []
+    while upstream is not None:
+        tried.append(upstream)
+        try:
+            stream_request(upstream.host, upstream.port, head, length, pending, client)
+        except UpstreamBusyError as e:
+            print("[Proxy] {}:{} busy: {}".format(upstream.host, upstream.port, e))
+            balancer.release(upstream)
+            upstream = balancer.acquire(key, exclude=tried)
+            continue
+        except UpstreamConnectError as e:
+            print("[Proxy] {}:{} unreachable: {}".format(upstream.host, upstream.port, e))
+            balancer.report(upstream, False)
+            balancer.release(upstream)
+            upstream = balancer.acquire(key, exclude=tried)
+            continue
+        except ClientError as e:
+            print("[Proxy] client aborted request to {}:{}: {}".format(
+                upstream.host, upstream.port, e))
+            balancer.release(upstream)
+            return
+        except ResponseAbortedError as e:
+            print("[Proxy] {}:{} response cut short: {}".format(upstream.host, upstream.port, e))
+            balancer.report(upstream, False)
+            balancer.release(upstream)
+            return
+        except socket.error as e:
+            print("Socket error: {}".format(e))
+            balancer.report(upstream, False)
+            balancer.release(upstream)
+            send_bad_gateway(client)
+            return
+        balancer.report(upstream, True)
+        balancer.release(upstream)
+        return
+    send_bad_gateway(client)
+
+
+def resolve_routing_policy(hostname, routes, key=None):
     """
     Handles an routing policy to return the matching proxy_pass.
     It determines the target backend to forward the request to.
 
-    :params host (str): IP address of the request target server.
-    :params port (int): port number of the request target server.
+    A hostname with several backends goes through its balancer (see
+    :mod:`daemon.balancer`), which counts the request in flight until
+    the caller hands the chosen upstream back with ``balancer.release``.
+
+    :params hostname (str): the Host header of the request.
     :params routes (dict): dictionary mapping hostnames and location.
+    :params key (str): the request's sticky key, for ``consistent-hash``.
+
+    :rtype tuple: (proxy_host, proxy_port, balancer, upstream); the last
+                  two are ``None`` unless a balancer picked the backend.
     """
 
     print(hostname)
-    proxy_map, policy = routes.get(hostname,('127.0.0.1:9000','round-robin'))
+    entry = routes.get(hostname,('127.0.0.1:9000','round-robin'))
+    proxy_map, policy = entry[:2]
+    options = entry[2] if len(entry) > 2 else None
     print (proxy_map)
     print (policy)
 
     proxy_host = ''
     proxy_port = '9000'
+    balancer = upstream = None
     if isinstance(proxy_map, list):
         if len(proxy_map) == 0:
             print("[Proxy] Emtpy resolved routing of hostname {}".format(hostname))
@@ -106,19 +315,18 @@ def resolve_routing_policy(hostname, routes):
             proxy_host = '127.0.0.1'
             proxy_port = '9000'
         elif len(proxy_map) == 1:
-            proxy_host, proxy_port = proxy_map[0].split(":", 2)
-        #elif: # apply the policy handling 
-        #   proxy_map
-        #   policy
+            single = parse_upstream(proxy_map[0])
+            proxy_host, proxy_port = single.host, single.port
         else:
-            # Out-of-handle mapped host
-            proxy_host = '127.0.0.1'
-            proxy_port = '9000'
+            balancer = get_balancer(hostname, proxy_map, policy, options)
+            upstream = balancer.acquire(key)
+            proxy_host, proxy_port = upstream.host, upstream.port
     else:
         print("[Proxy] resolve route of hostname {} is a singulair to".format(hostname))
-        proxy_host, proxy_port = proxy_map.split(":", 2)
+        single = parse_upstream(proxy_map)
+        proxy_host, proxy_port = single.host, single.port
 
-    return proxy_host, proxy_port
+    return proxy_host, proxy_port, balancer, upstream
 
 def handle_client(ip, port, conn, addr, routes):
     """
@@ -129,8 +337,11 @@ def handle_client(ip, port, conn, addr, routes):
     matches the hostname against known routes. In the matching
     condition,it forwards the request to the appropriate backend.
 
-    The handler sends the backend response back to the client or
+    The handler streams the backend response back to the client or
     returns 404 if the hostname is unreachable or is not recognized.
+    Every read from and write to the client is bounded by
+    :data:`CLIENT_TIMEOUT`, so a stalled client cannot hold a backend
+    connection for long.
 
     :params ip (str): IP address of the proxy server.
     :params port (int): port number of the proxy server.
@@ -139,18 +350,31 @@ def handle_client(ip, port, conn, addr, routes):
     :params routes (dict): dictionary mapping hostnames and location.
     """
 
-    request = conn.recv(1024).decode()
+    conn.settimeout(CLIENT_TIMEOUT)
+    try:
+        head, pending = read_head(conn)
+        length = request_framing(head)
+    except (OSError, ValueError) as e:
+        print("[Proxy] {} bad request: {}".format(addr, e))
+        conn.close()
+        return
 
     # Extract hostname
-    for line in request.splitlines():
-        if line.lower().startswith('host:'):
-            hostname = line.split(':', 1)[1].strip()
+    hostname = ''
+    cookie = ''
+    for line in head.split(b"\r\n"):
+        if line.lower().startswith(b'host:'):
+            hostname = line.split(b':', 1)[1].strip().decode("latin-1")
+        elif line.lower().startswith(b'cookie:'):
+            cookie = line.split(b':', 1)[1].strip().decode("latin-1")
 
     print("[Proxy] {} at Host: {}".format(addr, hostname))
 
     # Resolve the matching destination in routes and need conver port
     # to integer value
-    resolved_host, resolved_port = resolve_routing_policy(hostname, routes)
+    key = sticky_key(cookie, addr[0])
+    resolved_host, resolved_port, balancer, upstream = resolve_routing_policy(
+        hostname, routes, key)
     try:
         resolved_port = int(resolved_port)
     except ValueError:
@@ -158,20 +382,25 @@ def handle_client(ip, port, conn, addr, routes):
 
     if resolved_host:
         print("[Proxy] Host name {} is forwarded to {}:{}".format(hostname,resolved_host, resolved_port))
-        response = forward_request(resolved_host, resolved_port, request)        
+        if balancer is not None:
+            forward_balanced(balancer, upstream, key, head, length, pending, conn)
+        else:
+            forward_request(resolved_host, resolved_port, head, length, pending, conn)
     else:
-        response = (
-            "HTTP/1.1 404 Not Found\r\n"
-            "Content-Type: text/plain\r\n"
-            "Content-Length: 13\r\n"
-            "Connection: close\r\n"
-            "\r\n"
-            "404 Not Found"
-        ).encode('utf-8')
-    conn.sendall(response)
+        try:
+            conn.sendall((
+                "HTTP/1.1 404 Not Found\r\n"
+                "Content-Type: text/plain\r\n"
+                "Content-Length: 13\r\n"
+                "Connection: close\r\n"
+                "\r\n"
+                "404 Not Found"
+            ).encode('utf-8'))
+        except OSError:
+            pass
     conn.close()
 
-def run_proxy(ip, port, routes):
+def run_proxy(ip, port, routes, reuse_port=False):
     """
     Starts the proxy server and listens for incoming connections. 
 
@@ -183,15 +412,15 @@ def run_proxy(ip, port, routes):
     :params ip (str): IP address to bind the proxy server.
     :params port (int): port number to listen on.
     :params routes (dict): dictionary mapping hostnames and location.
+    :params reuse_port (bool): bind with ``SO_REUSEPORT`` (pre-forked workers).
 
     """
 
-    proxy = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
-
     try:
-        proxy.bind((ip, port))
-        proxy.listen(50)
+        proxy = create_listener(ip, port, reuse_port=reuse_port)
         print("[Proxy] Listening on IP {} port {}".format(ip,port))
+        # Probe the balanced backends from every (pre-forked) process.
+        start_health_checks(routes)
         while True:
             conn, addr = proxy.accept()
             #
@@ -208,13 +437,19 @@ def run_proxy(ip, port, routes):
     except socket.error as e:
       print("Socket error: {}".format(e))
 
-def create_proxy(ip, port, routes):
+def create_proxy(ip, port, routes, workers=1):
     """
     Entry point for launching the proxy server.
 
     :params ip (str): IP address to bind the proxy server.
     :params port (int): port number to listen on.
     :params routes (dict): dictionary mapping hostnames and location.
+    :params workers (int): number of pre-forked proxy processes sharing
+                           the port through ``SO_REUSEPORT``. Defaults to 1.
     """
 
+    if workers > 1:
+        run_prefork(run_proxy, (ip, port, routes, True), workers)
+        return
+
     run_proxy(ip, port, routes)
@@ -0,0 +1,260 @@
+#
+# Copyright (C) 2025 pdnguyen of HCMC University of Technology VNU-HCM.
+# All rights reserved.
+# This file is part of the CO3093/CO3094 course.
+#
+# WeApRous release
+#
+# The authors hereby grant to Licensee personal permission to use
+# and modify the Licensed Source Code for the sole purpose of studying
+# while attending the course
+#
+
+"""
+daemon.reader
+~~~~~~~~~~~~~~~~~
+
+This module provides a :class:`RequestReader <RequestReader>` object that
+frames HTTP requests out of the byte stream of one connection.
+
+Bytes are accumulated into a single reusable buffer; the reader finds the
+header terminator, then waits for exactly ``Content-Length`` body bytes or
+decodes a ``Transfer-Encoding: chunked`` body. Chunked requests are handed
+on with a plain ``Content-Length`` body so the rest of the daemon only ever
+sees one message format. Header and body sizes are bounded.
+
+Usage::
+
+  >>> reader = RequestReader()
+  >>> reader.feed(b"POST /echo HTTP/1.1\r\nContent-Length: 2\r\n\r\nhi")
+  >>> reader.next_message()
+  b'POST /echo HTTP/1.1\r\nContent-Length: 2\r\n\r\nhi'
+"""
+
+import re
+import threading
+
+#: Bytes read from the socket per ``recv`` call.
+RECV_SIZE = 65536
+
+#: Per-thread scratch buffer that :meth:`RequestReader.recv_from` reads into.
+#: Sharing it between the readers of one thread keeps an idle connection
+#: down to its (usually empty) pending-bytes buffer.
+_scratch = threading.local()
+
+#: Largest request line plus headers accepted, in bytes.
+MAX_HEADER_SIZE = 64 * 1024
+
+#: Largest request body accepted, in bytes.
+MAX_BODY_SIZE = 16 * 1024 * 1024
+
+#: Longest chunk-size line (size and extensions) accepted, in bytes.
+MAX_CHUNK_LINE = 4096
+
+#: A chunk size: hexadecimal digits only (no sign, prefix or underscores).
+CHUNK_SIZE = re.compile(rb"[0-9A-Fa-f]+")
+
+#: A Content-Length: ASCII digits only (no sign, spaces or underscores).
+CONTENT_LENGTH = re.compile(rb"[0-9]+")
+
+
+class RequestError(Exception):
+    """
+    Raised when the incoming bytes cannot be framed into a request.
+
+    :attrs status_code (int): HTTP status to answer with (400, 413, 431).
+    :attrs reason (str): matching reason phrase.
+    """
+
+    def __init__(self, status_code, reason):
+        Exception.__init__(self, "{} {}".format(status_code, reason))
+        self.status_code = status_code
+        self.reason = reason
+
+
+class RequestReader:
+    """
+    Incremental framer of the HTTP requests received on one connection.
+
+    :attrs buffer (bytearray): received bytes not yet consumed.
+    :attrs max_header_size (int): limit on the request head, in bytes.
+    :attrs max_body_size (int): limit on the request body, in bytes.
+    """
+
+    __slots__ = (
+        "buffer",
+        "max_header_size",
+        "max_body_size",
+        "_head_end",
+        "_scan",
+        "_length",
+        "_chunk_pos",
+        "_chunks",
+    )
+
+    def __init__(self, max_header_size=MAX_HEADER_SIZE, max_body_size=MAX_BODY_SIZE):
+        self.buffer = bytearray()
+        self.max_header_size = max_header_size
+        self.max_body_size = max_body_size
+        self._reset()
+
+    def _reset(self):
+        """Forgets the framing state of the current request."""
+        #: offset just past the blank line, or -1 while the head is incomplete
+        self._head_end = -1
+        #: offset from which the header terminator search resumes
+        self._scan = 0
+        #: declared Content-Length, or None for a chunked body
+        self._length = 0
+        #: chunked decoding state
+        self._chunk_pos = 0
+        self._chunks = None
+
+    def __bool__(self):
+        return bool(self.buffer)
+
+    def feed(self, data):
+        """
+        Appends received bytes to the buffer.
+
+        :param data (bytes): bytes read from the connection.
+        """
+        self.buffer += data
+
+    def recv_from(self, sock):
+        """
+        Reads once from ``sock`` into the thread's scratch buffer and appends
+        the bytes to :attr:`buffer`.
+
+        :param sock (socket.socket): the client socket.
+
+        :rtype int: number of bytes read, 0 once the peer has closed.
+        """
+        view = getattr(_scratch, "view", None)
+        if view is None:
+            view = _scratch.view = memoryview(bytearray(RECV_SIZE))
+        n = sock.recv_into(view)
+        if n:
+            self.buffer += view[:n]
+        return n
+
+    def clear(self):
+        """Drops every buffered byte, e.g. once the connection is closing."""
+        del self.buffer[:]
+        self._reset()
+
+    def next_message(self):
+        """
+        Removes and returns the first complete request from the buffer.
+
+        :rtype bytes: the request (head and body), or ``None`` if more data is needed.
+
+        :raises RequestError: if the head or body exceeds its limit or the
+                              framing headers are malformed.
+        """
+        buf = self.buffer
+
+        if self._head_end < 0:
+            pos = buf.find(b"\r\n\r\n", self._scan)
+            if pos < 0:
+                if len(buf) > self.max_header_size:
+                    raise RequestError(431, "Request Header Fields Too Large")
+                self._scan = max(0, len(buf) - 3)
+                return None
+            if pos > self.max_header_size:
+                raise RequestError(431, "Request Header Fields Too Large")
+            self._head_end = pos + 4
+            self._length = self._parse_framing(bytes(buf[:pos]))
+
+        if self._length is None:
+            return self._next_chunked()
+
+        end = self._head_end + self._length
+        if len(buf) < end:
+            return None
+
+        msg = bytes(buf[:end])
+        del buf[:end]
+        self._reset()
+        return msg
+
+    def _parse_framing(self, head):
+        """
+        Reads the body framing out of a request head.
+
+        :param head (bytes): request line and headers, without the blank line.
+
+        :rtype int: the ``Content-Length`` (0 when absent), or ``None`` for chunked.
+        """
+        length = 0
+        for line in head.split(b"\r\n")[1:]:
+            name, _, value = line.partition(b":")
+            name = name.strip().lower()
+            if name == b"transfer-encoding":
+                if value.strip().lower().endswith(b"chunked"):
+                    return None
+                raise RequestError(400, "Bad Request")
+            if name == b"content-length":
+                value = value.strip()
+                if not CONTENT_LENGTH.fullmatch(value):
+                    raise RequestError(400, "Bad Request")
+                length = int(value)
+
+        if length > self.max_body_size:
+            raise RequestError(413, "Payload Too Large")
+        return length
+
+    def _next_chunked(self):
+        """
+        Decodes as much of a chunked body as is buffered.
+
+        :rtype bytes: the request re-framed with ``Content-Length``, or ``None``.
+        """
+        buf = self.buffer
+        if self._chunks is None:
+            self._chunks = bytearray()
+            self._chunk_pos = self._head_end
+
+        while True:
+            line_end = buf.find(b"\r\n", self._chunk_pos)
+            if line_end < 0:
+                if len(buf) - self._chunk_pos > MAX_CHUNK_LINE:
+                    raise RequestError(400, "Bad Request")
+                return None
+            if line_end - self._chunk_pos > MAX_CHUNK_LINE:
+                raise RequestError(400, "Bad Request")
+            size_field = bytes(buf[self._chunk_pos:line_end]).split(b";", 1)[0].strip()
+            if not CHUNK_SIZE.fullmatch(size_field):
+                raise RequestError(400, "Bad Request")
+            size = int(size_field, 16)
+
+            if size == 0:
+                # Skip optional trailers up to the final blank line.
+                trailer_end = buf.find(b"\r\n\r\n", line_end)
+                if trailer_end < 0:
+                    if len(buf) - line_end > self.max_header_size:
+                        raise RequestError(431, "Request Header Fields Too Large")
+                    return None
+                end = trailer_end + 4
+                break
+
+            # Refuse an oversized chunk before buffering its data.
+            if len(self._chunks) + size > self.max_body_size:
+                raise RequestError(413, "Payload Too Large")
+            data_start = line_end + 2
+            data_end = data_start + size
+            if len(buf) < data_end + 2:
+                return None
+            if buf[data_end:data_end + 2] != b"\r\n":
+                raise RequestError(400, "Bad Request")
+            self._chunks += buf[data_start:data_end]
+            self._chunk_pos = data_end + 2
+
+        lines = [line for line in bytes(buf[:self._head_end - 4]).split(b"\r\n")
+                 if not line.lower().startswith((b"transfer-encoding:", b"content-length:"))]
+        lines.append(b"Content-Length: " + str(len(self._chunks)).encode())
+        msg = b"\r\n".join(lines) + b"\r\n\r\n" + bytes(self._chunks)
+
+        del buf[:end]
+        self._reset()
+        return msg
@@ -17,6 +17,8 @@ daemon.request
 This module provides a Request object to manage and persist 
 request settings (cookies, auth, proxies).
 """
+from urllib.parse import parse_qsl
+
 from .dictionary import CaseInsensitiveDict
 import base64
 
@@ -36,76 +38,215 @@ class Request():
       >>> r = req.prepare(incoming_msg)
       >>> r
       <Request>
+
+    Only the request line is decoded by :meth:`prepare`. ``headers``,
+    ``cookies`` and ``body`` are parsed from the raw message the first time
+    they are read and cached afterwards, and :meth:`get_header` looks up a
+    single header without building the header dictionary at all.
+
+    The request target is split at ``?``: :attr:`path` (used for routing
+    and static files) never holds the query string, which is kept raw in
+    :attr:`query_string` and parsed into :attr:`query` on first access.
     """
-    __attrs__ = [
+    __slots__ = (
         "method",
         "url",
-        "headers",
-        "body",
-        "reason",
-        "cookies",
-        "body",
+        "path",
+        "query_string",
+        "version",
         "routes",
         "hook",
-    ]
+        "params",
+        "allowed",
+        "_raw",
+        "_line_end",
+        "_head_end",
+        "_body_start",
+        "_lower_head",
+        "_headers",
+        "_cookies",
+        "_body",
+        "_query",
+    )
 
     def __init__(self):
         #: HTTP verb to send to the server.
         self.method = None
         #: HTTP URL to send the request to.
         self.url = None
-        #: dictionary of HTTP headers.
-        self.headers = None
         #: HTTP path
         self.path = None        
-        # The cookies set used to create Cookie header
-        self.cookies = None
-        #: request body to send to the server.
-        self.body = None
+        #: Raw query string of the URL, without the ``?``
+        self.query_string = ""
+        #: HTTP version of the request line.
+        self.version = None
         #: Routes
         self.routes = {}
         #: Hook point for routed mapped-path
         self.hook = None
+        #: Path parameters captured by the matched route
+        self.params = None
+        #: Methods of the route matching the path, when not the request's
+        self.allowed = None
+        self._reset(b"", 0, 0, 0)
+
+    def _reset(self, raw, line_end, head_end, body_start):
+        """Points the lazy accessors at a new raw message."""
+        #: raw message and the offsets delimiting its parts
+        self._raw = raw
+        self._line_end = line_end
+        self._head_end = head_end
+        self._body_start = body_start
+        #: lower-cased head, built on the first :meth:`get_header` call
+        self._lower_head = None
+        #: dictionary of HTTP headers (parsed lazily).
+        self._headers = None
+        # The cookies set used to create Cookie header (parsed lazily)
+        self._cookies = None
+        #: request body to send to the server (decoded lazily).
+        self._body = None
+        #: query parameters (parsed lazily).
+        self._query = None
+
+    @property
+    def headers(self):
+        """Dictionary of lower-cased header names, parsed on first access."""
+        if self._headers is None:
+            block = self._raw[self._line_end + 2:self._head_end]
+            self._headers = self.prepare_headers(block.decode("utf-8", "replace"))
+        return self._headers
+
+    @headers.setter
+    def headers(self, value):
+        self._headers = value
+
+    @property
+    def cookies(self):
+        """Request cookies, parsed from the ``Cookie`` header on first access."""
+        if self._cookies is None:
+            # Parse cookies with error handling
+            self._cookies = self.parse_cookies(self.get_header("cookie", ""))
+        return self._cookies
+
+    @cookies.setter
+    def cookies(self, value):
+        self._cookies = value
+
+    @property
+    def body(self):
+        """Request body as ``str``, decoded on first access (POST only)."""
+        if self._body is None:
+            if self.method == "POST":
+                self._body = self._raw[self._body_start:].decode("utf-8", "replace")
+            else:
+                self._body = ""
+        return self._body
+
+    @body.setter
+    def body(self, value):
+        self._body = value
+
+    @property
+    def query(self):
+        """
+        Query parameters, parsed from :attr:`query_string` on first access.
+
+        Names and values are percent-decoded (``+`` is a space); a repeated
+        name keeps its last value and a name without ``=`` maps to ``""``.
+        """
+        if self._query is None:
+            self._query = dict(parse_qsl(self.query_string, keep_blank_values=True))
+        return self._query
 
-    def extract_request_line(self, request):
+    @query.setter
+    def query(self, value):
+        self._query = value
+
+    def get_header(self, name, default=None):
+        """
+        Returns one header value without materializing :attr:`headers`.
+
+        :param name (str): header name, case-insensitive.
+        :param default: value returned when the header is absent.
+
+        :rtype str: the header value.
+        """
+        if self._headers is not None:
+            return self._headers.get(name.lower(), default)
+
+        if self._lower_head is None:
+            self._lower_head = self._raw[self._line_end:self._head_end].lower()
+        key = b"\r\n" + name.lower().encode("latin-1") + b":"
+        pos = self._lower_head.find(key)
+        if pos < 0:
+            return default
+
+        start = pos + len(key)
+        end = self._lower_head.find(b"\r\n", start)
+        if end < 0:
+            end = len(self._lower_head)
+        offset = self._line_end
+        return self._raw[offset + start:offset + end].decode("utf-8", "replace").strip()
+
+    def extract_request_line(self, line):
+        """
+        Parses the request line.
+
+        :param line (str): the first line of the request, without its CRLF.
+
+        :rtype tuple: (method, target, version), or (None, None, None) if malformed.
+        """
         try:
-            lines = request.splitlines()
-            first_line = lines[0]
-            method, path, version = first_line.split()
-            path = path.strip().rstrip('\r\n')
-            if path == '/':
-                path = '/index.html'
+            method, target, version = line.split()
         except Exception:
-            return None, None
+            return None, None, None
+
+        return method, target, version
+
+    def split_target(self, target):
+        """
+        Splits a request target into its path and query string.
+
+        A fragment, which clients should not send, is dropped.
+
+        :param target (str): the request target, e.g. ``/get-list?channel=x``.
 
-        return method, path, version
+        :rtype tuple: (path, query_string).
+        """
+        path, _, query_string = target.partition("?")
+        if "#" in path:
+            path = path.partition("#")[0]
+        else:
+            query_string = query_string.partition("#")[0]
+        if path == '/':
+            path = '/index.html'
+        return path, query_string
              
-    def prepare_headers(self, request):
-        """Prepares the given HTTP headers."""
-        lines = request.split('\r\n')
+    def prepare_headers(self, header_block):
+        """
+        Prepares the given HTTP headers.
+
+        :param header_block (str): the header lines, without the request line
+                                   and the terminating blank line.
+
+        :rtype dict: lower-cased header names mapped to their values.
+        """
         headers = {}
-        for line in lines[1:]:
-            if ': ' in line:
-                key, val = line.split(': ', 1)
-                headers[key.lower()] = val
+        for line in header_block.split("\r\n"):
+            key, sep, val = line.partition(":")
+            if sep:
+                headers[key.lower()] = val.strip()
         return headers
 
-    def prepare(self, request, routes=None):
-        """Prepares the entire request with the given parameters."""
-        
-        self.method, self.path, self.version = self.extract_request_line(request)
-        if self.method:
-            self.method = self.method.upper()
-        print("[Request] {} path {} version {}".format(self.method, self.path, self.version))
-        if "\r\n\r\n" in request:
-            raw_header, raw_body = request.split("\r\n\r\n", 1)
-        else:
-            raw_header, raw_body = request, ""
-            
-        self.headers = self.prepare_headers(raw_header)
-        # Parse cookies with error handling
-        raw_cookie = self.headers.get("cookie", "")
-        self.cookies = CaseInsensitiveDict()
+    def parse_cookies(self, raw_cookie):
+        """
+        Parses a ``Cookie`` header value.
+
+        :param raw_cookie (str): the header value, e.g. ``"a=1; b=2"``.
+
+        :rtype CaseInsensitiveDict: cookie names mapped to their values.
+        """
+        cookies = CaseInsensitiveDict()
 
         try:
             if raw_cookie:
@@ -113,48 +254,60 @@ class Request():
                 for pair in cookie_pairs:
                     if "=" in pair:
                         k, v = pair.strip().split("=", 1)
-                        self.cookies[k] = v
-                print(f"[Request] Parsed cookies: {dict(self.cookies)}")
+                        cookies[k] = v
         except Exception as e:
             print(f"[Request] Error parsing cookie: {e}")
-            self.cookies = CaseInsensitiveDict()
-        if routes:
-            lookup_key = (self.method, self.path)
-            self.hook = routes.get(lookup_key)
-        # Prepare the request line from the request header
+            cookies = CaseInsensitiveDict()
+        return cookies
+
+    def prepare(self, request, routes=None):
+        """
+        Prepares the entire request with the given parameters.
+
+        The raw message stays ``bytes``: it is scanned once for the end of
+        the request line and the blank line, only the request line is
+        decoded here, and headers, cookies and body are left to their lazy
+        accessors.
+
+        :param request (bytes): the raw request message (``str`` is accepted
+                                and encoded as UTF-8).
+        :param routes (Router): optional compiled routes (a plain
+                                ``(method, path)`` dict is looked up exactly).
+        """
+        if isinstance(request, str):
+            request = request.encode("utf-8")
+
+        line_end = request.find(b"\r\n")
+        if line_end < 0:
+            line_end = len(request)
+        head_end = request.find(b"\r\n\r\n", line_end)
+        if head_end < 0:
+            head_end = body_start = len(request)
+        else:
+            body_start = head_end + 4
+        self._reset(request, line_end, head_end, body_start)
+
+        request_line = request[:line_end].decode("utf-8", "replace")
+        self.method, self.url, self.version = self.extract_request_line(request_line)
+        if self.method:
+            self.method = self.method.upper()
+            self.path, self.query_string = self.split_target(self.url)
+        else:
+            self.path, self.query_string = None, ""
+        print("[Request] {} path {} version {}".format(self.method, self.path, self.version))
 
         #
         # @bksysnet Preapring the webapp hook with WeApRous instance
         # The default behaviour with HTTP server is empty routed
         #
-        # TODO manage the webapp hook in this mounting point
-        #
-        # if not routes == {}:
-        #     self.routes = routes
-        #     self.hook = routes.get((self.method, self.path))
-        #     #
-        #     # self.hook manipulation goes here
-        #     # ...
-        #     #
-
-        # self.headers = self.prepare_headers(raw_header)
-        # raw_cookie = self.headers.get("cookie", "")
-        # self.cookies = CaseInsensitiveDict()
-
-        # if raw_cookie:
-        #     cookie_pairs = raw_cookie.split(";")
-        #     for pair in cookie_pairs:
-        #         if "=" in pair:
-        #             k, v = pair.strip().split("=", 1)
-        #             self.cookies[k] = v
-            #
-            #  TODO: implement the cookie function here
-            #        by parsing the header            #
-        if self.method == "POST":
-            self.body = raw_body
-        else:
-            self.body = ""
-        
+        self.hook = self.params = self.allowed = None
+        if routes and self.method and self.path:
+            match = getattr(routes, "match", None)
+            if match is not None:
+                self.hook, self.params, self.allowed = match(self.method, self.path)
+            else:
+                self.hook = routes.get((self.method, self.path))
+
         return
 
     def prepare_body(self, data, files, json=None):
@@ -18,15 +18,163 @@ This module provides a :class: `Response <Response>` object to manage and persis
 response settings (cookies, auth, proxies), and to construct HTTP responses
 based on incoming requests. 
 
-The current version supports MIME type detection, content loading and header formatting
+The current version supports MIME type detection, content loading and header formatting.
+
+Static files carry ``ETag`` and ``Last-Modified`` validators; conditional
+requests (``If-None-Match``, ``If-Modified-Since``) for an unchanged file
+are answered with ``304 Not Modified`` and no body. The ``Cache-Control``
+policy is chosen per base directory from :data:`CACHE_CONTROL`.
+
+``Range`` requests are answered with ``206 Partial Content``: a single
+range as a plain body, several ranges as ``multipart/byteranges``, and
+``416 Range Not Satisfiable`` when no range overlaps the file. An
+``If-Range`` validator that no longer matches gets the whole file.
+
+Text files are sent ``gzip`` or ``deflate`` encoded when the client's
+``Accept-Encoding`` allows it (see :mod:`daemon.compression`); the
+compressed variants are cached by :data:`STATIC_CACHE
+<daemon.filecache.STATIC_CACHE>` next to the raw content.
 """
 import datetime
 import os
+import time
+import uuid
 import mimetypes
+from email.utils import formatdate, parsedate_tz, mktime_tz
 from .dictionary import CaseInsensitiveDict
+from .filecache import STATIC_CACHE
+from .transmit import FileRegion
+from .compression import choose_encoding, is_compressible
 
 BASE_DIR = ""
 
+#: ``Cache-Control`` of the static files served from each directory
+#: (relative to :data:`BASE_DIR`). Pages are revalidated on every load,
+#: assets are reused for a day.
+CACHE_CONTROL = {
+    "www/": "no-cache",
+    "static/": "public, max-age=86400",
+}
+
+#: ``Cache-Control`` for directories missing from :data:`CACHE_CONTROL`.
+DEFAULT_CACHE_CONTROL = "no-cache"
+
+#: Ranges accepted in one ``Range`` header; longer lists get the whole file.
+MAX_RANGES = 16
+
+#: Header lines sent with every static file response, whatever the request.
+STATIC_HEADERS = (
+    ("Accept", "application/json"),
+    ("Accept-Language", "en-US,en;q=0.9"),
+    ("Authorization", "Basic <credentials>"),
+    ("Max-Forward", "10"),
+    ("Proxy-Authorization", "Basic dXNlcjpwYXNz"),  # example base64
+    ("Warning", "199 Miscellaneous warning"),
+    ("User-Agent", "Chrome/123.0.0.0"),
+)
+
+KEEP_ALIVE_LINE = b"Connection: keep-alive\r\n"
+CLOSE_LINE = b"Connection: close\r\n"
+
+#: (content type, cache control) -> encoded header block, see :func:`static_header_block`.
+_header_blocks = {}
+
+#: [second, encoded date] of the last :func:`http_date` call.
+_date_cache = [0, b""]
+
+
+def http_date():
+    """
+    The current date as an HTTP date, formatted at most once per second.
+
+    :rtype bytes: e.g. ``b"Sun, 06 Nov 1994 08:49:37 GMT"``.
+    """
+    now = int(time.time())
+    cached = _date_cache
+    if cached[0] != now:
+        cached[1] = formatdate(now, usegmt=True).encode("ascii")
+        cached[0] = now
+    return cached[1]
+
+
+def static_header_block(content_type, cache_control):
+    """
+    The encoded header lines that only depend on the content type and the
+    caching policy, built once per combination.
+
+    ``multipart/byteranges`` types carry a per-response boundary and are
+    built every time instead of cached.
+
+    :params content_type (str): the ``Content-Type`` of the body.
+    :params cache_control (str): the ``Cache-Control`` policy.
+
+    :rtype bytes: CRLF terminated header lines.
+    """
+    key = (content_type, cache_control)
+    block = _header_blocks.get(key)
+    if block is not None:
+        return block
+
+    lines = ["Content-Type: {}".format(content_type),
+             "Cache-Control: {}".format(cache_control)]
+    if cache_control == "no-cache":
+        lines.append("Pragma: no-cache")
+    lines.extend("{}: {}".format(name, value) for name, value in STATIC_HEADERS)
+    block = ("\r\n".join(lines) + "\r\n").encode("utf-8")
+
+    if not content_type.startswith("multipart/"):
+        _header_blocks[key] = block
+    return block
+
+
+def parse_range(value, size):
+    """
+    Parses a ``Range`` header against a representation of ``size`` bytes.
+
+    :params value (str): the header value, e.g. ``bytes=0-499,-500``.
+    :params size (int): length of the full content.
+
+    :rtype list: inclusive (first, last) byte positions, in request order;
+                 an empty list if no range is satisfiable, ``None`` if the
+                 header is malformed and must be ignored.
+    """
+    unit, _, specs = value.partition("=")
+    if unit.strip().lower() != "bytes":
+        return None
+    specs = [spec.strip() for spec in specs.split(",") if spec.strip()]
+    if not specs or len(specs) > MAX_RANGES:
+        return None
+
+    ranges = []
+    for spec in specs:
+        first, sep, last = spec.partition("-")
+        if not sep:
+            return None
+        try:
+            if first:
+                first = int(first)
+                if last:
+                    last = int(last)
+                    if last < first:
+                        return None
+                else:
+                    last = size - 1
+            else:
+                # Suffix range: the final ``last`` bytes.
+                length = int(last)
+                if length < 0:
+                    return None
+                if length == 0:
+                    continue
+                first, last = max(size - length, 0), size - 1
+        except ValueError:
+            return None
+        if first < 0:
+            return None
+        if first < size:
+            ranges.append((first, min(last, size - 1)))
+    return ranges
+
 class Response():   
     """The :class:`Response <Response>` object, which contains a
     server's response to an HTTP request.
@@ -58,11 +206,12 @@ class Response():
       <Response>
     """
 
-    __attrs__ = [
+    __slots__ = (
         "_content",
+        "_content_consumed",
+        "_next",
         "_header",
         "status_code",
-        "method",
         "headers",
         "url",
         "history",
@@ -71,9 +220,10 @@ class Response():
         "cookies",
         "elapsed",
         "request",
-        "body",
-        "reason",
-    ]
+        "keep_alive",
+        "raw",
+        "connection",
+    )
 
 
     def __init__(self, request=None):
@@ -118,6 +268,9 @@ class Response():
         #: is a response.
         self.request = None
 
+        #: Keep the client connection open after this response.
+        self.keep_alive = False
+
 
     def get_mime_type(self, path):
         """
@@ -221,32 +374,47 @@ class Response():
         return base_dir
 
 
-    def build_content(self, path, base_dir):
+    def build_content(self, path, base_dir, encoding=None):
         """
-        Loads the objects file from storage space.
+        Loads the objects file from storage space, through the in-memory
+        :data:`STATIC_CACHE <daemon.filecache.STATIC_CACHE>`.
+
+        The file's ``ETag`` and ``Last-Modified`` validators are recorded
+        in :attr:`headers`, along with ``Content-Encoding`` when a
+        compressed variant is returned.
 
         :params path (str): relative path to the file.
         :params base_dir (str): base directory where the file is located.
+        :params encoding (str): content coding accepted by the client, if any.
 
-        :rtype tuple: (int, bytes) representing content length and content data.
+        :rtype tuple: (int, bytes) representing content length and content data;
+                      the data of a large file is a :class:`FileRegion
+                      <daemon.transmit.FileRegion>` to be sent with ``sendfile``.
         """
 
         filepath = os.path.join(base_dir, path.lstrip('/'))
 
         print("[Response] serving the object at location {}".format(filepath))
-            #
-            #  TODO: implement the step of fetch the object file
-            #        store in the return value of content
-            #
-        if not os.path.exists(filepath):
-            print("[Response] File not found:", filepath)
-            return 0, b""            
         try:
-            with open(filepath, "rb") as f:
-                content = f.read()
+            entry = STATIC_CACHE.get(filepath)
         except Exception as e:
             print("[Response] Error reading file:", e)
             return 0, b""
+        if entry is None:
+            print("[Response] File not found:", filepath)
+            return 0, b""
+
+        content, etag = entry.content, entry.etag
+        if is_compressible(self.headers.get("Content-Type", ""), entry.size):
+            self.headers["Vary"] = "Accept-Encoding"
+            variant = STATIC_CACHE.get_encoded(filepath, entry, encoding) if encoding else None
+            if variant is not None:
+                content, etag = variant
+                self.headers["Content-Encoding"] = encoding
+
+        self.headers["ETag"] = etag
+        self.headers["Last-Modified"] = entry.last_modified
+        self.headers["Accept-Ranges"] = "bytes"
         return len(content), content
 
 
@@ -255,63 +423,43 @@ class Response():
         Constructs the HTTP response headers based on the class:`Request <Request>
         and internal attributes.
 
+        The headers that only depend on the content type and caching policy
+        come from :func:`static_header_block`; the status line, length,
+        connection, date and per-file headers are added around it.
+
         :params request (class:`Request <Request>`): incoming request object.
 
         :rtypes bytes: encoded HTTP response header.
         """
-        reqhdr = request.headers
         rsphdr = self.headers
 
         status_code = self.status_code if self.status_code else 200
         reason = self.reason if self.reason else "OK"
 
-        #Build dynamic headers
-        headers = {
-                "Accept": "{}".format(reqhdr.get("Accept", "application/json")),
-                "Accept-Language": "{}".format(reqhdr.get("Accept-Language", "en-US,en;q=0.9")),
-                "Authorization": "{}".format(reqhdr.get("Authorization", "Basic <credentials>")),
-                "Cache-Control": "no-cache",
-                "Content-Type": "{}".format(self.headers['Content-Type']),
-                "Content-Length": "{}".format(len(self._content)),
-#                "Cookie": "{}".format(reqhdr.get("Cookie", "sessionid=xyz789")), #dummy cooki
-        #
-        # TODO prepare the request authentication
-        #
-	# self.auth = ...
-                "Date": "{}".format(datetime.datetime.utcnow().strftime("%a, %d %b %Y %H:%M:%S GMT")),
-                "Max-Forward": "10",
-                "Pragma": "no-cache",
-                "Proxy-Authorization": "Basic dXNlcjpwYXNz",  # example base64
-                "Warning": "199 Miscellaneous warning",
-                "User-Agent": "{}".format(reqhdr.get("User-Agent", "Chrome/123.0.0.0")),
-            }
+        lines = [
+            "HTTP/1.1 {} {}\r\n".format(status_code, reason).encode("utf-8"),
+            static_header_block(rsphdr["Content-Type"],
+                                rsphdr.get("Cache-Control", DEFAULT_CACHE_CONTROL)),
+            b"Content-Length: %d\r\n" % self.content_length(),
+            KEEP_ALIVE_LINE if self.keep_alive else CLOSE_LINE,
+            b"Date: " + http_date() + b"\r\n",
+        ]
+        for name in ("Accept-Ranges", "Content-Encoding", "Content-Range", "ETag",
+                     "Last-Modified", "Vary"):
+            if name in rsphdr:
+                lines.append("{}: {}\r\n".format(name, rsphdr[name]).encode("utf-8"))
 
-        # Header text alignment
-            #
-            #  TODO: implement the header building to create formated
-            #        header from the provied headers
-            #
         #
         # TODO prepare the request authentication
         #
 	# self.auth = ...
-        if hasattr(self, "cookies") and self.cookies:
-            cookie_parts = []
-            for k, v in self.cookies.items():
-                cookie_parts.append("{}={}; Path=/; HttpOnly; Max-Age=3600".format(k, v))
-            
-            if cookie_parts:
-                headers["Set-Cookie"] = cookie_parts[0]
+        if self.cookies:
+            k, v = next(iter(self.cookies.items()))
+            lines.append("Set-Cookie: {}={}; Path=/; HttpOnly; Max-Age=3600\r\n".format(
+                k, v).encode("utf-8"))
 
-        header_lines = [f"HTTP/1.1 {status_code} {reason}"]
-        for key, value in headers.items():
-            header_lines.append(f"{key}: {value}")
-
-        header_text = "\r\n".join(header_lines) + "\r\n\r\n"
-
-        fmt_header = header_text
-
-        return str(fmt_header).encode('utf-8')
+        lines.append(b"\r\n")
+        return b"".join(lines)
 
 
     def build_notfound(self):
@@ -327,10 +475,193 @@ class Response():
                 "Content-Type: text/html\r\n"
                 "Content-Length: 13\r\n"
                 "Cache-Control: max-age=86000\r\n"
-                "Connection: close\r\n"
+                "Connection: {}\r\n"
                 "\r\n"
                 "404 Not Found"
-            ).encode('utf-8')
+            ).format("keep-alive" if self.keep_alive else "close").encode('utf-8')
+
+
+    def prepare_cache_control(self, base_dir):
+        """
+        Sets the ``Cache-Control`` header from the policy of the directory
+        the file is served from.
+
+        :params base_dir (str): base directory of the file.
+        """
+        directory = base_dir[len(BASE_DIR):] if base_dir.startswith(BASE_DIR) else base_dir
+        self.headers["Cache-Control"] = CACHE_CONTROL.get(directory, DEFAULT_CACHE_CONTROL)
+
+
+    def is_not_modified(self, request):
+        """
+        Evaluates the conditional headers of a request against the
+        validators recorded by :meth:`build_content`.
+
+        ``If-None-Match`` takes precedence over ``If-Modified-Since``; the
+        entity tags are compared weakly, as for any ``GET``.
+
+        :params request (class:`Request <Request>`): incoming request object.
+
+        :rtype bool: ``True`` when the client's copy is still current.
+        """
+        if request.method not in ("GET", "HEAD"):
+            return False
+
+        if_none_match = request.get_header("if-none-match")
+        if if_none_match:
+            etag = self.headers.get("ETag")
+            if if_none_match.strip() == "*":
+                return True
+            for tag in if_none_match.split(","):
+                tag = tag.strip()
+                if tag.startswith("W/"):
+                    tag = tag[2:]
+                if tag == etag:
+                    return True
+            return False
+
+        if_modified_since = request.get_header("if-modified-since")
+        if if_modified_since and "Last-Modified" in self.headers:
+            since = parsedate_tz(if_modified_since)
+            if since is None:
+                return False
+            modified = parsedate_tz(self.headers["Last-Modified"])
+            return mktime_tz(modified) <= mktime_tz(since)
+        return False
+
+
+    def build_not_modified(self):
+        """
+        Constructs a ``304 Not Modified`` response carrying the validators
+        and caching headers, without a body.
+
+        :rtype bytes: Encoded 304 response.
+        """
+        self.status_code = 304
+        self.reason = "Not Modified"
+
+        headers = [
+            "HTTP/1.1 304 Not Modified",
+            "ETag: {}".format(self.headers["ETag"]),
+            "Last-Modified: {}".format(self.headers["Last-Modified"]),
+            "Cache-Control: {}".format(self.headers["Cache-Control"]),
+        ]
+        if "Vary" in self.headers:
+            headers.append("Vary: {}".format(self.headers["Vary"]))
+        headers += [
+            "Date: {}".format(http_date().decode("ascii")),
+            "Connection: {}".format("keep-alive" if self.keep_alive else "close"),
+        ]
+        return ("\r\n".join(headers) + "\r\n\r\n").encode("utf-8")
+
+
+    def select_ranges(self, request, size):
+        """
+        Decides which byte ranges of the file the request asks for.
+
+        The ``Range`` header is ignored for other methods than ``GET``, when
+        malformed, and when an ``If-Range`` validator does not match the
+        current ``ETag`` (strong comparison) or ``Last-Modified`` date.
+
+        :params request (class:`Request <Request>`): incoming request object.
+        :params size (int): length of the file.
+
+        :rtype list: inclusive (first, last) positions, an empty list when
+                     none is satisfiable, or ``None`` to send the whole file.
+        """
+        if request.method != "GET":
+            return None
+        value = request.get_header("range")
+        if not value:
+            return None
+
+        if_range = request.get_header("if-range")
+        if if_range:
+            if if_range.startswith('"') or if_range.startswith("W/"):
+                if if_range != self.headers.get("ETag"):
+                    return None
+            elif if_range != self.headers.get("Last-Modified"):
+                return None
+
+        return parse_range(value, size)
+
+
+    def prepare_partial_content(self, ranges, size):
+        """
+        Turns the response into ``206 Partial Content`` for the given ranges.
+
+        A single range replaces :attr:`_content` with that slice and sets
+        ``Content-Range``; several ranges make it a list of parts forming a
+        ``multipart/byteranges`` body. Slices of a large file stay
+        :class:`FileRegion <daemon.transmit.FileRegion>` parts.
+
+        :params ranges (list): inclusive (first, last) positions.
+        :params size (int): length of the file.
+        """
+        content = self._content
+
+        def part(first, last):
+            if isinstance(content, FileRegion):
+                return FileRegion(content.path, first, last - first + 1)
+            return content[first:last + 1]
+
+        self.status_code = 206
+        self.reason = "Partial Content"
+
+        if len(ranges) == 1:
+            first, last = ranges[0]
+            self._content = part(first, last)
+            self.headers["Content-Range"] = "bytes {}-{}/{}".format(first, last, size)
+            return
+
+        boundary = uuid.uuid4().hex
+        content_type = self.headers["Content-Type"]
+        parts = []
+        for first, last in ranges:
+            parts.append((
+                "\r\n--{}\r\n"
+                "Content-Type: {}\r\n"
+                "Content-Range: bytes {}-{}/{}\r\n"
+                "\r\n"
+            ).format(boundary, content_type, first, last, size).encode("utf-8"))
+            parts.append(part(first, last))
+        parts.append("\r\n--{}--\r\n".format(boundary).encode("utf-8"))
+
+        if not isinstance(content, FileRegion):
+            parts = [b"".join(parts)]
+        self._content = parts[0] if len(parts) == 1 else parts
+        self.headers["Content-Type"] = "multipart/byteranges; boundary={}".format(boundary)
+
+
+    def content_length(self):
+        """
+        Length of the body held in :attr:`_content`.
+
+        :rtype int: bytes of content, summed over the parts of a list.
+        """
+        if isinstance(self._content, list):
+            return sum(len(part) for part in self._content)
+        return len(self._content)
+
+
+    def build_range_not_satisfiable(self, size):
+        """
+        Constructs a ``416 Range Not Satisfiable`` response.
+
+        :params size (int): length of the file.
+
+        :rtype bytes: Encoded 416 response.
+        """
+        self.status_code = 416
+        self.reason = "Range Not Satisfiable"
+
+        return (
+                "HTTP/1.1 416 Range Not Satisfiable\r\n"
+                "Content-Range: bytes */{}\r\n"
+                "Content-Length: 0\r\n"
+                "Connection: {}\r\n"
+                "\r\n"
+            ).format(size, "keep-alive" if self.keep_alive else "close").encode("utf-8")
 
 
     def build_response(self, request):
@@ -339,7 +670,10 @@ class Response():
 
         :params request (class:`Request <Request>`): incoming request object.
 
-        :rtype bytes: complete HTTP response using prepared headers and content.
+        :rtype bytes: complete HTTP response using prepared headers and content,
+                      or a list of parts [header, ...] when the body holds
+                      :class:`FileRegion <daemon.transmit.FileRegion>` parts
+                      of a large file.
         """
 
         path = request.path
@@ -365,15 +699,34 @@ class Response():
         except Exception:
             return self.build_notfound()
         
-        c_len, content = self.build_content(path, base_dir)
+        # Ranges address the identity coding, so partial requests are not compressed.
+        encoding = None
+        if not request.get_header("range"):
+            encoding = choose_encoding(request.get_header("accept-encoding"))
+
+        c_len, content = self.build_content(path, base_dir, encoding)
         if c_len == 0 and content == b"":
             return self.build_notfound()
 
-        self._content = content
+        self.prepare_cache_control(base_dir)
+        if self.is_not_modified(request):
+            return self.build_not_modified()
 
+        self._content = content
         self.status_code = 200
         self.reason = "OK"
+
+        ranges = self.select_ranges(request, c_len)
+        if ranges == []:
+            return self.build_range_not_satisfiable(c_len)
+        if ranges:
+            self.prepare_partial_content(ranges, c_len)
+
         self._header = self.build_response_header(request)
 
+        if isinstance(self._content, FileRegion):
+            return [self._header, self._content]
+        if isinstance(self._content, list):
+            return [self._header] + self._content
         return self._header + self._content
     
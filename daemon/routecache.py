@@ -0,0 +1,141 @@
+#
+# Copyright (C) 2025 pdnguyen of HCMC University of Technology VNU-HCM.
+# All rights reserved.
+# This file is part of the CO3093/CO3094 course.
+#
+# WeApRous release
+#
+# The authors hereby grant to Licensee personal permission to use
+# and modify the Licensed Source Code for the sole purpose of studying
+# while attending the course
+#
+
+"""
+daemon.routecache
+~~~~~~~~~~~~~~~~~
+
+This module provides a :class:`ResponseCache <ResponseCache>` object that
+keeps the serialized responses of a route handler in memory, attached to
+the handler by :meth:`WeApRous.cache <daemon.weaprous.WeApRous.cache>`.
+
+Only ``GET`` and ``HEAD`` responses are cached, in shared entries: the
+server drops the body of a ``HEAD`` response on the way out. An entry is
+keyed by the request path and query string, the values of the request
+headers named in ``vary``, and what else shapes the bytes on the wire:
+the negotiated content coding and the ``Connection`` header. It is served
+until its ``ttl`` expires or the cache is invalidated; the least
+recently used entries are dropped beyond :data:`MAX_ENTRIES`. A response
+built while the cache was being invalidated is not stored, so a slow
+handler cannot put back the state the invalidation meant to drop.
+
+Each server process (see ``workers``) has its own caches, so an
+invalidation only reaches the process that handled the write; the
+``ttl`` bounds how stale the others can be.
+
+Usage::
+
+  >>> cache = ResponseCache(ttl=2.0, vary=["Cookie"])
+  >>> key = cache.key(req, keep_alive=True)
+  >>> cache.get(key) or cache.put(key, build(req))
+  >>> cache.invalidate()
+"""
+
+import time
+import threading
+from collections import OrderedDict
+
+from .compression import choose_encoding
+
+#: Responses kept per cached route.
+MAX_ENTRIES = 256
+
+#: Methods whose responses are cached.
+CACHEABLE_METHODS = ("GET", "HEAD")
+
+
+class ResponseCache:
+    """
+    Serialized responses of one route handler.
+
+    :attrs ttl (float): seconds an entry is served for.
+    :attrs vary (tuple): lower-cased names of the request headers keying entries.
+    :attrs max_entries (int): entries kept before evicting the least recently used.
+    :attrs entries (OrderedDict): key -> (expiry time, response bytes).
+    :attrs lock (threading.Lock): guards :attr:`entries` across worker threads.
+    :attrs generation (int): bumped by :meth:`invalidate`, part of every key.
+    :attrs hits (int): requests answered from the cache.
+    :attrs misses (int): cacheable requests that ran the handler.
+    """
+
+    def __init__(self, ttl=1.0, vary=(), max_entries=MAX_ENTRIES):
+        self.ttl = ttl
+        self.vary = tuple(name.lower() for name in vary)
+        self.max_entries = max_entries
+        self.entries = OrderedDict()
+        self.lock = threading.Lock()
+        self.generation = 0
+        self.hits = 0
+        self.misses = 0
+
+    def __repr__(self):
+        return "<ResponseCache ttl={} entries={} hits={} misses={}>".format(
+            self.ttl, len(self.entries), self.hits, self.misses)
+
+    def key(self, req, keep_alive):
+        """
+        Builds the cache key of a request.
+
+        :param req (Request): the prepared request.
+        :param keep_alive (bool): whether the response keeps the connection open.
+
+        :rtype tuple: the key, or ``None`` if the request is not cacheable.
+        """
+        if req.method not in CACHEABLE_METHODS:
+            return None
+        varying = tuple(req.get_header(name, "") for name in self.vary)
+        encoding = choose_encoding(req.get_header("accept-encoding"))
+        return (req.path, req.query_string, varying, encoding, keep_alive, self.generation)
+
+    def get(self, key):
+        """
+        Looks up a fresh response.
+
+        :param key (tuple): a key from :meth:`key`.
+
+        :rtype bytes: the cached response, or ``None``.
+        """
+        with self.lock:
+            entry = self.entries.get(key)
+            if entry is None or entry[0] <= time.monotonic():
+                if entry is not None:
+                    del self.entries[key]
+                self.misses += 1
+                return None
+            self.entries.move_to_end(key)
+            self.hits += 1
+            return entry[1]
+
+    def put(self, key, response):
+        """
+        Stores a response, unless the cache was invalidated since ``key``
+        was built.
+
+        :param key (tuple): a key from :meth:`key`.
+        :param response (bytes): the complete serialized response.
+
+        :rtype bytes: ``response``.
+        """
+        with self.lock:
+            if key[-1] != self.generation:
+                return response
+            self.entries[key] = (time.monotonic() + self.ttl, response)
+            self.entries.move_to_end(key)
+            while len(self.entries) > self.max_entries:
+                self.entries.popitem(last=False)
+        return response
+
+    def invalidate(self):
+        """Drops every entry, e.g. after a handler changed the state behind them."""
+        with self.lock:
+            self.generation += 1
+            self.entries.clear()
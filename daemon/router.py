@@ -0,0 +1,233 @@
+#
+# Copyright (C) 2025 pdnguyen of HCMC University of Technology VNU-HCM.
+# All rights reserved.
+# This file is part of the CO3093/CO3094 course.
+#
+# WeApRous release
+#
+# The authors hereby grant to Licensee personal permission to use
+# and modify the Licensed Source Code for the sole purpose of studying
+# while attending the course
+#
+
+"""
+daemon.router
+~~~~~~~~~~~~~~~~~
+
+This module provides a :class:`Router <Router>` object that compiles the
+``(method, path)`` route table of a :class:`WeApRous <daemon.weaprous.WeApRous>`
+app into a tree of path segments.
+
+Route paths may contain, as whole segments:
+
+- ``<name>`` or ``<str:name>``: any non-empty segment, passed as ``str``;
+- ``<int:name>``: a segment of digits, passed as ``int``;
+- ``*``: any single segment, not captured;
+- ``<path:name>`` (last segment only): the rest of the path, slashes included.
+
+Matching walks one tree level per path segment, trying at each level the
+literal segment first, then ``int``, ``str`` and ``*`` parameters, then
+``path`` wildcards, so its cost depends on the depth of the path and not on
+the number of routes. Routes without parameters are also kept in a flat
+dict that answers a literal path in a single lookup. A path that matches
+a route registered for other methods only is reported separately, so
+that it can be answered with ``405 Method Not Allowed`` instead of ``404``.
+``HEAD`` falls back to the ``GET`` handler of a route that has no
+``HEAD`` handler of its own (the server then drops the body).
+
+Usage::
+
+  >>> router = Router({("GET", "/channel/<name>/messages"): handler})
+  >>> router.match("GET", "/channel/general/messages")
+  (<function handler>, {'name': 'general'}, None)
+  >>> router.match("DELETE", "/channel/general/messages")
+  (None, None, ['GET'])
+"""
+
+
+def _int(segment):
+    # isdigit() also holds for e.g. "²", which int() rejects.
+    return int(segment) if segment.isascii() and segment.isdecimal() else None
+
+
+def _str(segment):
+    return segment or None
+
+
+#: Converter name -> function turning a segment into a value (``None``: no match).
+CONVERTERS = {
+    "int": _int,
+    "str": _str,
+}
+
+#: Order in which the parameter children of a node are tried.
+_PRIORITY = {"int": 0, "str": 1, "*": 2}
+
+
+class RouteNode:
+    """
+    One segment level of the route tree.
+
+    :attrs static (dict): literal segment -> child node.
+    :attrs params (list): (kind, name, converter, child) parameter children, by priority.
+    :attrs wildcard (tuple): (name, node) of a trailing ``<path:name>`` segment.
+    :attrs handlers (dict): method -> handler of the routes ending here.
+    """
+
+    __slots__ = ("static", "params", "wildcard", "handlers")
+
+    def __init__(self):
+        self.static = {}
+        self.params = []
+        self.wildcard = None
+        self.handlers = {}
+
+
+class Router(dict):
+    """
+    Compiled route table.
+
+    It is still the ``(method, path) -> handler`` mapping it was built from
+    (so it can be printed and compared like the plain route dict), with a
+    :meth:`match` method resolving a request against the compiled tree.
+
+    :attrs root (RouteNode): node of the empty path.
+    :attrs literal (dict): (method, path) -> handler of the parameterless routes.
+    """
+
+    def __init__(self, routes=None):
+        dict.__init__(self, routes or {})
+        self.root = RouteNode()
+        self.literal = {}
+        for (method, path), handler in self.items():
+            self.add(method, path, handler)
+
+    def add(self, method, path, handler):
+        """
+        Inserts one route into the tree.
+
+        :param method (str): HTTP method.
+        :param path (str): route path, possibly with parameter segments.
+        :param handler (callable): the route handler.
+
+        :raises ValueError: on an unknown converter or a misplaced ``path`` wildcard.
+        """
+        node = self.root
+        segments = path.split("/")[1:]
+        for i, segment in enumerate(segments):
+            if segment.startswith("<") and segment.endswith(">"):
+                kind, _, name = segment[1:-1].rpartition(":")
+                kind = kind or "str"
+                if kind == "path":
+                    if i != len(segments) - 1:
+                        raise ValueError("<path:{}> must end the route {}".format(name, path))
+                    if node.wildcard is None:
+                        node.wildcard = (name, RouteNode())
+                    node = node.wildcard[1]
+                    break
+                if kind not in CONVERTERS:
+                    raise ValueError("Unknown converter {!r} in route {}".format(kind, path))
+                node = self._param_child(node, kind, name, CONVERTERS[kind])
+            elif segment == "*":
+                node = self._param_child(node, "*", None, _str)
+            else:
+                node = node.static.setdefault(segment, RouteNode())
+        node.handlers[method.upper()] = handler
+        if "<" not in path and "*" not in path:
+            self.literal[(method.upper(), path)] = handler
+
+    def _param_child(self, node, kind, name, converter):
+        """Returns (creating it if needed) the parameter child of ``node``."""
+        for child_kind, child_name, _, child in node.params:
+            if child_kind == kind and child_name == name:
+                return child
+        child = RouteNode()
+        node.params.append((kind, name, converter, child))
+        node.params.sort(key=lambda param: _PRIORITY[param[0]])
+        return child
+
+    def match(self, method, path):
+        """
+        Resolves a request path.
+
+        :param method (str): HTTP method of the request.
+        :param path (str): request path, without query string.
+
+        :rtype tuple: (handler, params, allowed): the handler and its path
+                      parameters (``None`` when there are none) on a match;
+                      ``(None, None, methods)`` when the path exists for
+                      other methods only; ``(None, None, None)`` otherwise.
+        """
+        handler, params, allowed = self._lookup(method, path)
+        if handler is None and method == "HEAD":
+            handler, params, allowed = self._lookup("GET", path)
+        if allowed and "GET" in allowed and "HEAD" not in allowed:
+            allowed = sorted(allowed + ["HEAD"])
+        return handler, params, allowed
+
+    def _lookup(self, method, path):
+        """:meth:`match` without the ``HEAD`` fallback."""
+        handler = self.literal.get((method, path))
+        if handler is not None:
+            return handler, None, None
+
+        segments = path.split("/")[1:]
+        found = set()
+        handler, params = self._walk(self.root, segments, 0, method, {}, found)
+        if handler is not None:
+            return handler, params or None, None
+        if found:
+            return None, None, sorted(found)
+        return None, None, None
+
+    def _walk(self, node, segments, i, method, params, found):
+        """
+        Depth-first search for a node handling ``method``; the methods of
+        the nodes reached that only handle other methods are added to
+        ``found``.
+        """
+        if i == len(segments):
+            if method in node.handlers:
+                return node.handlers[method], params
+            found.update(node.handlers)
+            return None, None
+
+        segment = segments[i]
+        child = node.static.get(segment)
+        if child is not None:
+            handler, result = self._walk(child, segments, i + 1, method, params, found)
+            if handler is not None:
+                return handler, result
+
+        for kind, name, converter, child in node.params:
+            value = converter(segment)
+            if value is None:
+                continue
+            if name is None:
+                handler, result = self._walk(child, segments, i + 1, method, params, found)
+            else:
+                handler, result = self._walk(child, segments, i + 1, method,
+                                             dict(params, **{name: value}), found)
+            if handler is not None:
+                return handler, result
+
+        if node.wildcard is not None:
+            name, child = node.wildcard
+            rest = "/".join(segments[i:])
+            if method in child.handlers:
+                return child.handlers[method], dict(params, **{name: rest})
+            found.update(child.handlers)
+        return None, None
+
+
+def compile_routes(routes):
+    """
+    Compiles a route table, once.
+
+    :param routes (dict): ``(method, path)`` -> handler mapping, or a :class:`Router`.
+
+    :rtype Router: the compiled routes.
+    """
+    if isinstance(routes, Router):
+        return routes
+    return Router(routes)
@@ -0,0 +1,361 @@
+#
+# Copyright (C) 2025 pdnguyen of HCMC University of Technology VNU-HCM.
+# All rights reserved.
+# This file is part of the CO3093/CO3094 course.
+#
+# WeApRous release
+#
+# The authors hereby grant to Licensee personal permission to use
+# and modify the Licensed Source Code for the sole purpose of studying
+# while attending the course
+#
+
+"""
+daemon.transmit
+~~~~~~~~~~~~~~~~~
+
+This module writes responses to client sockets for the server engines.
+
+A response is either ``bytes`` or a list of parts, each part being ``bytes``,
+a :class:`FileRegion <FileRegion>` or a :class:`ChunkedStream <ChunkedStream>`.
+File regions are sent with ``sendfile``: the kernel copies the file
+straight from the page cache to the socket, so large static files never
+pass through Python memory. Chunked streams pull the body from a route
+handler's (async) iterator one chunk at a time, as the socket drains.
+
+Notes:
+------
+- :func:`sendall_responses` serves blocking sockets (thread and pool
+  engines), :func:`write_responses` asyncio streams, and
+  :meth:`FileRegion.send` / :meth:`ChunkedStream.next_frame` the
+  non-blocking writes of the selector engine.
+- Platforms without ``os.sendfile`` fall back to reading the file in
+  blocks of :data:`BLOCK_SIZE` bytes.
+
+Usage::
+
+  >>> parts = [b"HTTP/1.1 200 OK\\r\\nContent-Length: 1048576\\r\\n\\r\\n",
+  ...          FileRegion("static/video/intro.mp4", 0, 1048576)]
+  >>> sendall_responses(sock, [parts])
+"""
+
+import os
+import json
+import asyncio
+
+#: Bytes read per step when ``os.sendfile`` is unavailable.
+BLOCK_SIZE = 65536
+
+
+class FileRegion:
+    """
+    A byte range of a file to be sent as (part of) a response body.
+
+    :attrs path (str): path of the file.
+    :attrs offset (int): offset of the next byte to send.
+    :attrs count (int): bytes left to send.
+    :attrs file (file): the file, opened on first use.
+    """
+
+    __slots__ = ("path", "offset", "count", "file")
+
+    def __init__(self, path, offset, count):
+        self.path = path
+        self.offset = offset
+        self.count = count
+        self.file = None
+
+    def __len__(self):
+        return self.count
+
+    def __repr__(self):
+        return "<FileRegion {} [{}:+{}]>".format(self.path, self.offset, self.count)
+
+    def open(self):
+        """
+        Opens the file if it is not open yet.
+
+        :rtype file: the binary file object.
+        """
+        if self.file is None:
+            self.file = open(self.path, "rb")
+        return self.file
+
+    def close(self):
+        """Closes the file, if opened."""
+        if self.file is not None:
+            self.file.close()
+            self.file = None
+
+    def send(self, sock):
+        """
+        Sends as much of the region as the (non-blocking) socket accepts.
+
+        :param sock (socket.socket): the client socket.
+
+        :rtype int: number of bytes sent.
+
+        :raises BlockingIOError: if the socket cannot accept data right now.
+        :raises OSError: if the file ends before the region does.
+        """
+        if not self.count:
+            return 0
+        fileno = self.open().fileno()
+        if hasattr(os, "sendfile"):
+            sent = os.sendfile(sock.fileno(), fileno, self.offset, self.count)
+        else:
+            data = os.pread(fileno, min(self.count, BLOCK_SIZE), self.offset)
+            sent = sock.send(data) if data else 0
+        if sent == 0 and self.count:
+            raise OSError("{} is shorter than announced".format(self.path))
+        self.offset += sent
+        self.count -= sent
+        return sent
+
+
+class ChunkedStream:
+    """
+    A response body produced by an iterator or async iterator, sent with
+    ``Transfer-Encoding: chunked`` (or close-delimited, for HTTP/1.0 clients).
+
+    Items may be ``bytes``, ``str`` or JSON-serializable values; empty
+    items are skipped. An exception raised by the iterator ends the
+    stream with an ``OSError``, which makes the engines drop the
+    connection (the response is already under way).
+
+    :attrs source (iterator): the handler's iterator or async iterator.
+    :attrs chunked (bool): frame the items as HTTP chunks.
+    :attrs loop (asyncio.AbstractEventLoop): private loop driving an async
+                                              iterator from blocking code.
+    :attrs finished (bool): set once the last frame has been produced.
+    """
+
+    __slots__ = ("source", "chunked", "loop", "finished")
+
+    def __init__(self, source, chunked=True):
+        self.source = source
+        self.chunked = chunked
+        self.loop = None
+        self.finished = False
+
+    def __repr__(self):
+        return "<ChunkedStream {!r}>".format(self.source)
+
+    def frame(self, item):
+        """
+        Encodes one item of the iterator.
+
+        :param item (bytes|str|object): the item.
+
+        :rtype bytes: the framed chunk, empty for an empty item.
+        """
+        if isinstance(item, (bytes, bytearray, memoryview)):
+            data = bytes(item)
+        elif isinstance(item, str):
+            data = item.encode("utf-8")
+        else:
+            data = json.dumps(item).encode("utf-8")
+        if not data or not self.chunked:
+            return data
+        return b"%x\r\n%b\r\n" % (len(data), data)
+
+    def last_frame(self):
+        """Marks the stream finished and returns the terminating chunk."""
+        self.finished = True
+        self.close()
+        return b"0\r\n\r\n" if self.chunked else b""
+
+    def next_frame(self):
+        """
+        Pulls the next non-empty frame, from blocking code.
+
+        :rtype bytes: the next frame, or ``None`` once the stream is over.
+
+        :raises OSError: if the iterator fails.
+        """
+        is_async = hasattr(self.source, "__anext__")
+        while not self.finished:
+            try:
+                if is_async:
+                    if self.loop is None:
+                        self.loop = asyncio.new_event_loop()
+                    item = self.loop.run_until_complete(self.source.__anext__())
+                else:
+                    item = next(self.source)
+            except (StopIteration, StopAsyncIteration):
+                return self.last_frame() or None
+            except Exception as e:
+                self.close()
+                raise OSError("stream handler failed: {}".format(e))
+            data = self.frame(item)
+            if data:
+                return data
+        return None
+
+    async def anext_frame(self):
+        """
+        Pulls the next non-empty frame on a running event loop; plain
+        iterators are advanced in the loop's default executor.
+
+        :rtype bytes: the next frame, or ``None`` once the stream is over.
+
+        :raises OSError: if the iterator fails.
+        """
+        loop = asyncio.get_running_loop()
+        done = object()
+        while not self.finished:
+            try:
+                if hasattr(self.source, "__anext__"):
+                    item = await self.source.__anext__()
+                else:
+                    item = await loop.run_in_executor(None, next, self.source, done)
+                    if item is done:
+                        raise StopIteration
+            except (StopIteration, StopAsyncIteration):
+                return self.last_frame() or None
+            except Exception as e:
+                await self.aclose()
+                raise OSError("stream handler failed: {}".format(e))
+            data = self.frame(item)
+            if data:
+                return data
+        return None
+
+    def close(self):
+        """Closes the iterator, e.g. when the client went away."""
+        self.finished = True
+        source, loop = self.source, self.loop
+        self.loop = None
+        try:
+            if hasattr(source, "aclose"):
+                if loop is not None:
+                    loop.run_until_complete(source.aclose())
+            elif hasattr(source, "close"):
+                source.close()
+        except Exception:
+            pass
+        finally:
+            if loop is not None:
+                loop.close()
+
+    async def aclose(self):
+        """Closes the iterator from a running event loop."""
+        if hasattr(self.source, "aclose") and self.loop is None:
+            self.finished = True
+            try:
+                await self.source.aclose()
+            except Exception:
+                pass
+        else:
+            self.close()
+
+
+def flatten(responses):
+    """
+    Turns a batch of responses into parts ready to be sent, joining
+    consecutive ``bytes`` so that they go out in a single write.
+
+    :param responses (list): responses, each ``bytes`` or a list of parts.
+
+    :rtype list: ``bytes``, :class:`FileRegion` and :class:`ChunkedStream`
+                 parts, in order.
+    """
+    parts = []
+    pending = []
+    for response in responses:
+        for part in ((response,) if isinstance(response, bytes) else response):
+            if isinstance(part, (FileRegion, ChunkedStream)):
+                if pending:
+                    parts.append(b"".join(pending))
+                    pending = []
+                parts.append(part)
+            else:
+                pending.append(part)
+    if pending:
+        parts.append(b"".join(pending))
+    return parts
+
+
+def close_parts(parts):
+    """
+    Closes the files of the regions and the iterators of the streams left
+    unsent, e.g. on a connection error.
+
+    :param parts (iterable): parts of a response batch.
+    """
+    for part in parts:
+        if isinstance(part, (FileRegion, ChunkedStream)):
+            part.close()
+
+
+def sendall_responses(sock, responses):
+    """
+    Sends a batch of responses on a blocking socket.
+
+    :param sock (socket.socket): the client socket.
+    :param responses (list): responses, each ``bytes`` or a list of parts.
+
+    :raises OSError: on socket errors, or if a file ends early.
+    """
+    parts = flatten(responses)
+    try:
+        for part in parts:
+            if isinstance(part, ChunkedStream):
+                frame = part.next_frame()
+                while frame is not None:
+                    sock.sendall(frame)
+                    frame = part.next_frame()
+                continue
+            if not isinstance(part, FileRegion):
+                sock.sendall(part)
+                continue
+            if part.count:
+                sent = sock.sendfile(part.open(), part.offset, part.count)
+                if sent != part.count:
+                    raise OSError("{} is shorter than announced".format(part.path))
+            part.close()
+    finally:
+        close_parts(parts)
+
+
+async def write_responses(writer, responses):
+    """
+    Writes a batch of responses to an asyncio stream.
+
+    File regions go through :meth:`loop.sendfile
+    <asyncio.AbstractEventLoop.sendfile>`, which uses ``os.sendfile`` on
+    plain TCP transports and falls back to reading the file otherwise.
+
+    :param writer (asyncio.StreamWriter): the client output stream.
+    :param responses (list): responses, each ``bytes`` or a list of parts.
+
+    :raises OSError: on socket errors, or if a file ends early.
+    """
+    parts = flatten(responses)
+    loop = asyncio.get_running_loop()
+    try:
+        for part in parts:
+            if isinstance(part, ChunkedStream):
+                frame = await part.anext_frame()
+                while frame is not None:
+                    writer.write(frame)
+                    await writer.drain()
+                    frame = await part.anext_frame()
+                continue
+            if not isinstance(part, FileRegion):
+                writer.write(part)
+                continue
+            if part.count:
+                await writer.drain()
+                sent = await loop.sendfile(writer.transport, part.open(),
+                                           part.offset, part.count)
+                if sent != part.count:
+                    raise OSError("{} is shorter than announced".format(part.path))
+            part.close()
+        await writer.drain()
+    finally:
+        for part in parts:
+            if isinstance(part, ChunkedStream):
+                await part.aclose()
+            elif isinstance(part, FileRegion):
+                part.close()
@@ -0,0 +1,532 @@
+#
+# Copyright (C) 2025 pdnguyen of HCMC University of Technology VNU-HCM.
+# All rights reserved.
+# This file is part of the CO3093/CO3094 course.
+#
+# WeApRous release
+#
+# The authors hereby grant to Licensee personal permission to use
+# and modify the Licensed Source Code for the sole purpose of studying
+# while attending the course
+#
+
+"""
+daemon.upstream
+~~~~~~~~~~~~~~~~~
+
+This module provides an :class:`UpstreamPool <UpstreamPool>` object that
+keeps persistent connections to the proxy's backends, so a proxied request
+does not pay for a TCP handshake with the backend every time.
+
+Reusing a connection needs to know where a response ends without waiting
+for the backend to close: a :class:`MessageFramer <MessageFramer>`
+follows its ``Content-Length`` or ``chunked`` framing (responses without
+a body are recognized by method and status). A response only delimited
+by the connection close is read to EOF and its connection discarded.
+
+The framer only looks at the bytes going past, so :func:`relay` can
+stream a body between two sockets through a fixed buffer.
+
+Pool policy, per ``(host, port)`` upstream:
+
+- at most ``max_per_host`` connections are open (checked out or idle);
+  further requests wait for one to be released;
+- at most ``max_idle`` idle connections are kept, the extra ones closed;
+- idle connections older than ``idle_timeout`` are closed on the next
+  pool access, before the backend's own keep-alive timeout closes them;
+- a connection is checked on checkout: one the backend has closed, or
+  with unexpected bytes pending, is discarded;
+- the caller releases a connection as reusable only once a response
+  ended on its framing; it may retry a request that failed on a reused
+  connection before any response byte was read (the backend closed it
+  in the meantime), at worst on a new connection.
+
+Usage::
+
+  >>> pool = UpstreamPool(max_idle=4, max_per_host=16)
+  >>> conn, reused = pool.acquire("127.0.0.1", 9001)
+  >>> conn.sock.sendall(request)
+  >>> head, rest = read_head(conn.sock)
+  >>> length, keep_alive = response_framing(head, head_only=False)
+  >>> leftover = relay(conn.sock, client, MessageFramer(length), rest)
+  >>> pool.release(conn, keep_alive and not leftover and length is not None)
+"""
+
+import re
+import time
+import socket
+import threading
+from collections import deque
+
+#: Idle connections kept per upstream.
+MAX_IDLE = 8
+
+#: Open connections (idle or in use) allowed per upstream.
+MAX_PER_HOST = 32
+
+#: Seconds an idle connection is kept; below the backend's ``KEEPALIVE_TIMEOUT``.
+IDLE_TIMEOUT = 4.0
+
+#: Seconds allowed to connect to an upstream.
+CONNECT_TIMEOUT = 5.0
+
+#: Seconds allowed between two reads of a response.
+READ_TIMEOUT = 30.0
+
+#: Seconds a request waits for a connection when ``max_per_host`` are in use.
+CHECKOUT_TIMEOUT = 10.0
+
+#: Bytes read from an upstream per ``recv`` call.
+RECV_SIZE = 65536
+
+#: Largest response head accepted from an upstream, in bytes.
+MAX_HEAD_SIZE = 64 * 1024
+
+#: A Content-Length: ASCII digits only (no sign, spaces or underscores).
+CONTENT_LENGTH = re.compile(rb"[0-9]+")
+
+
+class UpstreamError(OSError):
+    """
+    An upstream response could not be read or was malformed.
+
+    :attrs received (int): response bytes read before the error.
+    """
+
+    def __init__(self, message, received=0):
+        OSError.__init__(self, message)
+        self.received = received
+
+
+class UpstreamConnectError(OSError):
+    """
+    No connection to the upstream could be had: connecting failed or the
+    pool stayed full. Nothing was sent, so the request may go elsewhere.
+    """
+
+
+class UpstreamBusyError(UpstreamConnectError):
+    """
+    The pool stayed full for :data:`CHECKOUT_TIMEOUT`: the proxy itself has
+    too many requests in flight to the upstream, which is not at fault.
+    """
+
+
+class RelayError(OSError):
+    """
+    :func:`relay` failed.
+
+    :attrs reading (bool): the source socket failed or closed before the
+                           end of the body; otherwise the destination failed.
+    """
+
+    def __init__(self, message, reading):
+        OSError.__init__(self, message)
+        self.reading = reading
+
+
+class UpstreamConnection:
+    """
+    One connection to an upstream.
+
+    :attrs sock (socket.socket): the connected socket.
+    :attrs key (tuple): the ``(host, port)`` upstream.
+    :attrs idle_since (float): monotonic time it was last released.
+    :attrs requests (int): responses read on it so far.
+    """
+
+    __slots__ = ("sock", "key", "idle_since", "requests")
+
+    def __init__(self, sock, key):
+        self.sock = sock
+        self.key = key
+        self.idle_since = time.monotonic()
+        self.requests = 0
+
+    def __repr__(self):
+        return "<UpstreamConnection {}:{} requests={}>".format(
+            self.key[0], self.key[1], self.requests)
+
+    def is_usable(self):
+        """
+        Tells whether an idle connection can carry a new request: the
+        backend has not closed it and has not sent anything unasked.
+
+        :rtype bool: ``True`` if the connection can be reused.
+        """
+        timeout = self.sock.gettimeout()
+        self.sock.settimeout(0)
+        try:
+            # b"": closed by the backend; anything else: out of sync.
+            self.sock.recv(1, socket.MSG_PEEK)
+            return False
+        except BlockingIOError:
+            return True
+        except OSError:
+            return False
+        finally:
+            self.sock.settimeout(timeout)
+
+    def close(self):
+        """Closes the socket."""
+        try:
+            self.sock.close()
+        except OSError:
+            pass
+
+
+def response_framing(head, head_only):
+    """
+    Reads the body framing out of a response head.
+
+    :param head (bytes): status line and headers, without the blank line.
+    :param head_only (bool): the request was ``HEAD``, so there is no body.
+
+    :rtype tuple: (length, keep_alive): the body length, ``-1`` for chunked
+                  or ``None`` for a body delimited by the connection close;
+                  and whether the upstream keeps the connection open.
+    """
+    lines = head.split(b"\r\n")
+    status = lines[0].split(None, 2)
+    if len(status) < 2 or not CONTENT_LENGTH.fullmatch(status[1]):
+        raise UpstreamError("malformed status line {!r}".format(lines[0][:80]), len(head))
+    code = int(status[1])
+    keep_alive = status[0] == b"HTTP/1.1"
+
+    length = None
+    for line in lines[1:]:
+        name, _, value = line.partition(b":")
+        name = name.strip().lower()
+        value = value.strip().lower()
+        if name == b"connection":
+            if b"close" in value:
+                keep_alive = False
+            elif b"keep-alive" in value:
+                keep_alive = True
+        elif name == b"transfer-encoding" and value.endswith(b"chunked"):
+            length = -1
+        elif name == b"content-length" and length != -1:
+            if not CONTENT_LENGTH.fullmatch(value):
+                raise UpstreamError("malformed Content-Length {!r}".format(value), len(head))
+            length = int(value)
+
+    if head_only or code < 200 or code in (204, 304):
+        length = 0
+    if length is None:
+        keep_alive = False
+    return length, keep_alive
+
+
+def request_framing(head):
+    """
+    Reads the body framing out of a request head.
+
+    :param head (bytes): request line and headers, without the blank line.
+
+    :rtype int: the body length (0 without one), or ``-1`` for chunked.
+
+    :raises ValueError: on a malformed ``Content-Length`` or a
+                        ``Transfer-Encoding`` other than chunked.
+    """
+    length = 0
+    for line in head.split(b"\r\n")[1:]:
+        name, _, value = line.partition(b":")
+        name = name.strip().lower()
+        value = value.strip()
+        if name == b"transfer-encoding":
+            if value.lower().endswith(b"chunked"):
+                return -1
+            raise ValueError("unsupported Transfer-Encoding {!r}".format(value))
+        if name == b"content-length":
+            if not CONTENT_LENGTH.fullmatch(value):
+                raise ValueError("malformed Content-Length {!r}".format(value))
+            length = int(value)
+    return length
+
+
+def read_head(sock, max_size=MAX_HEAD_SIZE):
+    """
+    Reads the head of a message from a socket.
+
+    :param sock (socket.socket): the socket.
+    :param max_size (int): largest head accepted, in bytes.
+
+    :rtype tuple: (head, rest): the head without the blank line ending it,
+                  and the bytes read past it (the start of the body).
+
+    :raises UpstreamError: if the peer closes first or the head is too large.
+    """
+    buf = bytearray()
+    scan = 0
+    while True:
+        pos = buf.find(b"\r\n\r\n", scan)
+        if pos >= 0:
+            return bytes(buf[:pos]), bytes(buf[pos + 4:])
+        if len(buf) > max_size:
+            raise UpstreamError("head too large", len(buf))
+        scan = max(0, len(buf) - 3)
+        data = sock.recv(RECV_SIZE)
+        if not data:
+            raise UpstreamError("peer closed after {} bytes".format(len(buf)), len(buf))
+        buf += data
+
+
+#: :class:`MessageFramer` states of a chunked body.
+_SIZE, _DATA, _TRAILER = range(3)
+
+#: Longest chunk-size or trailer line accepted, in bytes.
+MAX_LINE_SIZE = 4096
+
+#: A chunk size: hexadecimal digits only (no sign, prefix or underscores).
+CHUNK_SIZE = re.compile(rb"[0-9A-Fa-f]+")
+
+
+class MessageFramer:
+    """
+    Finds where a message body ends while its bytes stream past, without
+    keeping them: a ``Content-Length`` is counted down, ``chunked`` framing
+    is followed chunk by chunk, a body delimited by the connection close
+    never ends.
+
+    :attrs length (int): the framing, as from :func:`response_framing`.
+    :attrs remaining (int): bytes left in the body, or in the current chunk
+                            (its data and CRLF).
+    :attrs state (int): position in the chunked framing.
+    :attrs line (bytearray): partial chunk-size or trailer line.
+    :attrs done (bool): set once the body is complete.
+    """
+
+    __slots__ = ("length", "remaining", "state", "line", "done")
+
+    def __init__(self, length):
+        self.length = length
+        self.remaining = length if length is not None and length > 0 else 0
+        self.state = _SIZE
+        self.line = bytearray()
+        self.done = length == 0
+
+    def feed(self, data, start=0, end=None):
+        """
+        Consumes body bytes.
+
+        :param data (bytes|bytearray): buffer holding the bytes.
+        :param start (int): offset of the first byte to consume.
+        :param end (int): offset past the last byte (default: end of ``data``).
+
+        :rtype int: offset past the last byte of the body in ``data``; it
+                    is ``end`` unless the body ended before.
+
+        :raises UpstreamError: on a malformed chunked framing.
+        """
+        if end is None:
+            end = len(data)
+        if self.done:
+            return start
+        if self.length is None:
+            return end
+        if self.length > 0:
+            n = min(self.remaining, end - start)
+            self.remaining -= n
+            self.done = not self.remaining
+            return start + n
+
+        pos = start
+        while pos < end and not self.done:
+            if self.state == _DATA:
+                n = min(self.remaining, end - pos)
+                pos += n
+                self.remaining -= n
+                if not self.remaining:
+                    self.state = _SIZE
+                continue
+
+            newline = data.find(b"\n", pos, end)
+            stop = end if newline < 0 else newline + 1
+            self.line += data[pos:stop]
+            pos = stop
+            if len(self.line) > MAX_LINE_SIZE:
+                raise UpstreamError("chunked line too long", pos)
+            if newline < 0:
+                break
+
+            line = bytes(self.line).strip()
+            del self.line[:]
+            if self.state == _TRAILER:
+                self.done = not line
+                continue
+            size_field = line.split(b";", 1)[0].strip()
+            if not CHUNK_SIZE.fullmatch(size_field):
+                raise UpstreamError("malformed chunk size {!r}".format(line[:20]), pos)
+            size = int(size_field, 16)
+            if size:
+                self.state = _DATA
+                self.remaining = size + 2
+            else:
+                self.state = _TRAILER
+        return pos
+
+
+#: Per-thread buffer that :func:`relay` copies through.
+_scratch = threading.local()
+
+
+def relay(src, dst, framer, pending=b""):
+    """
+    Copies one message body from ``src`` to ``dst`` as it arrives, through
+    a fixed buffer of :data:`RECV_SIZE` bytes, so memory use does not grow
+    with the body.
+
+    :param src (socket.socket): the socket the body comes from.
+    :param dst (socket.socket): the socket it goes to.
+    :param framer (MessageFramer): the framing of the body.
+    :param pending (bytes): body bytes already read from ``src``.
+
+    :rtype int: bytes read from ``src`` past the end of the body.
+
+    :raises RelayError: if either socket fails, or ``src`` closes before
+                        the body ends; ``reading`` tells which side.
+    :raises UpstreamError: on a malformed chunked framing.
+    """
+    if pending:
+        end = framer.feed(pending)
+        if end:
+            _send(dst, pending[:end])
+        if framer.done:
+            return len(pending) - end
+
+    buf = getattr(_scratch, "buf", None)
+    if buf is None:
+        buf = _scratch.buf = bytearray(RECV_SIZE)
+    view = memoryview(buf)
+    while not framer.done:
+        try:
+            n = src.recv_into(buf)
+        except OSError as e:
+            raise RelayError("read failed: {}".format(e), True)
+        if not n:
+            if framer.length is None:
+                framer.done = True
+                return 0
+            raise RelayError("peer closed before the end of the body", True)
+        end = framer.feed(buf, 0, n)
+        if end:
+            _send(dst, view[:end])
+        if framer.done:
+            return n - end
+    return 0
+
+
+def _send(dst, data):
+    """Sends relayed bytes, raising :class:`RelayError` on failure."""
+    try:
+        dst.sendall(data)
+    except OSError as e:
+        raise RelayError("write failed: {}".format(e), False)
+
+
+class UpstreamPool:
+    """
+    Persistent connections to the upstreams, shared by the proxy threads.
+
+    :attrs max_idle (int): idle connections kept per upstream.
+    :attrs max_per_host (int): open connections allowed per upstream.
+    :attrs idle_timeout (float): seconds an idle connection is kept.
+    :attrs idle (dict): ``(host, port)`` -> deque of idle connections, most
+                        recently released last.
+    :attrs open (dict): ``(host, port)`` -> number of open connections.
+    :attrs cond (threading.Condition): guards the two maps; notified on release.
+    """
+
+    def __init__(self, max_idle=MAX_IDLE, max_per_host=MAX_PER_HOST,
+                 idle_timeout=IDLE_TIMEOUT):
+        self.max_idle = max_idle
+        self.max_per_host = max_per_host
+        self.idle_timeout = idle_timeout
+        self.idle = {}
+        self.open = {}
+        self.cond = threading.Condition()
+
+    def __repr__(self):
+        return "<UpstreamPool open={} idle={}>".format(
+            dict(self.open), {key: len(conns) for key, conns in self.idle.items()})
+
+    def _evict_expired(self, key, now):
+        """Closes the idle connections of ``key`` past the idle timeout; needs :attr:`cond`."""
+        conns = self.idle.get(key)
+        while conns and now - conns[0].idle_since > self.idle_timeout:
+            self._discard(conns.popleft())
+
+    def _discard(self, conn):
+        """Closes a connection and forgets it; needs :attr:`cond`."""
+        conn.close()
+        self.open[conn.key] -= 1
+        self.cond.notify()
+
+    def acquire(self, host, port):
+        """
+        Checks out a connection to an upstream, reusing an idle one if a
+        healthy one is left.
+
+        :param host (str): upstream IP address.
+        :param port (int): upstream port.
+
+        :rtype tuple: (connection, reused).
+
+        :raises UpstreamBusyError: if no connection frees up in time.
+        :raises UpstreamConnectError: if connecting fails.
+        """
+        key = (host, port)
+        deadline = time.monotonic() + CHECKOUT_TIMEOUT
+        with self.cond:
+            while True:
+                self._evict_expired(key, time.monotonic())
+                conns = self.idle.get(key)
+                while conns:
+                    conn = conns.pop()
+                    if conn.is_usable():
+                        return conn, True
+                    self._discard(conn)
+                if self.open.get(key, 0) < self.max_per_host:
+                    self.open[key] = self.open.get(key, 0) + 1
+                    break
+                remaining = deadline - time.monotonic()
+                if remaining <= 0 or not self.cond.wait(remaining):
+                    raise UpstreamBusyError("no connection to {}:{} freed up".format(host, port))
+
+        try:
+            sock = socket.create_connection(key, timeout=CONNECT_TIMEOUT)
+            sock.settimeout(READ_TIMEOUT)
+            sock.setsockopt(socket.IPPROTO_TCP, socket.TCP_NODELAY, 1)
+        except OSError as e:
+            with self.cond:
+                self.open[key] -= 1
+                self.cond.notify()
+            raise UpstreamConnectError("cannot connect to {}:{}: {}".format(host, port, e))
+        return UpstreamConnection(sock, key), False
+
+    def release(self, conn, reusable):
+        """
+        Returns a checked out connection.
+
+        :param conn (UpstreamConnection): the connection.
+        :param reusable (bool): whether its last response left it reusable.
+        """
+        with self.cond:
+            conns = self.idle.setdefault(conn.key, deque())
+            if not reusable or len(conns) >= self.max_idle:
+                self._discard(conn)
+                return
+            conn.idle_since = time.monotonic()
+            conns.append(conn)
+            self.cond.notify()
+
+    def close(self):
+        """Closes every idle connection."""
+        with self.cond:
+            for conns in self.idle.values():
+                while conns:
+                    self._discard(conns.popleft())
+
+
+#: Pool used by :func:`daemon.proxy.stream_request`.
+UPSTREAM_POOL = UpstreamPool()
@@ -17,7 +17,20 @@ deamon.weaproute
 This module provides a WeApRous object to deploy RESTful url web app with routing
 """
 
-from .backend import create_backend
+import inspect
+
+from .backend import create_backend, POOL_SIZE, QUEUE_SIZE
+from .router import compile_routes
+from .routecache import ResponseCache
+
+def _accepts_query(func):
+    """Tells whether a handler takes a ``query`` keyword argument."""
+    try:
+        parameters = inspect.signature(func).parameters.values()
+    except (TypeError, ValueError):
+        return False
+    return any(p.name == "query" or p.kind is p.VAR_KEYWORD for p in parameters)
+
 
 class WeApRous:
     """The fully mutable :class:`WeApRous <WeApRous>` object, which is a lightweight,
@@ -40,7 +53,20 @@ class WeApRous:
       >>> def hello(headers, body):
       >>>     return {'message': 'Hello, world!'}
 
+      >>> @app.route('/status', methods=['GET'])
+      >>> @app.cache(ttl=2, vary=['Cookie'])
+      >>> def status(headers, body):
+      >>>     return {'peers': len(peers)}
+      >>> app.invalidate('/status')
+
+      >>> @app.route('/notify', methods=['POST'])
+      >>> async def notify(headers, body):
+      >>>     await asyncio.sleep(0)
+      >>>     return {'message': 'Notified'}
+
       >>> app.run()
+      >>> app.run(mode="pool", pool_size=16, queue_size=64)
+      >>> app.run(mode="selector", workers=4)
     """
 
     def __init__(self):
@@ -68,6 +94,25 @@ class WeApRous:
         """
         Decorator to register a route handler for a specific path and HTTP methods.
 
+        Handlers may be plain functions or ``async def`` coroutines; the latter
+        are awaited by the ``asyncio`` server mode. A handler returning an
+        iterator (e.g. a generator or an ``async def`` generator) has its
+        items streamed to the client with ``Transfer-Encoding: chunked``.
+
+        The path may hold parameter segments (``<name>``, ``<int:id>``,
+        ``<path:rest>``, ``*``, see :mod:`daemon.router`); captured values
+        are passed to the handler as keyword arguments::
+
+          @app.route('/channel/<name>/messages', methods=['GET'])
+          def messages(headers, body, name): ...
+
+        Routes match on the path only. A handler declaring a ``query``
+        parameter (or ``**kwargs``) also receives the parsed query string
+        as a dict::
+
+          @app.route('/get-list', methods=['GET'])
+          def get_list(headers, body, query): ...  # GET /get-list?channel=x
+
         :param path (str): The URL path to route.
         :param methods (list): A list of HTTP methods (e.g., ['GET', 'POST']) to bind.
 
@@ -80,22 +125,73 @@ class WeApRous:
             # Optional attach route metadata to the function
             func._route_path = path
             func._route_methods = methods
+            func._route_async = (inspect.iscoroutinefunction(func)
+                                 or inspect.isasyncgenfunction(func))
+            func._route_query = _accepts_query(func)
 
             return func
         return decorator
 
-    def run(self):
+    def cache(self, ttl=1.0, vary=()):
+        """
+        Decorator caching the serialized ``GET``/``HEAD`` responses of a
+        route handler, for handlers whose result only changes with the
+        application state (see :mod:`daemon.routecache`).
+
+        It may be stacked above or below :meth:`route`. Handlers changing
+        the state behind a cached route call :meth:`invalidate`.
+
+        :param ttl (float): Seconds a response is served from the cache.
+        :param vary (list): Request headers (e.g. ``['Cookie']``) whose
+                            values select distinct cached responses.
+
+        :rtype: function - A decorator attaching the cache to the handler.
+        """
+        def decorator(func):
+            func._route_cache = ResponseCache(ttl, vary)
+            return func
+        return decorator
+
+    def invalidate(self, *paths):
+        """
+        Drop the cached responses of the routes registered for ``paths``,
+        or of every route when no path is given.
+
+        :param paths (str): Route paths, as passed to :meth:`route`.
+        """
+        for (method, path), func in self.routes.items():
+            cache = getattr(func, "_route_cache", None)
+            if cache is not None and (not paths or path in paths):
+                cache.invalidate()
+
+    def run(self, mode="thread", pool_size=POOL_SIZE, queue_size=QUEUE_SIZE,
+            workers=1):
         """
         Start the backend server and begin handling requests.
 
         This method launches the TCP server using the configured IP and port,
         and dispatches incoming requests to the registered route handlers.
 
+        :param mode (str): ``"thread"`` (one thread per connection), ``"pool"``
+                           (fixed worker pool with a bounded accept queue) or
+                           ``"selector"`` (single-threaded event loop) or
+                           ``"asyncio"`` (asyncio streams, awaits async handlers).
+        :param pool_size (int): Number of worker threads in ``pool`` mode.
+        :param queue_size (int): Pending connections allowed in ``pool`` mode.
+        :param workers (int): Number of pre-forked server processes sharing the
+                              port through ``SO_REUSEPORT``. Each process keeps
+                              its own copy of in-memory application state.
+
         :raise: Error if IP or port has not been configured.
         """
         if not self.ip or not self.port:
             print("Rous app need to preapre address"
                   "by calling app.prepare_address(ip,port)")
 
-        create_backend(self.ip, self.port, self.routes)
+        # Compile the route tree once, before serving (and forking).
+        routes = compile_routes(self.routes)
+
+        create_backend(self.ip, self.port, routes,
+                       mode=mode, pool_size=pool_size, queue_size=queue_size,
+                       workers=workers)
         
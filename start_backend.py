@@ -26,6 +26,7 @@ import socket
 import argparse
 
 from daemon import create_backend
+from daemon.backend import POOL_SIZE, QUEUE_SIZE
 
 # Default port number used if none is specified via command-line arguments.
 PORT = 9000 
@@ -40,6 +41,11 @@ if __name__ == "__main__":
 
     :arg --server-ip (str): IP address to bind the server (default: 127.0.0.1).
     :arg --server-port (int): Port number to bind the server (default: 9000).
+    :arg --mode (str): Connection handling mode, ``thread``, ``pool``, ``selector``
+                      or ``asyncio`` (default: thread).
+    :arg --pool-size (int): Worker threads in ``pool`` mode.
+    :arg --queue-size (int): Pending connections allowed in ``pool`` mode.
+    :arg --workers (int): Pre-forked server processes sharing the port (default: 1).
     """
 
     parser = argparse.ArgumentParser(
@@ -58,9 +64,34 @@ if __name__ == "__main__":
         default=PORT,
         help='Port number to bind the server. Default is {}.'.format(PORT)
     )
+    parser.add_argument(
+        '--mode',
+        choices=['thread', 'pool', 'selector', 'asyncio'],
+        default='thread',
+        help='Connection handling mode. Default is thread.'
+    )
+    parser.add_argument(
+        '--pool-size',
+        type=int,
+        default=POOL_SIZE,
+        help='Worker threads in pool mode. Default is {}.'.format(POOL_SIZE)
+    )
+    parser.add_argument(
+        '--queue-size',
+        type=int,
+        default=QUEUE_SIZE,
+        help='Pending connections allowed in pool mode. Default is {}.'.format(QUEUE_SIZE)
+    )
+    parser.add_argument(
+        '--workers',
+        type=int,
+        default=1,
+        help='Pre-forked server processes sharing the port. Default is 1.'
+    )
  
     args = parser.parse_args()
     ip = args.server_ip
     port = args.server_port
 
-    create_backend(ip, port)
+    create_backend(ip, port, mode=args.mode, pool_size=args.pool_size,
+                   queue_size=args.queue_size, workers=args.workers)
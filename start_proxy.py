@@ -39,8 +39,17 @@ def parse_virtual_hosts(config_file):
     """
     Parses virtual host blocks from a config file.
 
+    A ``proxy_pass`` may carry a ``weight=N`` option, kept in its entry
+    (``"host:port weight=N"``) for the weighted policies; ``dist_policy``
+    is one of ``round-robin``, ``weighted-round-robin``, ``least-conn``,
+    ``random-two`` or ``consistent-hash`` (see :mod:`daemon.balancer`).
+
+    The health options of a host, ``max_fails N;``, ``fail_timeout S;``
+    and ``health_check path=/status interval=5 timeout=2 fall=3 rise=2;``
+    (see :mod:`daemon.health`), are collected into its ``options`` dict.
+
     :config_file (str): Path to the NGINX-like config file.
-    :rtype dict: { host: (proxy_map OR list_of_proxy, policy) }
+    :rtype dict: { host: (proxy_map OR list_of_proxy, policy, options) }
     """
 
     with open(config_file, 'r') as f:
@@ -55,26 +64,38 @@ def parse_virtual_hosts(config_file):
         proxy_map = {}
 
         # Find all proxy_pass entries inside the block
-        proxy_passes = re.findall(r'proxy_pass\s+http://([^\s;]+);', block)
+        proxy_passes = [address + options for address, options in re.findall(
+            r'proxy_pass\s+http://([^\s;]+)((?:\s+weight=\d+)?)\s*;', block)]
 
         current_list = proxy_map.get(host, [])
         current_list = current_list + proxy_passes
         proxy_map[host] = current_list
 
         # Find dist_policy if present
-        policy_match = re.search(r'dist_policy\s+(\w+)', block)
+        policy_match = re.search(r'dist_policy\s+([\w-]+)', block)
         if policy_match:
             dist_policy = policy_match.group(1)
         else:
             dist_policy = 'round-robin'
 
+        # Health options
+        options = {}
+        for name in ('max_fails', 'fail_timeout'):
+            option_match = re.search(name + r'\s+([\d.]+)\s*;', block)
+            if option_match:
+                options[name] = option_match.group(1)
+        health_match = re.search(r'health_check((?:\s+\w+=[^\s;]+)*)\s*;', block)
+        if health_match:
+            options['health_check'] = dict(
+                option.split('=', 1) for option in health_match.group(1).split())
+
         # Build mapping + policy
         # - Nếu chỉ có 1 proxy_pass: lưu string
         # - Nếu nhiều proxy_pass: lưu list và áp dụng policy sau này trong proxy.py
         if len(proxy_map.get(host, [])) == 1:
-            routes[host] = (proxy_map.get(host, [])[0], dist_policy)
+            routes[host] = (proxy_map.get(host, [])[0], dist_policy, options)
         else:
-            routes[host] = (proxy_map.get(host, []), dist_policy)
+            routes[host] = (proxy_map.get(host, []), dist_policy, options)
 
     # Debug: in ra map đã parse
     for key, value in routes.items():
@@ -91,6 +112,8 @@ if __name__ == "__main__":
     parser = argparse.ArgumentParser(prog='Proxy', description='', epilog='Proxy daemon')
     parser.add_argument('--server-ip', default='0.0.0.0')
     parser.add_argument('--server-port', type=int, default=PROXY_PORT)
+    parser.add_argument('--workers', type=int, default=1,
+        help='Pre-forked proxy processes sharing the port. Default is 1.')
 
     args = parser.parse_args()
     ip = args.server_ip
@@ -100,4 +123,4 @@ if __name__ == "__main__":
     routes = parse_virtual_hosts("config/proxy.conf")
 
     # Khởi động proxy
-    create_proxy(ip, port, routes)
\ No newline at end of file
+    create_proxy(ip, port, routes, workers=args.workers)
\ No newline at end of file
@@ -154,15 +154,15 @@ def send_peer(headers="guest", body="{}"):
         return json.dumps({"status": "ERROR", "message": str(e)})
 
 @app.route('/get-list', methods=['POST', 'GET'])
-def get_list(headers="guest", body="{}"):
+def get_list(headers="guest", body="{}", query=None):
     try:
-        channel = None
+        channel = (query or {}).get("channel")
         if body:
             try:
                 data = json.loads(body)
-                channel = data.get("channel")
+                channel = data.get("channel", channel)
             except Exception:
-                channel = None
+                pass
 
         peers = tracker.get_peers(channel)
 
@@ -45,6 +45,13 @@ peers_lock = threading.Lock()  # Thread-safe access to peers_list
 channels_lock = threading.Lock()  # Thread-safe access to channels_list
 
 app = WeApRous()
+
+
+def state_changed():
+    """Drop the cached /get-list and /status responses after a peer/channel change."""
+    app.invalidate('/get-list', '/status')
+
+
 @app.route('/leave', methods=['POST'])
 def leave(headers=None, body=None):
     print("[Tracker] Peer leave request received")
@@ -64,6 +71,7 @@ def leave(headers=None, body=None):
                                 members.remove(peer_id)
                                 if not members:
                                     del channels_list[channel]
+            state_changed()
             print(f"[Tracker] Peer {peer_id} has left the network")
         return json.dumps({"status": "OK", "message": "Peer removed"})
     except Exception as e:
@@ -421,6 +429,7 @@ def submit_info(headers="guest", body="anonymous"):
             "total_peers": len(peers_list)
         }
         
+        state_changed()
         print("[ChatApp] Peer registered: {} (total peers: {})".format(peer_id, len(peers_list)))
         return json.dumps(response)
     
@@ -483,6 +492,7 @@ def add_list(headers="guest", body="anonymous"):
             "member_count": len(members)
         }
         
+        state_changed()
         print("[ChatApp] Channel {} now has {} members".format(channel, len(members)))
         return json.dumps(response)
     
@@ -556,6 +566,7 @@ def remove_list(headers="guest", body="anonymous"):
             "channel": channel
         }
         
+        state_changed()
         print("[ChatApp] User {} removed from channel '{}'".format(peer_id, channel))
         return json.dumps(response)
     
@@ -565,25 +576,29 @@ def remove_list(headers="guest", body="anonymous"):
 
 
 @app.route('/get-list', methods=['GET', 'POST'])
-def get_list(headers="guest", body="anonymous"):
+@app.cache(ttl=5)
+def get_list(headers="guest", body="anonymous", query=None):
     """
     Get list of active peers or channel members.
     
+    Filters come from the query string (GET /get-list?channel=x&peer_id=y)
+    or, for older clients, from a POST body.
     Expected body format: {"channel": str (optional), "peer_id": str (optional)}
     Response: {"status": "success", "peers": [...], "channels": {...}}
     
     :param headers (str): The request headers
     :param body (str): Optional filter parameters
+    :param query (dict): Optional filter parameters from the query string
     :return: JSON response with peer/channel list
     """
     print("[ChatApp] Get list request received")
     
     try:
         # Parse JSON body if provided
-        data = {}
+        data = dict(query or {})
         if body and body != "anonymous":
             try:
-                data = json.loads(body)
+                data.update(json.loads(body))
             except:
                 pass
         
@@ -673,6 +688,7 @@ def register(headers="guest", body="anonymous"):
             "peer_id": peer_id
         }
         
+        state_changed()
         print("[ChatApp] User registered: {}".format(peer_id))
         return json.dumps(response)
     
@@ -682,6 +698,7 @@ def register(headers="guest", body="anonymous"):
 
 
 @app.route('/status', methods=['GET'])
+@app.cache(ttl=5)
 def status(headers="guest", body="anonymous"):
     """
     Get server status and statistics.
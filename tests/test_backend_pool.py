@@ -0,0 +1,120 @@
+#
+# Copyright (C) 2025 pdnguyen of HCMC University of Technology VNU-HCM.
+# All rights reserved.
+# This file is part of the CO3093/CO3094 course.
+#
+# WeApRous release
+#
+# The authors hereby grant to Licensee personal permission to use
+# and modify the Licensed Source Code for the sole purpose of studying
+# while attending the course
+#
+
+"""
+tests.test_backend_pool
+~~~~~~~~~~~~~~~~~~~~~~~~~
+
+Keep-alive connections in the ``pool`` mode of :mod:`daemon.backend`:
+idle clients must not starve the worker pool.
+
+Usage::
+
+  $ python -m unittest tests.test_backend_pool
+"""
+
+import os
+import sys
+import time
+import socket
+import threading
+import unittest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import daemon.backend
+import daemon.httpadapter
+import daemon.request
+from daemon.backend import run_backend
+from daemon.router import compile_routes
+from daemon.weaprous import WeApRous
+
+REQUEST = b"GET /ping HTTP/1.1\r\nHost: test\r\n\r\n"
+
+app = WeApRous()
+
+
+@app.route("/ping", methods=["GET"])
+def ping(headers=None, body=None):
+    return {"ok": True}
+
+
+def free_port():
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+
+def exchange(sock):
+    """Sends one request and reads its response head and body."""
+    sock.sendall(REQUEST)
+    data = b""
+    while b"\r\n\r\n" not in data:
+        chunk = sock.recv(4096)
+        if not chunk:
+            raise ConnectionError("closed before the response")
+        data += chunk
+    head, _, body = data.partition(b"\r\n\r\n")
+    length = 0
+    for line in head.split(b"\r\n"):
+        if line.lower().startswith(b"content-length:"):
+            length = int(line.split(b":", 1)[1])
+    while len(body) < length:
+        chunk = sock.recv(4096)
+        if not chunk:
+            raise ConnectionError("closed before the end of the body")
+        body += chunk
+    return head
+
+
+class IdleKeepAliveTest(unittest.TestCase):
+
+    @classmethod
+    def setUpClass(cls):
+        # Keep console logging out of the test output.
+        daemon.backend.print = lambda *args, **kwargs: None
+        daemon.httpadapter.print = lambda *args, **kwargs: None
+        daemon.request.print = lambda *args, **kwargs: None
+        cls.port = free_port()
+        routes = compile_routes(app.routes)
+        threading.Thread(target=run_backend,
+                         args=("127.0.0.1", cls.port, routes, "pool", 2, 8),
+                         daemon=True).start()
+        deadline = time.monotonic() + 5
+        while True:
+            try:
+                socket.create_connection(("127.0.0.1", cls.port), timeout=1).close()
+                break
+            except OSError:
+                if time.monotonic() > deadline:
+                    raise
+                time.sleep(0.05)
+
+    def test_more_idle_clients_than_workers(self):
+        idle = []
+        for _ in range(4):
+            sock = socket.create_connection(("127.0.0.1", self.port), timeout=5)
+            self.assertIn(b"200 OK", exchange(sock))
+            idle.append(sock)
+
+        started = time.monotonic()
+        with socket.create_connection(("127.0.0.1", self.port), timeout=5) as sock:
+            self.assertIn(b"200 OK", exchange(sock))
+        self.assertLess(time.monotonic() - started,
+                        daemon.httpadapter.KEEPALIVE_TIMEOUT / 2)
+
+        for sock in idle:
+            sock.close()
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,158 @@
+#
+# Copyright (C) 2025 pdnguyen of HCMC University of Technology VNU-HCM.
+# All rights reserved.
+# This file is part of the CO3093/CO3094 course.
+#
+# WeApRous release
+#
+# The authors hereby grant to Licensee personal permission to use
+# and modify the Licensed Source Code for the sole purpose of studying
+# while attending the course
+#
+
+"""
+tests.test_balancer
+~~~~~~~~~~~~~~~~~~~
+
+Policies and passive health of :mod:`daemon.balancer`, what the proxy
+reports to them (:func:`daemon.proxy.forward_balanced`), and the active
+checks of :mod:`daemon.health`.
+
+Usage::
+
+  $ python -m unittest tests.test_balancer
+"""
+
+import os
+import sys
+import socket
+import unittest
+from collections import Counter
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import daemon.balancer
+import daemon.health
+import daemon.proxy
+import daemon.upstream
+from daemon.balancer import (ConsistentHash, RoundRobin, Upstream, WeightedRoundRobin,
+                             parse_upstream, sticky_key)
+from daemon.health import HealthChecker
+from daemon.proxy import BAD_GATEWAY, forward_balanced
+
+
+def pool(count):
+    return [Upstream("10.0.0.{}".format(i), 9000) for i in range(count)]
+
+
+def picks(balancer, rounds, key=None):
+    counts = Counter()
+    for _ in range(rounds):
+        upstream = balancer.acquire(key)
+        counts[upstream.host] += 1
+        balancer.release(upstream)
+    return counts
+
+
+class PolicyTest(unittest.TestCase):
+
+    def setUp(self):
+        # Keep console logging out of the test output.
+        daemon.balancer.print = lambda *args, **kwargs: None
+
+    def test_parse_upstream(self):
+        upstream = parse_upstream("10.0.0.1:9002 weight=3")
+        self.assertEqual((upstream.host, upstream.port, upstream.weight), ("10.0.0.1", 9002, 3))
+
+    def test_round_robin(self):
+        self.assertEqual(set(picks(RoundRobin(pool(3)), 9).values()), {3})
+
+    def test_weighted_round_robin(self):
+        upstreams = [Upstream("10.0.0.1", 9000, 3), Upstream("10.0.0.2", 9000)]
+        counts = picks(WeightedRoundRobin(upstreams), 8)
+        self.assertEqual((counts["10.0.0.1"], counts["10.0.0.2"]), (6, 2))
+
+    def test_consistent_hash_is_sticky(self):
+        counts = picks(ConsistentHash(pool(4)), 20, key="sessionid=abc")
+        self.assertEqual(len(counts), 1)
+
+    def test_sticky_key_prefers_session_cookie(self):
+        self.assertEqual(sticky_key("theme=dark; sessionid=abc", "1.2.3.4"), "sessionid=abc")
+        self.assertEqual(sticky_key("", "1.2.3.4"), "1.2.3.4")
+
+    def test_ejected_after_max_fails(self):
+        balancer = RoundRobin(pool(2), max_fails=2, fail_timeout=60)
+        bad = balancer.upstreams[0]
+        balancer.report(bad, False)
+        balancer.report(bad, False)
+        self.assertEqual(set(picks(balancer, 4)), {"10.0.0.1"})
+
+    def test_all_ejected_fails_open(self):
+        balancer = RoundRobin(pool(2), max_fails=1, fail_timeout=60)
+        for upstream in balancer.upstreams:
+            balancer.report(upstream, False)
+        self.assertEqual(len(picks(balancer, 4)), 2)
+
+
+class ForwardReportTest(unittest.TestCase):
+
+    def setUp(self):
+        daemon.balancer.print = lambda *args, **kwargs: None
+        daemon.proxy.print = lambda *args, **kwargs: None
+        self.saved = (daemon.upstream.CHECKOUT_TIMEOUT, daemon.upstream.UPSTREAM_POOL.max_per_host)
+        self.client, self.peer = socket.socketpair()
+
+    def tearDown(self):
+        daemon.upstream.CHECKOUT_TIMEOUT, daemon.upstream.UPSTREAM_POOL.max_per_host = self.saved
+        self.client.close()
+        self.peer.close()
+
+    def test_full_pool_does_not_eject(self):
+        # No connection can be checked out: the proxy is busy, not the backend.
+        daemon.upstream.CHECKOUT_TIMEOUT = 0.01
+        daemon.upstream.UPSTREAM_POOL.max_per_host = 0
+        balancer = RoundRobin(pool(2), max_fails=1, fail_timeout=60)
+        forward_balanced(balancer, balancer.acquire(), None,
+                         b"GET / HTTP/1.1\r\nHost: x", 0, b"", self.client)
+        self.assertEqual(self.peer.recv(1024), BAD_GATEWAY)
+        for upstream in balancer.upstreams:
+            self.assertEqual((upstream.fails, upstream.down_until, upstream.active), (0, 0.0, 0))
+
+
+class HealthCheckTest(unittest.TestCase):
+
+    def setUp(self):
+        daemon.balancer.print = lambda *args, **kwargs: None
+        daemon.health.print = lambda *args, **kwargs: None
+        self.saved = daemon.health.probe
+        self.balancer = RoundRobin(pool(2), max_fails=1, fail_timeout=60)
+        self.checker = HealthChecker("app.local", self.balancer, fall=2, rise=2)
+        self.upstream = self.balancer.upstreams[0]
+
+    def tearDown(self):
+        daemon.health.probe = self.saved
+
+    def probe_all(self, ok, rounds):
+        daemon.health.probe = lambda *args: ok
+        for _ in range(rounds):
+            self.checker.check(self.upstream)
+
+    def test_fall_and_rise(self):
+        self.probe_all(False, 2)
+        self.assertFalse(self.upstream.healthy)
+        self.probe_all(True, 1)
+        self.assertFalse(self.upstream.healthy)
+        self.probe_all(True, 1)
+        self.assertTrue(self.upstream.healthy)
+
+    def test_probes_keep_passive_ejection(self):
+        # Answering the health path does not undo failed real requests.
+        self.balancer.report(self.upstream, False)
+        down_until = self.upstream.down_until
+        self.probe_all(True, 5)
+        self.assertEqual(self.upstream.down_until, down_until)
+        self.assertEqual(set(picks(self.balancer, 4)), {"10.0.0.1"})
+
+
+if __name__ == "__main__":
+    unittest.main()
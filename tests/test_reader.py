@@ -0,0 +1,94 @@
+#
+# Copyright (C) 2025 pdnguyen of HCMC University of Technology VNU-HCM.
+# All rights reserved.
+# This file is part of the CO3093/CO3094 course.
+#
+# WeApRous release
+#
+# The authors hereby grant to Licensee personal permission to use
+# and modify the Licensed Source Code for the sole purpose of studying
+# while attending the course
+#
+
+"""
+tests.test_reader
+~~~~~~~~~~~~~~~~~
+
+Request framing of :class:`RequestReader <daemon.reader.RequestReader>`:
+``Content-Length`` and chunked bodies, pipelining and the 400/413/431
+limits.
+
+Usage::
+
+  $ python -m unittest tests.test_reader
+"""
+
+import os
+import sys
+import unittest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from daemon.reader import RequestError, RequestReader
+
+CHUNKED_HEAD = b"POST /x HTTP/1.1\r\nTransfer-Encoding: chunked\r\n\r\n"
+
+
+def frame(data, **limits):
+    reader = RequestReader(**limits)
+    reader.feed(data)
+    return reader.next_message()
+
+
+class ReaderTest(unittest.TestCase):
+
+    def assertStatus(self, status, data, **limits):
+        with self.assertRaises(RequestError) as caught:
+            frame(data, **limits)
+        self.assertEqual(caught.exception.status_code, status)
+
+    def test_content_length_body(self):
+        request = b"POST /x HTTP/1.1\r\nContent-Length: 2\r\n\r\nhi"
+        self.assertEqual(frame(request), request)
+
+    def test_waits_for_the_whole_body(self):
+        self.assertIsNone(frame(b"POST /x HTTP/1.1\r\nContent-Length: 5\r\n\r\nhi"))
+
+    def test_pipelined_requests(self):
+        reader = RequestReader()
+        reader.feed(b"GET /a HTTP/1.1\r\n\r\nGET /b HTTP/1.1\r\n\r\nGET /c")
+        self.assertEqual(reader.next_message(), b"GET /a HTTP/1.1\r\n\r\n")
+        self.assertEqual(reader.next_message(), b"GET /b HTTP/1.1\r\n\r\n")
+        self.assertIsNone(reader.next_message())
+
+    def test_malformed_content_length(self):
+        for value in (b"-5", b"+5", b"1_0", b"0x10", b"5 5", b""):
+            self.assertStatus(400, b"POST /x HTTP/1.1\r\nContent-Length: " + value + b"\r\n\r\n")
+
+    def test_oversized_content_length(self):
+        self.assertStatus(413, b"POST /x HTTP/1.1\r\nContent-Length: 2048\r\n\r\n",
+                          max_body_size=1024)
+
+    def test_oversized_head(self):
+        self.assertStatus(431, b"GET /x HTTP/1.1\r\nX: " + b"a" * 2048, max_header_size=1024)
+
+    def test_chunked_body_is_reframed(self):
+        self.assertEqual(frame(CHUNKED_HEAD + b"3;ext=1\r\nabc\r\n2\r\nde\r\n0\r\nT: v\r\n\r\n"),
+                         b"POST /x HTTP/1.1\r\nContent-Length: 5\r\n\r\nabcde")
+
+    def test_oversized_chunk_refused_before_its_data(self):
+        self.assertStatus(413, CHUNKED_HEAD + b"ffffff\r\n" + b"x" * 100, max_body_size=1024)
+
+    def test_malformed_chunk_size(self):
+        for size in (b"-3", b"+a", b"1_0", b"0x10", b""):
+            self.assertStatus(400, CHUNKED_HEAD + size + b"\r\nabc\r\n0\r\n\r\n")
+
+    def test_chunk_data_without_crlf(self):
+        self.assertStatus(400, CHUNKED_HEAD + b"3\r\nabcd\r\n0\r\n\r\n")
+
+    def test_endless_chunk_size_line(self):
+        self.assertStatus(400, CHUNKED_HEAD + b"1" * 5000)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,112 @@
+#
+# Copyright (C) 2025 pdnguyen of HCMC University of Technology VNU-HCM.
+# All rights reserved.
+# This file is part of the CO3093/CO3094 course.
+#
+# WeApRous release
+#
+# The authors hereby grant to Licensee personal permission to use
+# and modify the Licensed Source Code for the sole purpose of studying
+# while attending the course
+#
+
+"""
+tests.test_routecache
+~~~~~~~~~~~~~~~~~~~~~
+
+The per-route response cache (:mod:`daemon.routecache`) as route
+handlers see it through :meth:`WeApRous.cache
+<daemon.weaprous.WeApRous.cache>`.
+
+Usage::
+
+  $ python -m unittest tests.test_routecache
+"""
+
+import os
+import sys
+import time
+import unittest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import daemon.httpadapter
+import daemon.request
+import daemon.response
+from daemon.httpadapter import HttpAdapter
+from daemon.router import compile_routes
+from daemon.weaprous import WeApRous
+
+app = WeApRous()
+calls = []
+
+
+@app.route("/counter", methods=["GET", "POST"])
+@app.cache(ttl=0.2, vary=["Cookie"])
+def counter(headers=None, body=None):
+    calls.append(1)
+    return {"calls": len(calls)}
+
+
+class RouteCacheTest(unittest.TestCase):
+
+    @classmethod
+    def setUpClass(cls):
+        # Keep console logging out of the test output.
+        for module in (daemon.httpadapter, daemon.request, daemon.response):
+            module.print = lambda *args, **kwargs: None
+        cls.routes = compile_routes(app.routes)
+
+    def setUp(self):
+        app.invalidate()
+        del calls[:]
+
+    def request(self, method, *headers):
+        adapter = HttpAdapter("127.0.0.1", 0, None, ("127.0.0.1", 0), self.routes)
+        msg = "{} /counter HTTP/1.1\r\nHost: test\r\n{}\r\n".format(
+            method, "".join(header + "\r\n" for header in headers))
+        return adapter.handle_request(msg.encode("latin-1"), self.routes)
+
+    def test_get_is_served_from_cache(self):
+        first = self.request("GET")
+        self.assertEqual(self.request("GET"), first)
+        self.assertEqual(len(calls), 1)
+
+    def test_head_shares_the_get_entry(self):
+        response = self.request("GET")
+        head = self.request("HEAD")
+        self.assertTrue(head.startswith(b"HTTP/1.1 200 "))
+        self.assertEqual(head, response[:response.find(b"\r\n\r\n") + 4])
+        self.assertEqual(len(calls), 1)
+
+    def test_head_alone_runs_the_handler_once(self):
+        self.request("HEAD")
+        self.request("GET")
+        self.assertEqual(len(calls), 1)
+
+    def test_post_is_not_cached(self):
+        self.request("POST")
+        self.request("POST")
+        self.assertEqual(len(calls), 2)
+
+    def test_vary_header_selects_entries(self):
+        self.request("GET", "Cookie: a=1")
+        self.request("GET", "Cookie: a=2")
+        self.request("GET", "Cookie: a=1")
+        self.assertEqual(len(calls), 2)
+
+    def test_invalidate(self):
+        self.request("GET")
+        app.invalidate("/counter")
+        self.request("GET")
+        self.assertEqual(len(calls), 2)
+
+    def test_ttl_expires(self):
+        self.request("GET")
+        time.sleep(0.25)
+        self.request("GET")
+        self.assertEqual(len(calls), 2)
+
+
+if __name__ == "__main__":
+    unittest.main()
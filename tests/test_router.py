@@ -0,0 +1,103 @@
+#
+# Copyright (C) 2025 pdnguyen of HCMC University of Technology VNU-HCM.
+# All rights reserved.
+# This file is part of the CO3093/CO3094 course.
+#
+# WeApRous release
+#
+# The authors hereby grant to Licensee personal permission to use
+# and modify the Licensed Source Code for the sole purpose of studying
+# while attending the course
+#
+
+"""
+tests.test_router
+~~~~~~~~~~~~~~~~~
+
+Route matching of :mod:`daemon.router`: converters, ``405`` with the
+merged ``Allow`` methods, and malformed request lines answered with ``400``.
+
+Usage::
+
+  $ python -m unittest tests.test_router
+"""
+
+import os
+import sys
+import unittest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import daemon.httpadapter
+import daemon.request
+from daemon.httpadapter import HttpAdapter
+from daemon.router import Router, compile_routes
+from daemon.weaprous import WeApRous
+
+
+def handler(headers=None, body=None, **params):
+    return params
+
+
+class RouterTest(unittest.TestCase):
+
+    def setUp(self):
+        self.router = Router({
+            ("GET", "/items"): handler,
+            ("GET", "/items/<int:n>"): handler,
+            ("PUT", "/items/<name>"): handler,
+            ("DELETE", "/files/<path:rest>"): handler,
+        })
+
+    def test_literal_route(self):
+        self.assertEqual(self.router.match("GET", "/items"), (handler, None, None))
+
+    def test_int_converter(self):
+        self.assertEqual(self.router.match("GET", "/items/12"), (handler, {"n": 12}, None))
+
+    def test_int_rejects_non_ascii_digits(self):
+        for segment in ("²", "١", "-1", "1.5"):
+            handler_, params, allowed = self.router.match("GET", "/items/" + segment)
+            self.assertIsNone(handler_)
+            self.assertEqual(allowed, ["PUT"])
+
+    def test_path_wildcard(self):
+        self.assertEqual(self.router.match("DELETE", "/files/a/b.txt"),
+                         (handler, {"rest": "a/b.txt"}, None))
+
+    def test_allow_merges_every_matching_route(self):
+        self.assertEqual(self.router.match("POST", "/items/5"),
+                         (None, None, ["GET", "HEAD", "PUT"]))
+
+    def test_head_falls_back_to_get(self):
+        self.assertEqual(self.router.match("HEAD", "/items"), (handler, None, None))
+        self.assertEqual(self.router.match("HEAD", "/items/3"), (handler, {"n": 3}, None))
+
+    def test_unknown_path(self):
+        self.assertEqual(self.router.match("GET", "/nothing"), (None, None, None))
+
+    def test_unknown_converter(self):
+        with self.assertRaises(ValueError):
+            Router({("GET", "/x/<float:f>"): handler})
+
+
+class MalformedRequestLineTest(unittest.TestCase):
+
+    @classmethod
+    def setUpClass(cls):
+        # Keep console logging out of the test output.
+        daemon.httpadapter.print = lambda *args, **kwargs: None
+        daemon.request.print = lambda *args, **kwargs: None
+        app = WeApRous()
+        app.route("/ping", methods=["GET"])(handler)
+        cls.routes = compile_routes(app.routes)
+
+    def test_garbage_gets_400(self):
+        adapter = HttpAdapter("127.0.0.1", 0, None, ("127.0.0.1", 0), self.routes)
+        response = adapter.handle_request(b"GARBAGE\r\n\r\n", self.routes)
+        self.assertTrue(response.startswith(b"HTTP/1.1 400 "))
+        self.assertFalse(adapter.keep_alive)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,210 @@
+#
+# Copyright (C) 2025 pdnguyen of HCMC University of Technology VNU-HCM.
+# All rights reserved.
+# This file is part of the CO3093/CO3094 course.
+#
+# WeApRous release
+#
+# The authors hereby grant to Licensee personal permission to use
+# and modify the Licensed Source Code for the sole purpose of studying
+# while attending the course
+#
+
+"""
+tests.test_static
+~~~~~~~~~~~~~~~~~
+
+Responses of :class:`HttpAdapter <daemon.httpadapter.HttpAdapter>` to
+static file and route requests: ``HEAD`` framing on persistent
+connections, ``Range`` requests, conditional ``GET`` and content coding.
+
+Usage::
+
+  $ python -m unittest tests.test_static
+"""
+
+import os
+import sys
+import gzip
+import socket
+import unittest
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+import daemon.httpadapter
+import daemon.request
+import daemon.response
+from daemon.compression import choose_encoding
+from daemon.httpadapter import HttpAdapter
+from daemon.router import compile_routes
+from daemon.weaprous import WeApRous
+
+STYLESHEET = "/css/styles.css"
+
+IMAGE = "/images/welcome.jpg"
+
+app = WeApRous()
+
+
+@app.route("/ping", methods=["GET"])
+def ping(headers=None, body=None):
+    return {"ok": True}
+
+
+def quiet():
+    # Keep console logging out of the test output.
+    for module in (daemon.httpadapter, daemon.request, daemon.response):
+        module.print = lambda *args, **kwargs: None
+
+
+def split(response):
+    """Returns the status line, header dict and body of a bytes response."""
+    head, _, body = response.partition(b"\r\n\r\n")
+    lines = head.decode("latin-1").split("\r\n")
+    headers = dict(line.split(": ", 1) for line in lines[1:])
+    return lines[0], headers, body
+
+
+class StaticTestCase(unittest.TestCase):
+
+    @classmethod
+    def setUpClass(cls):
+        quiet()
+        cls.cwd = os.getcwd()
+        os.chdir(ROOT)
+        cls.routes = compile_routes(app.routes)
+
+    @classmethod
+    def tearDownClass(cls):
+        os.chdir(cls.cwd)
+
+    def request(self, method, path, *headers):
+        adapter = HttpAdapter("127.0.0.1", 0, None, ("127.0.0.1", 0), self.routes)
+        msg = "{} {} HTTP/1.1\r\nHost: test\r\n{}\r\n".format(
+            method, path, "".join(header + "\r\n" for header in headers))
+        return adapter.handle_request(msg.encode("latin-1"), self.routes)
+
+
+class HeadTest(StaticTestCase):
+
+    def test_static_head_has_no_body(self):
+        status, headers, body = split(self.request("GET", STYLESHEET))
+        head_status, head_headers, head_body = split(self.request("HEAD", STYLESHEET))
+        self.assertEqual(head_status, status)
+        self.assertEqual(head_headers["Content-Length"], str(len(body)))
+        self.assertEqual(head_body, b"")
+
+    def test_error_head_has_no_body(self):
+        status, headers, body = split(self.request("HEAD", "/missing.html"))
+        self.assertIn("404", status)
+        self.assertEqual(body, b"")
+
+    def test_head_then_get_on_one_connection(self):
+        server, client = socket.socketpair()
+        client.sendall("HEAD {0} HTTP/1.1\r\nHost: test\r\n\r\n"
+                       "GET /ping HTTP/1.1\r\nHost: test\r\nConnection: close\r\n\r\n"
+                       .format(STYLESHEET).encode("latin-1"))
+        adapter = HttpAdapter("127.0.0.1", 0, server, ("127.0.0.1", 0), self.routes)
+        adapter.handle_client(server, ("127.0.0.1", 0), self.routes)
+        data = b""
+        while True:
+            chunk = client.recv(65536)
+            if not chunk:
+                break
+            data += chunk
+        client.close()
+        first, _, second = data.partition(b"\r\n\r\n")
+        self.assertTrue(first.startswith(b"HTTP/1.1 200 "))
+        self.assertTrue(second.startswith(b"HTTP/1.1 200 "), second[:40])
+
+
+class RangeTest(StaticTestCase):
+
+    def setUp(self):
+        self.body = split(self.request("GET", STYLESHEET))[2]
+
+    def test_single_range(self):
+        status, headers, body = split(self.request("GET", STYLESHEET, "Range: bytes=0-9"))
+        self.assertIn("206", status)
+        self.assertEqual(headers["Content-Range"], "bytes 0-9/{}".format(len(self.body)))
+        self.assertEqual(body, self.body[:10])
+
+    def test_suffix_range(self):
+        status, headers, body = split(self.request("GET", STYLESHEET, "Range: bytes=-5"))
+        self.assertEqual(body, self.body[-5:])
+
+    def test_multiple_ranges(self):
+        status, headers, body = split(self.request("GET", STYLESHEET, "Range: bytes=0-1,5-6"))
+        self.assertIn("206", status)
+        self.assertTrue(headers["Content-Type"].startswith("multipart/byteranges"))
+        self.assertEqual(headers["Content-Length"], str(len(body)))
+        self.assertIn(self.body[5:7], body)
+
+    def test_unsatisfiable_range(self):
+        status, headers, body = split(self.request("GET", STYLESHEET, "Range: bytes=999999-"))
+        self.assertIn("416", status)
+        self.assertEqual(headers["Content-Range"], "bytes */{}".format(len(self.body)))
+
+    def test_range_is_not_compressed(self):
+        status, headers, body = split(self.request("GET", STYLESHEET, "Range: bytes=0-9",
+                                                   "Accept-Encoding: gzip"))
+        self.assertNotIn("Content-Encoding", headers)
+        self.assertEqual(body, self.body[:10])
+
+
+class ConditionalTest(StaticTestCase):
+
+    def setUp(self):
+        self.headers = split(self.request("GET", STYLESHEET))[1]
+
+    def test_matching_etag(self):
+        status, headers, body = split(self.request(
+            "GET", STYLESHEET, "If-None-Match: " + self.headers["ETag"]))
+        self.assertIn("304", status)
+        self.assertEqual(headers["ETag"], self.headers["ETag"])
+        self.assertEqual(body, b"")
+
+    def test_other_etag(self):
+        status = split(self.request("GET", STYLESHEET, 'If-None-Match: "other"'))[0]
+        self.assertIn("200", status)
+
+    def test_not_modified_since(self):
+        status = split(self.request(
+            "GET", STYLESHEET, "If-Modified-Since: " + self.headers["Last-Modified"]))[0]
+        self.assertIn("304", status)
+
+    def test_modified_since(self):
+        status = split(self.request(
+            "GET", STYLESHEET, "If-Modified-Since: Thu, 01 Jan 1970 00:00:00 GMT"))[0]
+        self.assertIn("200", status)
+
+
+class CompressionTest(StaticTestCase):
+
+    def test_negotiation(self):
+        self.assertEqual(choose_encoding("gzip"), "gzip")
+        self.assertEqual(choose_encoding("br, gzip"), "gzip")
+        self.assertIsNone(choose_encoding("gzip;q=0, identity"))
+        self.assertIsNone(choose_encoding(None))
+
+    def test_gzip_text(self):
+        plain = split(self.request("GET", STYLESHEET))[2]
+        status, headers, body = split(self.request("GET", STYLESHEET, "Accept-Encoding: gzip"))
+        self.assertEqual(headers["Content-Encoding"], "gzip")
+        self.assertEqual(headers["Vary"], "Accept-Encoding")
+        self.assertEqual(gzip.decompress(body), plain)
+        self.assertNotEqual(headers["ETag"], split(self.request("GET", STYLESHEET))[1]["ETag"])
+
+    def test_refused_coding(self):
+        headers = split(self.request("GET", STYLESHEET, "Accept-Encoding: gzip;q=0"))[1]
+        self.assertNotIn("Content-Encoding", headers)
+
+    def test_images_are_not_compressed(self):
+        response = self.request("GET", IMAGE, "Accept-Encoding: gzip")
+        head = response[0] if isinstance(response, list) else response
+        self.assertNotIn(b"Content-Encoding", head.partition(b"\r\n\r\n")[0])
+
+
+if __name__ == "__main__":
+    unittest.main()
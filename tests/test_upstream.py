@@ -0,0 +1,137 @@
+#
+# Copyright (C) 2025 pdnguyen of HCMC University of Technology VNU-HCM.
+# All rights reserved.
+# This file is part of the CO3093/CO3094 course.
+#
+# WeApRous release
+#
+# The authors hereby grant to Licensee personal permission to use
+# and modify the Licensed Source Code for the sole purpose of studying
+# while attending the course
+#
+
+"""
+tests.test_upstream
+~~~~~~~~~~~~~~~~~~~
+
+Message framing of :mod:`daemon.upstream`: request and response heads,
+the streaming :class:`MessageFramer <daemon.upstream.MessageFramer>` and
+:func:`relay <daemon.upstream.relay>`.
+
+Usage::
+
+  $ python -m unittest tests.test_upstream
+"""
+
+import os
+import sys
+import socket
+import unittest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from daemon.upstream import (MessageFramer, RelayError, UpstreamError, read_head, relay,
+                             request_framing, response_framing)
+
+CHUNKED = b"4;x=1\r\nWiki\r\n5\r\npedia\r\n0\r\nT: v\r\n\r\n"
+
+
+class RequestFramingTest(unittest.TestCase):
+
+    def test_content_length(self):
+        self.assertEqual(request_framing(b"POST / HTTP/1.1\r\nContent-Length: 12"), 12)
+
+    def test_no_body(self):
+        self.assertEqual(request_framing(b"GET / HTTP/1.1\r\nHost: x"), 0)
+
+    def test_chunked(self):
+        self.assertEqual(request_framing(b"POST / HTTP/1.1\r\nTransfer-Encoding: chunked"), -1)
+
+    def test_malformed_content_length(self):
+        for value in (b"-5", b"+5", b"1_0", b"0x10", b"5 5", b""):
+            with self.assertRaises(ValueError, msg=value):
+                request_framing(b"POST / HTTP/1.1\r\nContent-Length: " + value)
+
+    def test_unsupported_transfer_encoding(self):
+        with self.assertRaises(ValueError):
+            request_framing(b"POST / HTTP/1.1\r\nTransfer-Encoding: gzip")
+
+
+class ResponseFramingTest(unittest.TestCase):
+
+    def test_content_length(self):
+        self.assertEqual(response_framing(b"HTTP/1.1 200 OK\r\nContent-Length: 3", False),
+                         (3, True))
+
+    def test_chunked_wins(self):
+        head = b"HTTP/1.1 200 OK\r\nContent-Length: 3\r\nTransfer-Encoding: chunked"
+        self.assertEqual(response_framing(head, False), (-1, True))
+
+    def test_close_delimited(self):
+        self.assertEqual(response_framing(b"HTTP/1.0 200 OK", False), (None, False))
+
+    def test_no_body(self):
+        self.assertEqual(response_framing(b"HTTP/1.1 304 Not Modified", False), (0, True))
+        self.assertEqual(response_framing(b"HTTP/1.1 200 OK\r\nContent-Length: 9", True),
+                         (0, True))
+
+    def test_malformed(self):
+        for head in (b"HTTP/1.1 200 OK\r\nContent-Length: -5",
+                     b"HTTP/1.1 200 OK\r\nContent-Length: +5",
+                     b"HTTP/1.1 2\xc2\xb2 OK", b"garbage"):
+            with self.assertRaises(UpstreamError, msg=head):
+                response_framing(head, False)
+
+
+class MessageFramerTest(unittest.TestCase):
+
+    def test_length(self):
+        framer = MessageFramer(3)
+        self.assertEqual(framer.feed(b"abcdef"), 3)
+        self.assertTrue(framer.done)
+
+    def test_chunked_byte_by_byte(self):
+        data = CHUNKED + b"NEXT"
+        framer = MessageFramer(-1)
+        for i in range(len(data)):
+            end = framer.feed(data, i, i + 1)
+            if framer.done:
+                break
+        self.assertEqual(end, len(CHUNKED))
+
+    def test_malformed_chunk_size(self):
+        for size in (b"-3", b"+a", b"1_0", b"0x10", b"zz"):
+            with self.assertRaises(UpstreamError, msg=size):
+                MessageFramer(-1).feed(size + b"\r\nabc\r\n")
+
+
+class RelayTest(unittest.TestCase):
+
+    def setUp(self):
+        self.src, self.src_peer = socket.socketpair()
+        self.dst, self.dst_peer = socket.socketpair()
+
+    def tearDown(self):
+        for sock in (self.src, self.src_peer, self.dst, self.dst_peer):
+            sock.close()
+
+    def test_relays_one_body(self):
+        self.src_peer.sendall(CHUNKED[5:] + b"EXTRA")
+        leftover = relay(self.src, self.dst, MessageFramer(-1), CHUNKED[:5])
+        self.assertEqual(leftover, len(b"EXTRA"))
+        self.assertEqual(self.dst_peer.recv(1024), CHUNKED)
+
+    def test_early_close_is_a_read_error(self):
+        self.src_peer.sendall(b"abc")
+        self.src_peer.close()
+        with self.assertRaises(RelayError) as caught:
+            relay(self.src, self.dst, MessageFramer(10))
+        self.assertTrue(caught.exception.reading)
+
+    def test_read_head(self):
+        self.src_peer.sendall(b"HTTP/1.1 200 OK\r\nA: b\r\n\r\nbody")
+        self.assertEqual(read_head(self.src), (b"HTTP/1.1 200 OK\r\nA: b", b"body"))
+
+
+if __name__ == "__main__":
+    unittest.main()